@@ -0,0 +1,67 @@
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime
+
+from config import ShowdownConfig
+
+from .engine import find_regressions
+from .engine import get_benchmarks
+from .engine import run_benchmarks
+from .fixtures import FIXTURES
+
+
+def parse_args(args):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Times the hot paths of the battle engine")
+    parser.add_argument("--fixtures", nargs="+", choices=list(FIXTURES), default=list(FIXTURES))
+    parser.add_argument("--benchmarks", nargs="+", help="only run the benchmarks with these names")
+    parser.add_argument("--depths", nargs="+", type=int, default=[1, 2, 3], help="depths to run get_payoff_matrix at, up to 4")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum number of seconds for one repeat")
+    parser.add_argument("--damage-calc-type", default="average")
+    parser.add_argument("--output", help="file to write the results to. They are written to stdout if this is not given")
+    parser.add_argument("--compare", help="results from a previous run to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.1, help="how many times slower a benchmark must be to be a regression")
+    return parser.parse_args(args)
+
+
+def main(args):
+    args = parse_args(args)
+    ShowdownConfig.damage_calc_type = args.damage_calc_type
+
+    fixtures = {name: FIXTURES[name] for name in args.fixtures}
+    benchmarks = get_benchmarks(args.depths)
+    if args.benchmarks is not None:
+        benchmarks = {name: benchmarks[name] for name in args.benchmarks}
+
+    output = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "damage_calc_type": args.damage_calc_type,
+        "results": run_benchmarks(fixtures, benchmarks, repeats=args.repeats, min_time=args.min_time)
+    }
+
+    if args.output is None:
+        json.dump(output, sys.stdout, indent=4)
+        print()
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(output, f, indent=4)
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+        regressions = find_regressions(baseline["results"], output["results"], args.threshold)
+        for fixture_name, benchmark_name, ratio in regressions:
+            print("{} {}: {:.2f}x slower".format(fixture_name, benchmark_name, ratio), file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
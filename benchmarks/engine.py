@@ -0,0 +1,169 @@
+import time
+from itertools import product
+
+import constants
+from showdown.engine.damage_calculator import _calculate_damage
+from showdown.engine.evaluate import evaluate
+from showdown.engine.find_state_instructions import get_all_state_instructions
+from showdown.engine.move_ordering import MoveOrdering
+from showdown.engine.objects import StateMutator
+from showdown.engine.select_best_move import get_payoff_matrix
+from showdown.engine.transposition_table import TranspositionTable
+
+
+# each benchmark takes a fixture's state and returns a function that does the work being timed
+# anything that is not part of that work is done before the function is returned
+
+
+def instructions_benchmark(state):
+    mutator = StateMutator(state)
+    user_options, opponent_options = state.get_all_options()
+
+    def run():
+        for user_option, opponent_option in product(user_options, opponent_options):
+            get_all_state_instructions(mutator, user_option, opponent_option)
+
+    return run
+
+
+def apply_reverse_benchmark(state):
+    mutator = StateMutator(state)
+    user_options, opponent_options = state.get_all_options()
+    all_instructions = [
+        transpose_instruction.instructions
+        for user_option, opponent_option in product(user_options, opponent_options)
+        for transpose_instruction in get_all_state_instructions(mutator, user_option, opponent_option)
+    ]
+
+    def run():
+        for instructions in all_instructions:
+            mutator.apply(instructions)
+            mutator.reverse(instructions)
+
+    return run
+
+
+def evaluate_benchmark(state):
+    def run():
+        evaluate(state)
+
+    return run
+
+
+def damage_benchmark(state):
+    # every move of each active pokemon used against the other active pokemon
+    attacks = [
+        (attacker, defender, move[constants.ID])
+        for attacker, defender in ((state.user.active, state.opponent.active), (state.opponent.active, state.user.active))
+        for move in attacker.moves
+    ]
+
+    def run():
+        for attacker, defender, move in attacks:
+            _calculate_damage(attacker, defender, move)
+
+    return run
+
+
+def clone_benchmark(state):
+    def run():
+        state.clone()
+
+    return run
+
+
+def fingerprint_benchmark(state):
+    def run():
+        state.fingerprint()
+
+    return run
+
+
+def payoff_matrix_benchmark(depth):
+    # the search is set up the same way the bot sets it up, with nothing remembered from a previous run
+    def benchmark(state):
+        user_options, opponent_options = state.get_all_options()
+
+        def run():
+            get_payoff_matrix(
+                StateMutator(state),
+                user_options,
+                opponent_options,
+                depth=depth,
+                prune=True,
+                transposition_table=TranspositionTable(),
+                move_ordering=MoveOrdering()
+            )
+
+        return run
+
+    return benchmark
+
+
+def get_benchmarks(depths):
+    benchmarks = {
+        'get_all_state_instructions': instructions_benchmark,
+        'apply_reverse': apply_reverse_benchmark,
+        'evaluate': evaluate_benchmark,
+        '_calculate_damage': damage_benchmark,
+        'clone': clone_benchmark,
+        'fingerprint': fingerprint_benchmark,
+    }
+    for depth in depths:
+        benchmarks['get_payoff_matrix_depth_{}'.format(depth)] = payoff_matrix_benchmark(depth)
+    return benchmarks
+
+
+def time_function(function, repeats, min_time):
+    # the function is called enough times per repeat that a repeat takes at least `min_time` seconds
+    number = 1
+    while True:
+        start_time = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed_time = time.perf_counter() - start_time
+        if elapsed_time >= min_time:
+            break
+        number *= 10 if elapsed_time < min_time / 10 else 2
+
+    times = [elapsed_time / number]
+    for _ in range(repeats - 1):
+        start_time = time.perf_counter()
+        for _ in range(number):
+            function()
+        times.append((time.perf_counter() - start_time) / number)
+
+    return {
+        'number': number,
+        'repeats': repeats,
+        'best': min(times),
+        'mean': sum(times) / len(times),
+    }
+
+
+def run_benchmarks(fixtures, benchmarks, repeats=5, min_time=0.2):
+    """
+    Times every benchmark on every fixture, returning a list of results that can be written as JSON
+
+    The times are in seconds per call. `best` is the fastest repeat and is the least affected
+    by other work being done on the machine, so it is what should be compared between runs.
+    """
+    results = []
+    for fixture_name, fixture in fixtures.items():
+        for benchmark_name, benchmark in benchmarks.items():
+            result = time_function(benchmark(fixture()), repeats, min_time)
+            result['fixture'] = fixture_name
+            result['benchmark'] = benchmark_name
+            results.append(result)
+    return results
+
+
+def find_regressions(baseline_results, results, threshold):
+    # a benchmark has regressed if its best time is more than `threshold` times slower than the baseline's
+    baseline_times = {(r['fixture'], r['benchmark']): r['best'] for r in baseline_results}
+    regressions = []
+    for result in results:
+        baseline_time = baseline_times.get((result['fixture'], result['benchmark']))
+        if baseline_time and result['best'] / baseline_time > threshold:
+            regressions.append((result['fixture'], result['benchmark'], result['best'] / baseline_time))
+    return regressions
@@ -0,0 +1,165 @@
+from collections import defaultdict
+
+import constants
+from showdown.battle import Pokemon as StatePokemon
+from showdown.engine.objects import State
+from showdown.engine.objects import Side
+from showdown.engine.objects import Pokemon
+
+
+# every fixture builds a new state so that a benchmark can not be affected by one that ran before it
+
+
+def create_pokemon(name, level, moves, item=constants.UNKNOWN_ITEM, ability=None):
+    pkmn = StatePokemon(name, level)
+    pkmn.item = item
+    if ability is not None:
+        pkmn.ability = ability
+    for move in moves:
+        pkmn.add_move(move)
+    return Pokemon.from_state_pokemon_dict(pkmn.to_dict())
+
+
+def create_side(active, reserve):
+    return Side(
+        active,
+        {pkmn.id: pkmn for pkmn in reserve},
+        (0, 0),
+        defaultdict(lambda: 0),
+        (0, 0)
+    )
+
+
+def create_state(user_active, user_reserve, opponent_active, opponent_reserve):
+    return State(
+        create_side(user_active, user_reserve),
+        create_side(opponent_active, opponent_reserve),
+        None,
+        None,
+        False,
+        6
+    )
+
+
+def early_game():
+    # both sides still have all six pokemon at full health
+    return create_state(
+        create_pokemon('raichu', 88, ['thunderbolt', 'surf', 'nastyplot', 'focusblast'], 'lifeorb', 'lightningrod'),
+        [
+            create_pokemon('xatu', 90, ['psychic', 'uturn', 'roost', 'thunderwave'], 'leftovers', 'magicbounce'),
+            create_pokemon('starmie', 86, ['scald', 'rapidspin', 'recover', 'icebeam'], 'leftovers', 'naturalcure'),
+            create_pokemon('gyarados', 80, ['waterfall', 'dragondance', 'earthquake', 'bounce'], 'leftovers', 'intimidate'),
+            create_pokemon('dragonite', 74, ['dragonclaw', 'extremespeed', 'firepunch', 'roost'], 'heavydutyboots', 'multiscale'),
+            create_pokemon('hitmonlee', 86, ['closecombat', 'knockoff', 'machpunch', 'stoneedge'], 'choiceband', 'reckless'),
+        ],
+        create_pokemon('aromatisse', 90, ['moonblast', 'wish', 'protect', 'toxic'], 'leftovers', 'aromaveil'),
+        [
+            create_pokemon('yveltal', 72, ['darkpulse', 'hurricane', 'roost', 'suckerpunch'], 'lifeorb', 'darkaura'),
+            create_pokemon('slurpuff', 84, ['playrough', 'bellydrum', 'drainpunch', 'return'], 'sitrusberry', 'unburden'),
+            create_pokemon('victini', 80, ['vcreate', 'boltstrike', 'uturn', 'zenheadbutt'], 'choicescarf', 'victorystar'),
+            create_pokemon('toxapex', 82, ['scald', 'toxicspikes', 'recover', 'haze'], 'blacksludge', 'regenerator'),
+            create_pokemon('bronzong', 88, ['gyroball', 'stealthrock', 'earthquake', 'trickroom'], 'leftovers', 'levitate'),
+        ]
+    )
+
+
+def hazard_stall():
+    # hazards are up on both sides and the active pokemon have a status, so every switch and turn-end matters
+    state = create_state(
+        create_pokemon('skarmory', 80, ['spikes', 'roost', 'whirlwind', 'bravebird'], 'rockyhelmet', 'sturdy'),
+        [
+            create_pokemon('blissey', 82, ['seismictoss', 'softboiled', 'toxic', 'stealthrock'], 'heavydutyboots', 'naturalcure'),
+            create_pokemon('toxapex', 82, ['scald', 'toxicspikes', 'recover', 'haze'], 'blacksludge', 'regenerator'),
+            create_pokemon('clodsire', 82, ['earthquake', 'toxic', 'recover', 'spikes'], 'leftovers', 'unaware'),
+            create_pokemon('corviknight', 80, ['bravebird', 'defog', 'roost', 'uturn'], 'leftovers', 'pressure'),
+            create_pokemon('gliscor', 78, ['earthquake', 'toxic', 'protect', 'knockoff'], 'toxicorb', 'poisonheal'),
+        ],
+        create_pokemon('ferrothorn', 82, ['leechseed', 'powerwhip', 'spikes', 'knockoff'], 'leftovers', 'ironbarbs'),
+        [
+            create_pokemon('garganacl', 80, ['saltcure', 'recover', 'stealthrock', 'protect'], 'leftovers', 'purifyingsalt'),
+            create_pokemon('dondozo', 80, ['wavecrash', 'rest', 'sleeptalk', 'curse'], 'chestoberry', 'unaware'),
+            create_pokemon('gholdengo', 78, ['makeitrain', 'shadowball', 'nastyplot', 'recover'], 'leftovers', 'goodasgold'),
+            create_pokemon('hippowdon', 82, ['earthquake', 'slackoff', 'stealthrock', 'whirlwind'], 'leftovers', 'sandstream'),
+            create_pokemon('amoonguss', 84, ['spore', 'gigadrain', 'sludgebomb', 'clearsmog'], 'rockyhelmet', 'regenerator'),
+        ]
+    )
+    state.user.side_conditions[constants.STEALTH_ROCK] = 1
+    state.user.side_conditions[constants.SPIKES] = 2
+    state.opponent.side_conditions[constants.STEALTH_ROCK] = 1
+    state.opponent.side_conditions[constants.SPIKES] = 1
+    state.opponent.side_conditions[constants.TOXIC_SPIKES] = 1
+    state.user.active.status = constants.TOXIC
+    state.user.side_conditions[constants.TOXIC_COUNT] = 2
+    state.opponent.active.status = constants.BURN
+    state.opponent.active.hp = int(state.opponent.active.maxhp * 0.7)
+    return state
+
+
+def weather():
+    # rain is up and both sides have pokemon that are changed by the weather
+    state = create_state(
+        create_pokemon('barraskewda', 82, ['liquidation', 'closecombat', 'flipturn', 'aquajet'], 'choiceband', 'swiftswim'),
+        [
+            create_pokemon('pelipper', 86, ['hurricane', 'surf', 'uturn', 'roost'], 'damprock', 'drizzle'),
+            create_pokemon('kingdra', 86, ['hydropump', 'dracometeor', 'raindance', 'icebeam'], 'choicespecs', 'swiftswim'),
+            create_pokemon('zapdos', 80, ['thunder', 'hurricane', 'roost', 'voltswitch'], 'heavydutyboots', 'static'),
+            create_pokemon('ferrothorn', 82, ['leechseed', 'powerwhip', 'spikes', 'knockoff'], 'leftovers', 'ironbarbs'),
+            create_pokemon('swampert', 84, ['earthquake', 'waterfall', 'stealthrock', 'flipturn'], 'leftovers', 'torrent'),
+        ],
+        create_pokemon('torkoal', 88, ['eruption', 'solarbeam', 'stealthrock', 'rapidspin'], 'heatrock', 'drought'),
+        [
+            create_pokemon('venusaur', 84, ['gigadrain', 'sludgebomb', 'growth', 'weatherball'], 'lifeorb', 'chlorophyll'),
+            create_pokemon('charizard', 84, ['fireblast', 'airslash', 'solarbeam', 'roost'], 'heavydutyboots', 'solarpower'),
+            create_pokemon('tyranitar', 80, ['stoneedge', 'crunch', 'earthquake', 'dragondance'], 'leftovers', 'sandstream'),
+            create_pokemon('excadrill', 82, ['earthquake', 'ironhead', 'rapidspin', 'swordsdance'], 'leftovers', 'sandrush'),
+            create_pokemon('heatran', 82, ['magmastorm', 'earthpower', 'taunt', 'stealthrock'], 'leftovers', 'flashfire'),
+        ]
+    )
+    state.weather = constants.RAIN
+    return state
+
+
+def trick_room():
+    # trick room is up so slower pokemon move first
+    state = create_state(
+        create_pokemon('hatterene', 80, ['dazzlinggleam', 'psychic', 'mysticalfire', 'trickroom'], 'lifeorb', 'magicbounce'),
+        [
+            create_pokemon('conkeldurr', 82, ['machpunch', 'drainpunch', 'knockoff', 'icepunch'], 'flameorb', 'guts'),
+            create_pokemon('reuniclus', 84, ['psyshock', 'focusblast', 'recover', 'trickroom'], 'lifeorb', 'magicguard'),
+            create_pokemon('rhyperior', 84, ['rockwrecker', 'earthquake', 'megahorn', 'icepunch'], 'weaknesspolicy', 'solidrock'),
+            create_pokemon('marowakalola', 84, ['shadowbone', 'flareblitz', 'bonemerang', 'swordsdance'], 'thickclub', 'lightningrod'),
+            create_pokemon('ursaluna', 78, ['facade', 'headlongrush', 'crunch', 'swordsdance'], 'flameorb', 'guts'),
+        ],
+        create_pokemon('dragapult', 76, ['dracometeor', 'shadowball', 'uturn', 'willowisp'], 'choicespecs', 'infiltrator'),
+        [
+            create_pokemon('weavile', 80, ['tripleaxel', 'knockoff', 'iceshard', 'swordsdance'], 'heavydutyboots', 'pressure'),
+            create_pokemon('garchomp', 78, ['earthquake', 'stoneedge', 'swordsdance', 'scaleshot'], 'lifeorb', 'roughskin'),
+            create_pokemon('cinderace', 78, ['pyroball', 'uturn', 'highjumpkick', 'suckerpunch'], 'heavydutyboots', 'libero'),
+            create_pokemon('meowscarada', 78, ['flowertrick', 'knockoff', 'uturn', 'tripleaxel'], 'choiceband', 'protean'),
+            create_pokemon('ironvaliant', 78, ['moonblast', 'closecombat', 'knockoff', 'calmmind'], 'boosterenergy', 'quarkdrive'),
+        ]
+    )
+    state.trick_room = True
+    return state
+
+
+def endgame():
+    # one pokemon left on each side
+    state = create_state(
+        create_pokemon('garchomp', 78, ['earthquake', 'dragonclaw', 'swordsdance', 'stoneedge'], 'lifeorb', 'roughskin'),
+        [],
+        create_pokemon('volcarona', 78, ['fierydance', 'bugbuzz', 'quiverdance', 'gigadrain'], 'heavydutyboots', 'flamebody'),
+        []
+    )
+    state.user.active.hp = int(state.user.active.maxhp * 0.6)
+    state.opponent.active.hp = int(state.opponent.active.maxhp * 0.8)
+    return state
+
+
+FIXTURES = {
+    'early_game': early_game,
+    'hazard_stall': hazard_stall,
+    'weather': weather,
+    'trick_room': trick_room,
+    'endgame': endgame,
+}
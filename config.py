@@ -59,11 +59,22 @@ class _ShowdownConfig:
     bot_mode: str
     pokemon_mode: str
     run_count: int
+    max_concurrent_battles: int
     team: str
     user_to_challenge: str
     save_replay: bool
     room_name: str
     damage_calc_type: str
+    transposition_table_size: int
+    search_time_limit: float
+    search_processes: int
+    search_probability_floor: float
+    max_set_hypotheses: int
+    set_hypotheses_probability: float
+    search_cache_path: str
+    search_cache_size: int
+    opening_book_path: str
+    ponder: bool
     log_level: str
     log_to_file: bool
     log_handler: Union[CustomRotatingFileHandler, logging.StreamHandler]
@@ -77,12 +88,23 @@ class _ShowdownConfig:
         self.pokemon_mode = env("POKEMON_MODE")
 
         self.run_count = env.int("RUN_COUNT", 1)
+        self.max_concurrent_battles = env.int("MAX_CONCURRENT_BATTLES", 1)
         self.team = env("TEAM_NAME", None)
         self.user_to_challenge = env("USER_TO_CHALLENGE", None)
 
         self.save_replay = env.bool("SAVE_REPLAY", False)
         self.room_name = env("ROOM_NAME", None)
         self.damage_calc_type = env("DAMAGE_CALC_TYPE", "average")
+        self.transposition_table_size = env.int("TRANSPOSITION_TABLE_SIZE", 250000)
+        self.search_time_limit = env.float("SEARCH_TIME_LIMIT", 0)
+        self.search_processes = env.int("SEARCH_PROCESSES", 1)
+        self.search_probability_floor = env.float("SEARCH_PROBABILITY_FLOOR", 0)
+        self.max_set_hypotheses = env.int("MAX_SET_HYPOTHESES", 0)
+        self.set_hypotheses_probability = env.float("SET_HYPOTHESES_PROBABILITY", 1)
+        self.search_cache_path = env("SEARCH_CACHE_PATH", None)
+        self.search_cache_size = env.int("SEARCH_CACHE_SIZE", 100000)
+        self.opening_book_path = env("OPENING_BOOK_PATH", None)
+        self.ponder = env.bool("PONDER", False)
 
         self.log_level = env("LOG_LEVEL", "DEBUG")
         self.log_to_file = env.bool("LOG_TO_FILE", False)
@@ -97,5 +119,13 @@ class _ShowdownConfig:
                 "If bot_mode is `CHALLENGE_USER, you must declare USER_TO_CHALLENGE"
             )
 
+        assert self.max_concurrent_battles >= 1, "MAX_CONCURRENT_BATTLES must be at least 1"
+
+        # a challenge can be in any format, but the data can only have one generation's changes applied at a time
+        if self.bot_mode == constants.ACCEPT_CHALLENGE:
+            assert self.max_concurrent_battles == 1, (
+                "If bot_mode is `ACCEPT_CHALLENGE`, MAX_CONCURRENT_BATTLES must be 1"
+            )
+
 
 ShowdownConfig = _ShowdownConfig()
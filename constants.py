@@ -128,6 +128,9 @@ REQUEST_STRING = "request"
 SWITCH_STRING = "switch"
 WIN_STRING = "|win|"
 TIE_STRING = "|tie"
+TURN_STRING = "|turn|"
+INIT_BATTLE_STRING = "|init|battle"
+RENAME_STRING = "|noinit|rename|"
 CHAT_STRING = "|c|"
 TIME_LEFT = "Time left:"
 DETAILS = "details"
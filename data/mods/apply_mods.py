@@ -164,3 +164,6 @@ def apply_mods(gen, revert=False):
             constants.ICE_WEATHER = constants.HAIL  # ice-type weather was hail prior to gen9
         else:
             constants.ICE_WEATHER = constants.DEFAULT_ICE_WEATHER
+
+    # damage that was calculated using the previous generation's moves and pokedex is no longer correct
+    damage_calculator.clear_damage_cache()
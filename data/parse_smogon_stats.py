@@ -3,10 +3,9 @@ import ntpath
 from datetime import datetime
 from dateutil import relativedelta
 
-import requests
-
 from showdown.engine.helpers import spreads_are_alike
 from showdown.engine.helpers import normalize_name
+from showdown import http_session
 
 logger = logging.getLogger(__name__)
 
@@ -46,9 +45,9 @@ def pokemon_is_similar(normalized_name, list_of_pkmn_names):
 
 
 def get_pokemon_information(smogon_stats_url, pkmn_names=None):
-    r = requests.get(smogon_stats_url)
+    r = http_session.get(smogon_stats_url)
     if r.status_code == 404:
-        r = requests.get(get_smogon_stats_file_name(ntpath.basename(smogon_stats_url.replace('-0.json', '')), month_delta=2))
+        r = http_session.get(get_smogon_stats_file_name(ntpath.basename(smogon_stats_url.replace('-0.json', '')), month_delta=2))
 
     infos = r.json()['data']
     final_infos = {}
@@ -0,0 +1,92 @@
+import argparse
+import importlib
+import logging
+import os
+import sys
+
+from config import ShowdownConfig
+from data.mods.apply_mods import apply_mods
+from showdown.opening_book import load_opening_book
+from showdown.opening_book import save_opening_book
+from teams.load_team import TEAM_JSON_DIR
+
+from .builder import build_opening_book
+from .builder import create_team_request
+from .builder import get_generation
+from .previews import get_common_previews
+from .previews import read_previews_file
+
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(args):
+    parser = argparse.ArgumentParser(prog="python -m opening_book", description="Searches the team orders for an opening book")
+    parser.add_argument("--pokemon-mode", required=True, help="the format to search, i.e. gen8ou")
+    parser.add_argument("--teams", nargs="+", required=True, help="teams or directories of teams, relative to teams/teams like TEAM_NAME")
+    parser.add_argument("--previews", type=int, default=50, help="the number of the most common previews from smogon's usage stats to search")
+    parser.add_argument("--previews-file", help="a file with one preview per line (pokemon separated by '|') to search instead of the usage stats")
+    parser.add_argument("--battle-bot", default="safest")
+    parser.add_argument("--max-chosen-team-size", type=int, default=6)
+    parser.add_argument("--damage-calc-type", default="average")
+    parser.add_argument("--search-time-limit", type=float, default=0)
+    parser.add_argument("--output", default="opening_book.json", help="the opening book to add the team orders to. It is created if it does not exist")
+    return parser.parse_args(args)
+
+
+def get_team_files(team_names):
+    team_files = []
+    for name in team_names:
+        path = os.path.join(TEAM_JSON_DIR, name)
+        if os.path.isdir(path):
+            team_files.extend(sorted(
+                os.path.join(path, f) for f in os.listdir(path)
+                if os.path.isfile(os.path.join(path, f)) and not f.startswith('.')
+            ))
+        else:
+            team_files.append(path)
+    return team_files
+
+
+def main(args):
+    args = parse_args(args)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    # the settings a search reads from the environment when the bot is running
+    ShowdownConfig.pokemon_mode = args.pokemon_mode
+    ShowdownConfig.damage_calc_type = args.damage_calc_type
+    ShowdownConfig.search_time_limit = args.search_time_limit
+    ShowdownConfig.search_processes = 1
+    ShowdownConfig.search_probability_floor = 0
+    ShowdownConfig.max_set_hypotheses = 0
+    ShowdownConfig.set_hypotheses_probability = 1
+    apply_mods(get_generation(args.pokemon_mode))
+
+    team_requests = []
+    for team_file in get_team_files(args.teams):
+        with open(team_file) as f:
+            team_requests.append(create_team_request(f.read(), args.max_chosen_team_size))
+
+    if args.previews_file is not None:
+        previews = read_previews_file(args.previews_file)
+    else:
+        previews = get_common_previews(args.pokemon_mode, args.previews)
+    logger.info("Searching {} teams against {} previews".format(len(team_requests), len(previews)))
+
+    def log_entry(battle, team_order):
+        logger.info("{} vs {}: {}".format(
+            [p.name for p in battle.user.reserve],
+            [p.name for p in battle.opponent.reserve],
+            team_order
+        ))
+
+    battle_bot_module = importlib.import_module('showdown.battle_bots.{}.main'.format(args.battle_bot))
+    opening_book = load_opening_book(args.output)
+    build_opening_book(opening_book, battle_bot_module, args.pokemon_mode, team_requests, previews, on_entry=log_entry)
+    save_opening_book(opening_book, args.output)
+    logger.info("Wrote {} team orders to {}".format(len(opening_book), args.output))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
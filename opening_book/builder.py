@@ -0,0 +1,97 @@
+import asyncio
+import re
+
+import constants
+import data
+from data.helpers import get_standard_battle_sets
+from showdown.battle import Pokemon
+from showdown.battle_bots.helpers import transposition_table
+from showdown.opening_book import add_team_order
+from showdown.run_battle import pick_team_order
+from teams.team_converter import single_pokemon_export_to_dict
+
+
+REQUEST_STAT_NAMES = {stat: abbreviation for abbreviation, stat in constants.STAT_ABBREVIATION_LOOKUPS.items()}
+
+
+def get_generation(pokemon_battle_type):
+    return int(re.match(r'gen(\d+)', pokemon_battle_type).group(1))
+
+
+def create_team_request(team_export_string, max_chosen_team_size=6):
+    """
+    Creates the request that Pokemon Showdown sends at team preview for a team in the export format of `teams/teams`
+    """
+    request_pokemon = []
+    for pkmn_export_string in filter(None, team_export_string.strip().split('\n\n')):
+        pkmn_dict = single_pokemon_export_to_dict(pkmn_export_string)
+        level = int(pkmn_dict['level'] or 100)
+        pkmn = Pokemon(pkmn_dict['name'], level)
+        pkmn.set_spread(pkmn_dict['nature'] or 'serious', [int(ev or 0) for ev in pkmn_dict['evs'].values()])
+
+        request_pokemon.append({
+            constants.IDENT: "p1: {}".format(pkmn.name),
+            constants.DETAILS: "{}, L{}".format(pkmn.name, level),
+            constants.CONDITION: "{}/{}".format(pkmn.max_hp, pkmn.max_hp),
+            # like Pokemon Showdown, the first pokemon in the team is active during team preview
+            constants.ACTIVE: not request_pokemon,
+            constants.STATS: {REQUEST_STAT_NAMES[stat]: value for stat, value in pkmn.stats.items()},
+            constants.MOVES: pkmn_dict['moves'],
+            constants.REQUEST_DICT_ABILITY: pkmn_dict['ability'],
+            constants.ITEM: pkmn_dict['item'],
+        })
+
+    return {
+        constants.TEAM_PREVIEW: True,
+        constants.MAX_CHOSEN_TEAM_SIZE: max_chosen_team_size,
+        constants.SIDE: {constants.ID: "p1", constants.POKEMON: request_pokemon},
+        constants.RQID: 0
+    }
+
+
+def create_team_preview_battle(battle_bot_module, pokemon_battle_type, user_json, opponent_pokemon):
+    # the same steps run_battle takes to start a battle with team preview
+    battle = battle_bot_module.BattleBot("opening-book")
+    battle.opponent.name = "p2"
+    battle.battle_type = constants.STANDARD_BATTLE
+    battle.generation = get_generation(pokemon_battle_type)
+    battle.request_json = user_json
+    battle.initialize_team_preview(user_json, opponent_pokemon, pokemon_battle_type)
+    battle.during_team_preview()
+    return battle
+
+
+def load_usage_data(pokemon_battle_type, battles):
+    # the usage data is downloaded once for every pokemon in the book instead of once per battle
+    # effectiveness is only looked up for pokemon that are in the battle, so the extra pokemon do not change a search
+    pokemon_names = set(p.name for b in battles for p in b.opponent.reserve + b.user.reserve)
+    smogon_usage_data = get_standard_battle_sets(pokemon_battle_type, pokemon_names=pokemon_names)
+    data.pokemon_sets = smogon_usage_data
+    for pkmn, values in smogon_usage_data.items():
+        data.effectiveness[pkmn] = values["effectiveness"]
+
+
+def build_opening_book(opening_book, battle_bot_module, pokemon_battle_type, team_requests, previews, on_entry=None):
+    """
+    Searches the team order for every team in `team_requests` against every preview in `previews`
+    and adds them to `opening_book`
+
+    :param team_requests: a list of requests from create_team_request
+    :param previews: a list of the names of the opponent's pokemon in each preview
+    :param on_entry: an optional function called with (battle, team_order) after each search
+    """
+    battles = [
+        create_team_preview_battle(battle_bot_module, pokemon_battle_type, user_json, opponent_pokemon)
+        for user_json in team_requests
+        for opponent_pokemon in previews
+    ]
+    load_usage_data(pokemon_battle_type, battles)
+
+    for battle in battles:
+        transposition_table.clear()
+        team_order = asyncio.run(pick_team_order(battle))
+        add_team_order(opening_book, pokemon_battle_type, battle, team_order)
+        if on_entry is not None:
+            on_entry(battle, team_order)
+
+    return opening_book
@@ -0,0 +1,45 @@
+import requests
+
+from data.parse_smogon_stats import get_smogon_stats_file_name
+
+
+TEAM_SIZE = 6
+
+
+def get_common_previews(pokemon_battle_type, number_of_previews):
+    """
+    Creates the team previews that are most likely to be seen in `pokemon_battle_type` from smogon's usage stats
+
+    Each of the most used pokemon starts a team. The pokemon that is seen the most with the rest of
+    the team is added to it until it has 6 pokemon. Teams that end up the same are only returned once.
+    """
+    r = requests.get(get_smogon_stats_file_name(pokemon_battle_type))
+    r.raise_for_status()
+    usage = r.json()['data']
+
+    previews = []
+    for pkmn in sorted(usage, key=lambda p: usage[p]['usage'], reverse=True):
+        if len(previews) >= number_of_previews:
+            break
+
+        team = [pkmn]
+        while len(team) < TEAM_SIZE:
+            teammate_scores = dict()
+            for teammate in team:
+                for other, score in usage[teammate]['Teammates'].items():
+                    if other in usage and other not in team:
+                        teammate_scores[other] = teammate_scores.get(other, 0) + score
+            if not teammate_scores:
+                break
+            team.append(max(teammate_scores, key=teammate_scores.get))
+
+        if len(team) == TEAM_SIZE and sorted(team) not in (sorted(p) for p in previews):
+            previews.append(team)
+
+    return previews
+
+
+def read_previews_file(path):
+    # one preview per line with the pokemon separated by '|'
+    with open(path) as f:
+        return [line.strip().split('|') for line in f if line.strip()]
@@ -1,8 +1,8 @@
+import heapq
 import itertools
 from collections import defaultdict
 from collections import namedtuple
 from copy import copy
-from copy import deepcopy
 from abc import ABC
 from abc import abstractmethod
 
@@ -53,6 +53,53 @@ smart_team_preview = {
 }
 
 
+def normalize_weights(weighted_options):
+    total = sum(w for _, w in weighted_options)
+    if total <= 0:
+        return [(o, 1 / len(weighted_options)) for o, _ in weighted_options]
+    return [(o, w / total) for o, w in weighted_options]
+
+
+def get_ranked_combinations(*weighted_options):
+    """
+    Yields (probability, combination) for every combination of one option from each of `weighted_options`,
+    from the most likely combination to the least likely
+
+    Each of `weighted_options` is a list of (option, weight). The weights of each list are normalized,
+    so the probabilities of all of the combinations add up to 1. A combination is only created when it is
+    reached, so stopping early does not pay for the combinations that were not used
+    """
+    if not all(weighted_options):
+        return
+
+    weighted_options = [
+        sorted(normalize_weights(options), key=lambda x: x[1], reverse=True)
+        for options in weighted_options
+    ]
+
+    def probability(indices):
+        p = 1
+        for options, i in zip(weighted_options, indices):
+            p *= options[i][1]
+        return p
+
+    # best-first search over the indices into each sorted list
+    # the next most likely combination is always one index further than a combination that was already yielded
+    start = (0,) * len(weighted_options)
+    heap = [(-probability(start), start)]
+    seen = {start}
+    while heap:
+        negative_probability, indices = heapq.heappop(heap)
+        yield -negative_probability, tuple(options[i][0] for options, i in zip(weighted_options, indices))
+
+        for n in range(len(indices)):
+            if indices[n] + 1 < len(weighted_options[n]):
+                next_indices = indices[:n] + (indices[n] + 1,) + indices[n+1:]
+                if next_indices not in seen:
+                    seen.add(next_indices)
+                    heapq.heappush(heap, (-probability(next_indices), next_indices))
+
+
 class Battle(ABC):
 
     def __init__(self, battle_tag):
@@ -78,6 +125,14 @@ class Battle(ABC):
 
         self.request_json = None
 
+    def clone(self):
+        # a copy that can be changed without changing this battle
+        # only the parts that are changed in-place are copied, everything else (i.e. the request) is shared
+        battle = copy(self)
+        battle.user = self.user.clone()
+        battle.opponent = self.opponent.clone()
+        return battle
+
     def initialize_team_preview(self, user_json, opponent_pokemon, battle_type):
         self.user.from_json(user_json, first_turn=True)
         if constants.MAX_CHOSEN_TEAM_SIZE in user_json:
@@ -124,11 +179,35 @@ class Battle(ABC):
                 'nationaldex' in ShowdownConfig.pokemon_mode
         )
 
-    def prepare_battles(self, guess_mega_evo_opponent=True, join_moves_together=False):
+    def prepare_battles(self, guess_mega_evo_opponent=True, join_moves_together=False, max_battles=None, probability_cutoff=None):
         """Returns a list of battles based on this one
         The battles have the opponent's reserve pokemon's unknowns filled in
-        The opponent's active pokemon in each of the battles has a different set"""
-        battle_copy = deepcopy(self)
+        The opponent's active pokemon in each of the battles has a different set
+
+        The battles are ordered from the most to the least likely set. Only the `max_battles` most likely
+        sets are used, and no more sets are used once the sets that were used are at least `probability_cutoff`
+        likely. Both default to the settings in ShowdownConfig"""
+        if max_battles is None:
+            max_battles = ShowdownConfig.max_set_hypotheses
+        if probability_cutoff is None:
+            probability_cutoff = ShowdownConfig.set_hypotheses_probability
+
+        battles = list()
+        cumulative_probability = 0
+        for probability, battle in self.generate_battles(guess_mega_evo_opponent, join_moves_together):
+            battles.append(battle)
+            cumulative_probability += probability
+            if (max_battles and len(battles) >= max_battles) or (probability_cutoff < 1 and cumulative_probability >= probability_cutoff):
+                break
+
+        return battles
+
+    def generate_battles(self, guess_mega_evo_opponent=True, join_moves_together=False):
+        """Yields (probability, battle) for each of the sets the opponent's active pokemon could have,
+        from the most likely set to the least likely
+        The probability is the joint usage of the set's spread, item, ability and moves
+        Sets that do not make sense are skipped before their battle is created"""
+        battle_copy = self.clone()
         battle_copy.opponent.lock_moves()
         battle_copy.user.lock_active_pkmn_first_turn_moves()
 
@@ -151,7 +230,8 @@ class Battle(ABC):
         except KeyError:
             logger.warning("No sets for {}, trying to find most likely attributes".format(battle_copy.opponent.active.name))
             battle_copy.opponent.active.guess_most_likely_attributes()
-            return [battle_copy]
+            yield 1, battle_copy
+            return
 
         possible_spreads = sorted(pokemon_sets[SPREADS_STRING], key=lambda x: x[2], reverse=True)
         possible_abilities = sorted(pokemon_sets[ABILITY_STRING], key=lambda x: x[1], reverse=True)
@@ -163,52 +243,66 @@ class Battle(ABC):
         abilities = battle_copy.opponent.active.get_possible_abilities(possible_abilities)
         expected_moves, chance_moves = battle_copy.opponent.active.get_possible_moves(possible_moves, battle_copy.battle_type)
 
+        # the usage of each option is its weight. Options without usage (i.e. a revealed item) are certain
+        spread_usage = {tuple(s[:2]): s[2] for s in possible_spreads}
+        item_usage = dict(possible_items)
+        ability_usage = dict(possible_abilities)
+        move_usage = dict(possible_moves)
+
         if join_moves_together:
-            chance_move_combinations = [chance_moves]
+            chance_move_combinations = [(tuple(chance_moves), 1)]
         else:
             number_of_unknown_moves = max(4 - len(battle_copy.opponent.active.moves) - len(expected_moves), 0)
-            chance_move_combinations = list(itertools.combinations(chance_moves, number_of_unknown_moves))
-
-        combinations = list(itertools.product(spreads, items, abilities, chance_move_combinations))
-
-        # create battle clones for each of the combinations
-        battles = list()
-        for c in combinations:
-            new_battle = deepcopy(battle_copy)
-
-            all_moves = [m.name for m in new_battle.opponent.active.moves]
-            all_moves += expected_moves
-            all_moves += c[3]
-            all_moves = [Move(m) for m in all_moves]
-
-            if join_moves_together or set_makes_sense(c[0][0], c[0][1], c[1], c[2], all_moves):
-                new_battle.opponent.active.set_spread(c[0][0], c[0][1])
-                if new_battle.opponent.active.name == 'ditto':
-                    new_battle.opponent.active.stats = battle_copy.opponent.active.stats
-                new_battle.opponent.active.item = c[1]
-                new_battle.opponent.active.ability = c[2]
-                for m in expected_moves:
-                    new_battle.opponent.active.add_move(m)
-                for m in c[3]:
-                    new_battle.opponent.active.add_move(m)
-
-                logger.debug("Possible set for opponent's {}:\t{} {} {} {} {}".format(battle_copy.opponent.active.name, c[0][0], c[0][1], c[1], c[2], all_moves))
-                battles.append(new_battle)
+            chance_move_combinations = []
+            for moves in itertools.combinations(chance_moves, number_of_unknown_moves):
+                usage = 1
+                for m in moves:
+                    usage *= move_usage.get(m, 1)
+                chance_move_combinations.append((moves, usage))
+
+        combinations = get_ranked_combinations(
+            [(s, spread_usage.get(tuple(s), 1)) for s in spreads],
+            [(i, item_usage.get(i, 1)) for i in items],
+            [(a, ability_usage.get(a, 1)) for a in abilities],
+            chance_move_combinations
+        )
 
+        known_moves = [m.name for m in battle_copy.opponent.active.moves]
+        any_battles = False
+        for probability, (spread, item, ability, moves) in combinations:
+            all_moves = [Move(m) for m in known_moves + expected_moves + list(moves)]
+            if not join_moves_together and not set_makes_sense(spread[0], spread[1], item, ability, all_moves):
+                continue
+
+            new_battle = battle_copy.clone()
+            new_battle.opponent.active.set_spread(spread[0], spread[1])
+            if new_battle.opponent.active.name == 'ditto':
+                new_battle.opponent.active.stats = battle_copy.opponent.active.stats
+            new_battle.opponent.active.item = item
+            new_battle.opponent.active.ability = ability
+            for m in expected_moves:
+                new_battle.opponent.active.add_move(m)
+            for m in moves:
+                new_battle.opponent.active.add_move(m)
             new_battle.opponent.lock_moves()
 
-        return battles if battles else [battle_copy]
+            logger.debug("Possible set for opponent's {}:\t{} {} {} {} {} {:.3f}".format(battle_copy.opponent.active.name, spread[0], spread[1], item, ability, all_moves, probability))
+            any_battles = True
+            yield probability, new_battle
+
+        if not any_battles:
+            yield 1, battle_copy
 
     def create_state(self):
-        user_active = TransposePokemon.from_state_pokemon_dict(self.user.active.to_dict())
+        user_active = self.user.active.to_transpose_pokemon()
         user_reserve = dict()
         for mon in self.user.reserve:
-            user_reserve[mon.name] = TransposePokemon.from_state_pokemon_dict(mon.to_dict())
+            user_reserve[mon.name] = mon.to_transpose_pokemon()
 
-        opponent_active = TransposePokemon.from_state_pokemon_dict(self.opponent.active.to_dict())
+        opponent_active = self.opponent.active.to_transpose_pokemon()
         opponent_reserve = dict()
         for mon in self.opponent.reserve:
-            opponent_reserve[mon.name] = TransposePokemon.from_state_pokemon_dict(mon.to_dict())
+            opponent_reserve[mon.name] = mon.to_transpose_pokemon()
 
         user = Side(user_active, user_reserve, copy(self.user.wish), copy(self.user.side_conditions), copy(self.user.future_sight))
         opponent = Side(opponent_active, opponent_reserve, copy(self.opponent.wish), copy(self.opponent.side_conditions), copy(self.opponent.future_sight))
@@ -279,7 +373,7 @@ class Battler:
     def __init__(self):
         self.active = None
         self.reserve = []
-        self.side_conditions = defaultdict(lambda: 0)
+        self.side_conditions = defaultdict(int)
 
         self.name = None
         self.trapped = False
@@ -290,6 +384,13 @@ class Battler:
 
         self.last_used_move = LastUsedMove('', '', 0)
 
+    def clone(self):
+        battler = copy(self)
+        battler.active = self.active.clone() if self.active is not None else None
+        battler.reserve = [p.clone() if p is not self.active else battler.active for p in self.reserve]
+        battler.side_conditions = copy(self.side_conditions)
+        return battler
+
     def mega_revealed(self):
         return self.active.is_mega or any(p.is_mega for p in self.reserve)
 
@@ -502,6 +603,16 @@ class Pokemon:
         self.can_have_heavydutyboots = True
         self.seen = False
 
+    def clone(self):
+        # the pokedex data (base stats, types) is shared, it is only ever replaced
+        pkmn = Pokemon.__new__(Pokemon)
+        pkmn.__dict__ = self.__dict__.copy()
+        pkmn.stats = self.stats.copy()
+        pkmn.boosts = copy(self.boosts)
+        pkmn.volatile_statuses = self.volatile_statuses.copy()
+        pkmn.moves = [copy(m) for m in self.moves]
+        return pkmn
+
     def forme_change(self, new_pkmn_name):
         hp_percent = float(self.hp) / self.max_hp
         moves = self.moves
@@ -722,6 +833,37 @@ class Pokemon:
             constants.SEEN: self.seen
         }
 
+    def to_transpose_pokemon(self):
+        # the same as TransposePokemon.from_state_pokemon_dict(self.to_dict()) without building the dictionary
+        return TransposePokemon(
+            self.name,
+            self.level,
+            self.types,
+            self.hp,
+            self.max_hp,
+            self.ability,
+            self.item,
+            self.stats[constants.ATTACK],
+            self.stats[constants.DEFENSE],
+            self.stats[constants.SPECIAL_ATTACK],
+            self.stats[constants.SPECIAL_DEFENSE],
+            self.stats[constants.SPEED],
+            self.nature,
+            self.evs,
+            self.boosts[constants.ATTACK],
+            self.boosts[constants.DEFENSE],
+            self.boosts[constants.SPECIAL_ATTACK],
+            self.boosts[constants.SPECIAL_DEFENSE],
+            self.boosts[constants.SPEED],
+            self.boosts[constants.ACCURACY],
+            self.boosts[constants.EVASION],
+            self.status,
+            self.terastallized,
+            set(self.volatile_statuses),
+            [m.to_dict() for m in self.moves],
+            self.seen
+        )
+
     @classmethod
     def get_dummy(cls):
         p = Pokemon('pikachu', 100)
@@ -751,6 +893,12 @@ class Move:
         self.can_z = False
         self.current_pp = self.max_pp
 
+    def __copy__(self):
+        # a battle is cloned for every decision, copy.copy's generic path is several times slower than this
+        move = Move.__new__(Move)
+        move.__dict__ = self.__dict__.copy()
+        return move
+
     def to_dict(self):
         return {
             "id": self.name,
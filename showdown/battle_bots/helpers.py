@@ -4,15 +4,37 @@ import constants
 import time
 
 import data
+from config import ShowdownConfig
 from showdown.engine.objects import StateMutator
 from showdown.engine.select_best_move import pick_safest
 from showdown.engine.select_best_move import get_payoff_matrix
+from showdown.engine.select_best_move import get_joint_payoff_matrices
+from showdown.engine.select_best_move import order_options
+from showdown.engine.select_best_move import SearchTimeout
+from showdown.engine.transposition_table import TranspositionTable
+from showdown.engine.search_cache import SearchCache
+from showdown.engine.search_cache import get_search_cache_key
+from showdown.engine.move_ordering import MoveOrdering
+from showdown.engine.parallel import get_process_pool
+from showdown.engine.parallel import get_search_settings
+from showdown.engine.parallel import get_payoff_matrices_in_parallel
 from showdown.engine.damage_calculator import type_effectiveness_modifier
 from showdown.engine.helpers import normalize_name
 
 
 logger = logging.getLogger(__name__)
 
+# remembers searched states between decisions
+# this is cleared at the start of every battle
+transposition_table = TranspositionTable()
+
+# remembers the results of searches between battles
+# this is disabled unless SEARCH_CACHE_PATH is set
+search_cache = SearchCache()
+
+# iterative deepening stops at this depth even if there is time left
+MAX_ITERATIVE_DEEPENING_DEPTH = 10
+
 
 def format_decision(battle, decision):
     # Formats a decision for communication with Pokemon-Showdown
@@ -73,17 +95,101 @@ def prefix_opponent_move(score_lookup, prefix):
     return new_score_lookup
 
 
-def pick_safest_move_from_battles(battles):
-    all_scores = dict()
+def get_payoff_matrices(battles, search_depth, team_preview=False, prune=True, deadline=None, move_ordering=None, best_move_pairs=None):
+    """
+    Searches every battle to `search_depth`, returning a list of the payoff matrix for each battle
+
+    The battles are the hypotheses about the opponent's sets from Battle.prepare_battles.
+    Hypotheses that create the same state are only searched once, and the rest are searched together
+    so that an option that is not the safest in one hypothesis is not searched in any of the others.
+
+    If `best_move_pairs` is given, the move-pair for each battle is searched first.
+    If SEARCH_PROCESSES is more than 1 the search of each battle's options is split between that many processes.
+    Outcomes of a turn that are less likely than SEARCH_PROBABILITY_FLOOR are not searched.
+    If SEARCH_CACHE_PATH is set the payoff matrices of a search that was done before are read from the cache
+    instead of searching again, and the payoff matrices of a new search are written to it.
+
+    """
+    states_and_options = []
+    unique_indices = dict()
+    duplicate_of = []
     for i, b in enumerate(battles):
+        user_options, opponent_options = b.get_all_options(team_preview)
+        if best_move_pairs is not None and best_move_pairs[i] is not None:
+            user_options, opponent_options = order_options(user_options, opponent_options, best_move_pairs[i])
+
         state = b.create_state()
-        mutator = StateMutator(state)
-        user_options, opponent_options = b.get_all_options()
-        logger.debug("Searching through the state: {}".format(mutator.state))
-        scores = get_payoff_matrix(mutator, user_options, opponent_options, prune=True)
+        key = (state.zobrist_hash(), tuple(sorted(opponent_options)))
+        if key in unique_indices:
+            duplicate_of.append(unique_indices[key])
+            continue
+
+        unique_indices[key] = len(states_and_options)
+        duplicate_of.append(len(states_and_options))
+        states_and_options.append((state, user_options, opponent_options))
+
+    if len(states_and_options) < len(battles):
+        logger.debug("Searching {} unique states out of {} battles".format(len(states_and_options), len(battles)))
+
+    search_cache_key = None
+    if search_cache.connection is not None:
+        search_cache_key = get_search_cache_key(states_and_options, search_depth, prune, battles[0].generation)
+        payoff_matrices = search_cache.get(search_cache_key)
+        if payoff_matrices is not None:
+            logger.debug("Found the payoff matrices in the search cache")
+            return [dict(payoff_matrices[i]) for i in duplicate_of]
+
+    if ShowdownConfig.search_processes > 1:
+        pool = get_process_pool(ShowdownConfig.search_processes, battles[0].generation)
+        search_settings = get_search_settings(transposition_table.max_size)
+        payoff_matrices = get_payoff_matrices_in_parallel(pool, search_settings, states_and_options, depth=search_depth, prune=prune, deadline=deadline)
+
+    # hypotheses can only be searched together if the bot has the same options in all of them
+    elif all(user_options == states_and_options[0][1] for _, user_options, _ in states_and_options):
+        mutators = [StateMutator(state) for state, _, _ in states_and_options]
+        for mutator in mutators:
+            logger.debug("Searching through the state: {}".format(mutator.state))
+        payoff_matrices = get_joint_payoff_matrices(
+            mutators,
+            states_and_options[0][1],
+            [opponent_options for _, _, opponent_options in states_and_options],
+            depth=search_depth,
+            prune=prune,
+            transposition_table=transposition_table,
+            deadline=deadline,
+            move_ordering=move_ordering,
+            probability_floor=ShowdownConfig.search_probability_floor
+        )
 
-        prefixed_scores = prefix_opponent_move(scores, str(i))
-        all_scores = {**all_scores, **prefixed_scores}
+    else:
+        payoff_matrices = []
+        for state, user_options, opponent_options in states_and_options:
+            mutator = StateMutator(state)
+            logger.debug("Searching through the state: {}".format(mutator.state))
+            payoff_matrices.append(
+                get_payoff_matrix(mutator, user_options, opponent_options, depth=search_depth, prune=prune, transposition_table=transposition_table, deadline=deadline, move_ordering=move_ordering, probability_floor=ShowdownConfig.search_probability_floor)
+            )
+
+    # a search that ran out of time raised SearchTimeout, so every search that gets here finished
+    if search_cache_key is not None:
+        search_cache.store(search_cache_key, payoff_matrices)
+
+    return [dict(payoff_matrices[i]) for i in duplicate_of]
+
+
+def combine_payoff_matrices(payoff_matrices):
+    # the opponent's moves in each battle are different options for the opponent
+    if len(payoff_matrices) == 1:
+        return payoff_matrices[0]
+
+    all_scores = dict()
+    for i, scores in enumerate(payoff_matrices):
+        all_scores = {**all_scores, **prefix_opponent_move(scores, str(i))}
+    return all_scores
+
+
+def pick_safest_move_from_battles(battles):
+    all_scores = combine_payoff_matrices(get_payoff_matrices(battles, 2, move_ordering=MoveOrdering()))
 
     decision, payoff = pick_safest(all_scores, remove_guaranteed=True)
     bot_choice = decision[0]
@@ -91,6 +197,61 @@ def pick_safest_move_from_battles(battles):
     return bot_choice
 
 
+def search_battles_to_depth(battles, search_depth, best_move_pairs, move_ordering, team_preview=False, deadline=None):
+    # searches every battle to `search_depth`, searching the move-pair in `best_move_pairs` first
+    # `best_move_pairs` is updated with the safest move-pair found for each battle
+    payoff_matrices = get_payoff_matrices(
+        battles,
+        search_depth,
+        team_preview=team_preview,
+        deadline=deadline,
+        move_ordering=move_ordering,
+        best_move_pairs=best_move_pairs
+    )
+    all_scores = combine_payoff_matrices(payoff_matrices)
+
+    # every battle searches the safest option over all of the battles first so they can be searched together
+    safest_user_move = pick_safest(all_scores)[0][0]
+    for i, scores in enumerate(payoff_matrices):
+        best_move_pairs[i] = safest_user_move, pick_safest(scores)[0][1]
+
+    return all_scores
+
+
+def pick_safest_move_using_iterative_deepening(battles, time_limit, team_preview=False):
+    """
+    Searches one turn deeper at a time until `time_limit` seconds have passed.
+
+    The scores from the deepest search that finished are used. A search of depth 1 always finishes
+    so that there is a move to choose even if the time limit is very small.
+
+    """
+    start_time = time.time()
+    deadline = start_time + time_limit
+
+    max_depth = MAX_ITERATIVE_DEEPENING_DEPTH
+    if team_preview and any(b.max_chosen_team_size not in [1, 6] for b in battles):
+        max_depth = 2
+
+    # the killer moves and history found by each search are used to order the next, deeper search
+    move_ordering = MoveOrdering()
+    best_move_pairs = [None] * len(battles)
+    all_scores = search_battles_to_depth(battles, 1, best_move_pairs, move_ordering, team_preview=team_preview)
+    search_depth = 1
+    logger.debug("Finished depth 1 in {} s".format(time.time() - start_time))
+
+    while search_depth < max_depth:
+        try:
+            all_scores = search_battles_to_depth(battles, search_depth + 1, best_move_pairs, move_ordering, team_preview=team_preview, deadline=deadline)
+        except SearchTimeout:
+            logger.debug("Ran out of time searching depth {}".format(search_depth + 1))
+            break
+        search_depth += 1
+        logger.debug("Finished depth {} in {} s".format(search_depth, time.time() - start_time))
+
+    return all_scores, search_depth
+
+
 def pick_safest_move_using_dynamic_search_depth(battles, team_preview=False):
     """
     Dynamically decides how far to look into the game.
@@ -98,42 +259,34 @@ def pick_safest_move_using_dynamic_search_depth(battles, team_preview=False):
     This requires a strong computer to be able to search 3/4 turns ahead.
     Using a pypy interpreter will also result in better performance.
 
+    If SEARCH_TIME_LIMIT is set the search is deepened until the time limit is reached instead.
+
     """
     all_scores = dict()
     num_battles = len(battles)
 
-    if num_battles > 1:
+    if num_battles > 0 and ShowdownConfig.search_time_limit > 0:
+        all_scores, search_depth = pick_safest_move_using_iterative_deepening(battles, ShowdownConfig.search_time_limit, team_preview)
+
+    elif num_battles > 1:
         search_depth = 2
 
-        for i, b in enumerate(battles):
-            state = b.create_state()
-            mutator = StateMutator(state)
+        for b in battles:
             user_options, opponent_options = b.get_all_options(team_preview)
-
-            num_user_options = len(user_options)
-            num_opponent_options = len(opponent_options)
-            options_product = num_user_options * num_opponent_options
-
-            search_depth = search_depth if not team_preview or b.max_chosen_team_size in [1, 6] else 2
-            logger.debug("Searching through the state: {}".format(mutator.state))
-            logger.debug("Options Product: {}".format(options_product))
+            logger.debug("Options Product: {}".format(len(user_options) * len(opponent_options)))
             logger.debug("My Options: {}".format(user_options))
             logger.debug("Opponent Options: {}".format(opponent_options))
-            logger.debug("Search depth: {}".format(search_depth))
-            start_time = time.time()
-            scores = get_payoff_matrix(mutator, user_options, opponent_options, depth=search_depth, prune=True)
-            prefixed_scores = prefix_opponent_move(scores, str(i))
-            all_scores = {**all_scores, **prefixed_scores}
-            end_time = time.time()
-            elapsed_time = end_time - start_time
-            logger.debug(f"Elapsed time: {elapsed_time} s")
+        logger.debug("Search depth: {}".format(search_depth))
+        start_time = time.time()
+        all_scores = combine_payoff_matrices(get_payoff_matrices(battles, search_depth, team_preview=team_preview, move_ordering=MoveOrdering()))
+        end_time = time.time()
+        elapsed_time = end_time - start_time
+        logger.debug(f"Elapsed time: {elapsed_time} s")
 
     elif num_battles == 1:
         search_depth = 3
 
         b = battles[0]
-        state = b.create_state()
-        mutator = StateMutator(state)
         user_options, opponent_options = b.get_all_options(team_preview)
 
         num_user_options = len(user_options)
@@ -144,13 +297,12 @@ def pick_safest_move_using_dynamic_search_depth(battles, team_preview=False):
             search_depth += 1
 
         search_depth = search_depth if not team_preview or b.max_chosen_team_size in [1, 6] else 2
-        logger.debug("Searching through the state: {}".format(mutator.state))
         logger.debug("Options Product: {}".format(options_product))
         logger.debug("My Options: {}".format(user_options))
         logger.debug("Opponent Options: {}".format(opponent_options))
         logger.debug("Search depth: {}".format(search_depth))
         start_time = time.time()
-        all_scores = get_payoff_matrix(mutator, user_options, opponent_options, depth=search_depth, prune=True)
+        all_scores = get_payoff_matrices(battles, search_depth, team_preview=team_preview, move_ordering=MoveOrdering())[0]
         end_time = time.time()
         elapsed_time = end_time - start_time
         logger.debug(f"Elapsed time: {elapsed_time} s")
@@ -163,4 +315,5 @@ def pick_safest_move_using_dynamic_search_depth(battles, team_preview=False):
     logger.debug("Scores: {}".format(all_scores))
     logger.debug("Safest: {}, {}".format(bot_choice, payoff))
     logger.debug("Depth: {}".format(search_depth))
+    logger.debug("Transposition table size: {}".format(len(transposition_table)))
     return bot_choice
@@ -0,0 +1,195 @@
+import math
+import time
+import random
+import logging
+from collections import defaultdict
+
+from config import ShowdownConfig
+from showdown.battle import Battle
+from showdown.engine.objects import StateMutator
+from showdown.engine.find_state_instructions import get_all_state_instructions
+from showdown.engine.select_best_move import WON_BATTLE
+
+from ..helpers import format_decision
+
+
+logger = logging.getLogger(__name__)
+
+# used when SEARCH_TIME_LIMIT is not set
+DEFAULT_SEARCH_TIME_LIMIT = 5
+
+# evaluations are squashed into [0, 1] so that the exploration constant does not depend on the size of the scores
+# an evaluation of +/- EVALUATION_SCALE is a reward of about 0.73 / 0.27
+EVALUATION_SCALE = 100
+EXPLORATION_CONSTANT = math.sqrt(2)
+
+
+def get_reward(mutator):
+    score = mutator.evaluate()
+    winner = mutator.state.battle_is_finished()
+    if winner:
+        score += WON_BATTLE * winner
+
+    # this is the logistic function written with tanh so that large scores cannot overflow
+    return 0.5 + 0.5 * math.tanh(score / (2 * EVALUATION_SCALE))
+
+
+class MoveStatistics:
+    __slots__ = ('visits', 'total_reward')
+
+    def __init__(self):
+        self.visits = 0
+        self.total_reward = 0
+
+    def mean_reward(self):
+        return self.total_reward / self.visits
+
+
+class DecoupledUCTNode:
+    """
+    A state in the search tree
+
+    Each side chooses its move independently using UCB1 on the statistics of its own moves (decoupled UCT),
+    which lets the tree handle both sides choosing their moves at the same time.
+    The bot tries to maximize the reward and the opponent tries to minimize it.
+    """
+
+    __slots__ = ('user_statistics', 'opponent_statistics', 'visits', 'outcomes', 'children')
+
+    def __init__(self, user_options, opponent_options):
+        self.user_statistics = {o: MoveStatistics() for o in user_options}
+        self.opponent_statistics = {o: MoveStatistics() for o in opponent_options}
+        self.visits = 0
+
+        # (user_move, opponent_move) -> the TransposeInstructions for that move-pair
+        self.outcomes = dict()
+
+        # (user_move, opponent_move, outcome index) -> DecoupledUCTNode
+        self.children = dict()
+
+    def _select(self, statistics, maximize):
+        log_visits = math.log(self.visits) if self.visits else 0
+        best_option = None
+        best_value = float('-inf')
+        for option, stats in statistics.items():
+            if stats.visits == 0:
+                return option
+
+            mean_reward = stats.mean_reward()
+            if not maximize:
+                mean_reward = 1 - mean_reward
+
+            value = mean_reward + EXPLORATION_CONSTANT * math.sqrt(log_visits / stats.visits)
+            if value > best_value:
+                best_value = value
+                best_option = option
+
+        return best_option
+
+    def select_user_move(self):
+        return self._select(self.user_statistics, maximize=True)
+
+    def select_opponent_move(self):
+        return self._select(self.opponent_statistics, maximize=False)
+
+    def get_outcomes(self, mutator, user_move, opponent_move):
+        key = (user_move, opponent_move)
+        if key not in self.outcomes:
+            self.outcomes[key] = get_all_state_instructions(mutator, user_move, opponent_move)
+        return self.outcomes[key]
+
+    def update(self, user_move, opponent_move, reward):
+        self.visits += 1
+
+        user_stats = self.user_statistics[user_move]
+        user_stats.visits += 1
+        user_stats.total_reward += reward
+
+        opponent_stats = self.opponent_statistics[opponent_move]
+        opponent_stats.visits += 1
+        opponent_stats.total_reward += reward
+
+
+def run_iteration(mutator, root):
+    # walks down the tree until a new state is found, scores that state, and updates every state on the way
+    node = root
+    path = []
+    applied_instructions = []
+    try:
+        while True:
+            if mutator.state.battle_is_finished():
+                reward = get_reward(mutator)
+                break
+
+            user_move = node.select_user_move()
+            opponent_move = node.select_opponent_move()
+            outcomes = node.get_outcomes(mutator, user_move, opponent_move)
+
+            # chance is sampled instead of expanded
+            outcome_index = random.choices(range(len(outcomes)), weights=[o.percentage for o in outcomes])[0]
+            instructions = outcomes[outcome_index].compiled()
+            mutator.apply_compiled(instructions)
+            applied_instructions.append(instructions)
+            path.append((node, user_move, opponent_move))
+
+            child_key = (user_move, opponent_move, outcome_index)
+            child = node.children.get(child_key)
+            if child is None:
+                node.children[child_key] = DecoupledUCTNode(*mutator.state.get_all_options())
+                reward = get_reward(mutator)
+                break
+
+            node = child
+    finally:
+        for instructions in reversed(applied_instructions):
+            mutator.reverse_compiled(instructions)
+
+    for node, user_move, opponent_move in path:
+        node.update(user_move, opponent_move, reward)
+
+
+def search(mutator, user_options, opponent_options, deadline, max_iterations=None):
+    """
+    Runs decoupled UCT from the mutator's state until `deadline` or until `max_iterations` have been run
+
+    :return: the root DecoupledUCTNode of the search
+    """
+    root = DecoupledUCTNode(user_options, opponent_options)
+    iterations = 0
+    while time.time() < deadline and (max_iterations is None or iterations < max_iterations):
+        run_iteration(mutator, root)
+        iterations += 1
+
+    logger.debug("Ran {} iterations".format(iterations))
+    return root
+
+
+def pick_move_using_mcts(battles, time_limit, team_preview=False, max_iterations=None):
+    # each battle gets an equal share of the time
+    # the bot's move is the one that was chosen the most often over all of the battles
+    time_per_battle = time_limit / len(battles)
+    move_visit_fractions = defaultdict(float)
+    for b in battles:
+        mutator = StateMutator(b.create_state())
+        user_options, opponent_options = b.get_all_options(team_preview)
+        logger.debug("Searching through the state: {}".format(mutator.state))
+
+        root = search(mutator, user_options, opponent_options, time.time() + time_per_battle, max_iterations=max_iterations)
+        for move, stats in root.user_statistics.items():
+            move_visit_fractions[move] += stats.visits / root.visits if root.visits else 0
+            logger.debug("{}: visits={} reward={}".format(move, stats.visits, stats.mean_reward() if stats.visits else None))
+
+    choice = max(move_visit_fractions, key=lambda m: move_visit_fractions[m])
+    logger.debug("Choice: {}".format(choice))
+    return choice
+
+
+class BattleBot(Battle):
+    def __init__(self, *args, **kwargs):
+        super(BattleBot, self).__init__(*args, **kwargs)
+
+    def find_best_move(self, team_preview=False):
+        battles = self.prepare_battles(join_moves_together=True)
+        time_limit = ShowdownConfig.search_time_limit or DEFAULT_SEARCH_TIME_LIMIT
+        choice = pick_move_using_mcts(battles, time_limit, team_preview)
+        return format_decision(self, choice)
@@ -1,6 +1,6 @@
 import constants
 from showdown.battle import Battle
-from showdown.engine.damage_calculator import calculate_damage
+from showdown.engine.damage_matrix import get_damage_matrix
 from ..helpers import format_decision
 
 
@@ -25,10 +25,9 @@ class BattleBot(Battle):
 
         most_damage = -1
         choice = None
+        damage_matrix = get_damage_matrix(state, moves, [constants.DO_NOTHING_MOVE])
         for move in moves:
-            damage_amounts = calculate_damage(state, constants.USER, move, constants.DO_NOTHING_MOVE)
-
-            damage = damage_amounts[0] if damage_amounts else 0
+            damage = damage_matrix[(move, constants.DO_NOTHING_MOVE)].user_damage
 
             if damage > most_damage:
                 choice = move
@@ -10,12 +10,11 @@ from nashpy import Game
 import config
 from showdown.battle import Battle
 from showdown.engine.select_best_move import remove_guaranteed_opponent_moves
-from showdown.engine.objects import StateMutator
 from showdown.engine.select_best_move import pick_safest
-from showdown.engine.select_best_move import get_payoff_matrix
 
 from ..safest.main import pick_safest_move_using_dynamic_search_depth
 from ..helpers import format_decision
+from ..helpers import get_payoff_matrices
 
 
 logger = logging.getLogger(__name__)
@@ -179,15 +178,7 @@ class BattleBot(Battle):
             battles = self.prepare_battles(join_moves_together=True)
             decision = pick_safest_move_using_dynamic_search_depth(battles, team_preview)
         else:
-            list_of_payoffs = list()
-            for b in battles:
-                state = b.create_state()
-                mutator = StateMutator(state)
-                logger.debug("Attempting to find best move from: {}".format(mutator.state))
-                user_options, opponent_options = b.get_all_options(team_preview)
-                scores = get_payoff_matrix(mutator, user_options, opponent_options, prune=False)
-                list_of_payoffs.append(scores)
-
+            list_of_payoffs = get_payoff_matrices(battles, 2, team_preview=team_preview, prune=False)
             decision = pick_move_in_equilibrium_from_multiple_score_lookups(list_of_payoffs)
 
         return format_decision(self, decision)
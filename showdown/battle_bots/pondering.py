@@ -0,0 +1,130 @@
+import logging
+import threading
+
+import constants
+from config import ShowdownConfig
+from showdown.engine.objects import StateMutator
+from showdown.engine.find_state_instructions import get_all_state_instructions
+from showdown.engine.select_best_move import get_safest_score
+from showdown.engine.select_best_move import SearchTimeout
+from showdown.engine.move_ordering import MoveOrdering
+
+
+logger = logging.getLogger(__name__)
+
+# the next decision searches 2 to 4 turns ahead, so pondering a state 4 turns ahead covers all of them
+MIN_PONDER_DEPTH = 2
+MAX_PONDER_DEPTH = 4
+
+# only the most likely outcomes of the turn are pondered
+MAX_PONDER_OUTCOMES = 20
+
+
+def get_decision_from_message(battle, message):
+    # turns a message from format_decision back into the option it was made from
+    if message.startswith("/switch "):
+        index = int(message.split()[-1])
+        for pkmn in battle.user.reserve:
+            if pkmn.index == index:
+                return "{} {}".format(constants.SWITCH_STRING, pkmn.name)
+        return None
+    return message.split()[2]
+
+
+def get_likely_outcomes(mutators, user_move, max_outcomes=MAX_PONDER_OUTCOMES):
+    """
+    Finds the most likely ways the turn could go after the bot uses `user_move`
+
+    Every state and every option the opponent has in it are treated as equally likely.
+    Returns a list of (probability, mutator, instructions) with the most likely outcome first
+    """
+    outcomes = []
+    for mutator in mutators:
+        _, opponent_options = mutator.state.get_all_options()
+        for opponent_move in opponent_options:
+            for transpose_instruction in get_all_state_instructions(mutator, user_move, opponent_move):
+                probability = transpose_instruction.percentage / (len(mutators) * len(opponent_options))
+                outcomes.append((probability, mutator, transpose_instruction.instructions))
+
+    outcomes.sort(key=lambda x: x[0], reverse=True)
+    return outcomes[:max_outcomes]
+
+
+class Ponderer:
+    """
+    Searches the states the battle is likely to be in next turn while the opponent is deciding their move
+
+    The scores are stored in `transposition_table`, so the search for the next decision does not have to
+    search the states that were already pondered. Each pass searches every outcome one turn deeper
+    than the last.
+
+    Everything, including creating the states from `battle`, happens in the ponderer's thread
+    so the event loop is free to play the other battles. stop() does not wait for the thread: it ends
+    at the next state it searches, so it can briefly run at the same time as the search for the
+    next decision and compete with it for the GIL.
+    """
+
+    def __init__(self, battle, user_move, transposition_table):
+        self.battle = battle
+        self.user_move = user_move
+        self.transposition_table = transposition_table
+        self.mutators = []
+        self.cancel = threading.Event()
+        self.thread = threading.Thread(target=self.ponder, daemon=True)
+        self.depth = 0
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        # the thread is not waited for: it sees `cancel` at the next state it searches and ends on its own
+        self.cancel.set()
+
+    def create_mutators(self):
+        self.mutators = [StateMutator(b.create_state()) for b in self.battle.prepare_battles(join_moves_together=True)]
+
+    def ponder(self):
+        try:
+            self.create_mutators()
+            if self.cancel.is_set():
+                return
+            outcomes = get_likely_outcomes(self.mutators, self.user_move)
+            if self.cancel.is_set():
+                return
+            for depth in range(MIN_PONDER_DEPTH, MAX_PONDER_DEPTH + 1):
+                for _, mutator, instructions in outcomes:
+                    self.search(mutator, instructions, depth)
+                self.depth = depth
+        except SearchTimeout:
+            pass
+        except Exception:
+            # pondering only makes the next search faster, so it must never stop the battle
+            logger.exception("Pondering failed")
+        finally:
+            logger.debug("Stopped pondering after depth {}".format(self.depth))
+
+    def search(self, mutator, instructions, depth):
+        mutator.apply(instructions)
+        try:
+            if not mutator.state.battle_is_finished():
+                get_safest_score(
+                    mutator,
+                    depth,
+                    transposition_table=self.transposition_table,
+                    cancel=self.cancel,
+                    move_ordering=MoveOrdering(),
+                    probability_floor=ShowdownConfig.search_probability_floor
+                )
+        finally:
+            mutator.reverse(instructions)
+
+
+def start_pondering(battle, message, transposition_table):
+    # `battle` must be a copy, the battle that is being played keeps being updated while the ponderer runs
+    user_move = get_decision_from_message(battle, message)
+    if user_move is None:
+        return None
+
+    ponderer = Ponderer(battle, user_move, transposition_table)
+    ponderer.start()
+    return ponderer
@@ -1,5 +1,4 @@
 import logging
-from copy import deepcopy
 
 from data.team_datasets import TeamDatasets
 from showdown.battle import Battle
@@ -52,7 +51,7 @@ def set_most_likely_pokemon_from_team_datasets(pkmn):
 
 
 def prepare_battles(battle):
-    battle_copy = deepcopy(battle)
+    battle_copy = battle.clone()
 
     for pkmn in filter(lambda x: x.is_alive(), battle_copy.opponent.reserve):
         if not pkmn.moves:
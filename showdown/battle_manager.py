@@ -0,0 +1,218 @@
+import asyncio
+import json
+import logging
+from copy import deepcopy
+from datetime import datetime
+
+import constants
+import data
+from config import ShowdownConfig
+from data.mods.apply_mods import apply_mods
+from teams import load_team
+from showdown.battle_bots.helpers import transposition_table
+from showdown.run_battle import pokemon_battle
+from showdown.websocket_client import RoomClient
+
+logger = logging.getLogger(__name__)
+
+
+def check_dictionaries_are_unmodified(original_pokedex, original_move_json):
+    # The bot should not modify the data dictionaries
+    # This is a "just-in-case" check to make sure and will stop the bot if it mutates either of them
+    if original_move_json != data.all_move_json:
+        logger.critical("Move JSON changed!\nDumping modified version to `modified_moves.json`")
+        with open("modified_moves.json", 'w') as f:
+            json.dump(data.all_move_json, f, indent=4)
+        exit(1)
+    else:
+        logger.debug("Move JSON unmodified!")
+
+    if original_pokedex != data.pokedex:
+        logger.critical(
+            "Pokedex JSON changed!\nDumping modified version to `modified_pokedex.json`"
+        )
+        with open("modified_pokedex.json", 'w') as f:
+            json.dump(data.pokedex, f, indent=4)
+        exit(1)
+    else:
+        logger.debug("Pokedex JSON unmodified!")
+
+
+def get_room(msg):
+    # a message for a room starts with the room's id, i.e. ">battle-gen8ou-12345"
+    # global messages (challenges, searches, private messages) have no room
+    if msg.startswith('>'):
+        return msg.split('\n', 1)[0][1:].strip()
+    return None
+
+
+class BattleManager:
+    """
+    Plays battles on one websocket connection, up to `max_concurrent_battles` of them at the same time
+
+    The manager is the only reader of the connection. Every message for a battle is put in the queue of that
+    battle's room, so each battle is played by `pokemon_battle` as if it had the connection to itself.
+    All of the other messages go to `lobby`, which is used to find battles.
+    """
+
+    def __init__(self, ps_websocket_client, max_concurrent_battles=1):
+        self.ps_websocket_client = ps_websocket_client
+        self.max_concurrent_battles = max_concurrent_battles
+        self.lobby = RoomClient(ps_websocket_client, asyncio.Queue())
+        self.battle_queues = dict()
+        self.new_battles = asyncio.Queue()
+
+        self.wins = 0
+        self.losses = 0
+
+        # the generation's mods are applied while any battle in it is running
+        self.generation = None
+        self.battles_in_generation = 0
+        self.original_pokedex = deepcopy(data.pokedex)
+        self.original_move_json = deepcopy(data.all_move_json)
+        self.original_pokedex_after_mods = None
+        self.original_move_json_after_mods = None
+
+    def route_message(self, msg):
+        room = get_room(msg)
+        if room is None or not room.startswith(constants.BATTLE_STRING):
+            self.lobby.queue.put_nowait(msg)
+            return
+
+        queue = self.battle_queues.get(room)
+        if queue is None:
+            if constants.INIT_BATTLE_STRING not in msg:
+                logger.debug("Ignoring a message for {}, which is not being played".format(room))
+                return
+            queue = asyncio.Queue()
+            self.battle_queues[room] = queue
+            self.new_battles.put_nowait(room)
+
+        queue.put_nowait(msg)
+
+        # the messages of a battle that is renamed are sent to the new room
+        for line in msg.split('\n'):
+            if line.startswith(constants.RENAME_STRING):
+                self.battle_queues[line.split('|')[3]] = queue
+
+    async def read_messages(self):
+        try:
+            while True:
+                self.route_message(await self.ps_websocket_client.receive_message())
+        except Exception as e:
+            # every room is waiting on the connection, so they all need to know it failed
+            for queue in [self.lobby.queue, self.new_battles] + list(self.battle_queues.values()):
+                queue.put_nowait(e)
+            raise
+
+    async def find_battle(self, team):
+        # starts looking for a battle, returning the format of the battle if it is not the configured one
+        # messages from while other battles were running are old, i.e. challenges that were already withdrawn
+        while not self.lobby.queue.empty():
+            self.lobby.queue.get_nowait()
+
+        if ShowdownConfig.bot_mode == constants.CHALLENGE_USER:
+            await self.lobby.challenge_user(
+                ShowdownConfig.user_to_challenge,
+                ShowdownConfig.pokemon_mode,
+                team
+            )
+        elif ShowdownConfig.bot_mode == constants.ACCEPT_CHALLENGE:
+            return await self.lobby.accept_challenge(
+                team,
+                ShowdownConfig.room_name
+            )
+        elif ShowdownConfig.bot_mode == constants.SEARCH_LADDER:
+            await self.lobby.search_for_match(ShowdownConfig.pokemon_mode, team)
+        else:
+            raise ValueError("Invalid Bot Mode: {}".format(ShowdownConfig.bot_mode))
+
+        return None
+
+    async def get_new_battle(self):
+        battle_tag = await self.new_battles.get()
+        if isinstance(battle_tag, Exception):
+            raise battle_tag
+        return battle_tag
+
+    def start_generation(self, generation):
+        if self.generation is None:
+            # scores from a previous battle may have been evaluated with different sets/effectiveness data
+            # the running battles share the table, so it is only cleared when no other battle is running
+            transposition_table.clear()
+            transposition_table.max_size = ShowdownConfig.transposition_table_size
+            apply_mods(generation)
+            self.original_pokedex_after_mods = deepcopy(data.pokedex)
+            self.original_move_json_after_mods = deepcopy(data.all_move_json)
+            self.generation = generation
+        elif self.generation != generation:
+            raise ValueError("A gen {} battle cannot be played while gen {} battles are running".format(generation, self.generation))
+
+        self.battles_in_generation += 1
+
+    def end_generation(self):
+        self.battles_in_generation -= 1
+        if self.battles_in_generation == 0:
+            check_dictionaries_are_unmodified(self.original_pokedex_after_mods, self.original_move_json_after_mods)
+            apply_mods(self.generation, revert=True)
+            check_dictionaries_are_unmodified(self.original_pokedex, self.original_move_json)
+            self.generation = None
+
+    async def play_battle(self, battle_tag, pokemon_battle_type):
+        queue = self.battle_queues[battle_tag]
+        room = RoomClient(self.ps_websocket_client, queue)
+
+        msgs = []
+        msg = ''
+        while constants.GEN_STRING not in msg:
+            msg = await room.receive_message()
+            msgs.append(msg)
+
+        generation = int(msg.split(constants.GEN_STRING)[-1].split('\n')[0])
+        logger.debug("Battling in gen {}".format(generation))
+        self.start_generation(generation)
+
+        winner = await pokemon_battle(room, msgs, pokemon_battle_type, generation)
+        if winner == ShowdownConfig.username:
+            self.wins += 1
+        else:
+            self.losses += 1
+        logger.info("W: {}\tL: {}".format(self.wins, self.losses))
+
+        self.end_generation()
+        for room_id in [r for r, q in self.battle_queues.items() if q is queue]:
+            del self.battle_queues[room_id]
+
+    async def run(self, run_count):
+        """
+        Plays `run_count` battles, or battles forever if `run_count` is not positive
+
+        A new battle is looked for as soon as fewer than `max_concurrent_battles` battles are running.
+        An error in a battle is raised the next time a battle is looked for, or once every battle has finished
+        """
+        reader = asyncio.ensure_future(self.read_messages())
+        slots = asyncio.Semaphore(self.max_concurrent_battles)
+        battles = set()
+        battles_started = 0
+        try:
+            while run_count <= 0 or battles_started < run_count:
+                await slots.acquire()
+                for battle in [b for b in battles if b.done()]:
+                    battles.remove(battle)
+                    battle.result()
+
+                if ShowdownConfig.log_to_file:
+                    ShowdownConfig.log_handler.do_rollover(datetime.now().strftime("%Y-%m-%dT%H:%M:%S.log"))
+                team = load_team(ShowdownConfig.team)
+                battle_format = await self.find_battle(team)
+                battle_tag = await self.get_new_battle()
+                logger.debug("Started {}".format(battle_tag))
+
+                battle = asyncio.ensure_future(self.play_battle(battle_tag, battle_format or ShowdownConfig.pokemon_mode))
+                battle.add_done_callback(lambda _: slots.release())
+                battles.add(battle)
+                battles_started += 1
+
+            await asyncio.gather(*battles)
+        finally:
+            reader.cancel()
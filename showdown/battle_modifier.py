@@ -88,14 +88,32 @@ def is_opponent(battle,  split_msg):
     return not split_msg[2].startswith(battle.user.name)
 
 
-def get_move_information(m):
-    # Given a |move| line from the PS protocol, extract the user of the move and the move object
+def tokenize(msg):
+    # splits a message from the websocket into its protocol events once, so nothing has to split a line again
+    # an event is a line split on '|', i.e. ['', 'move', 'p2a: Pikachu', 'Tackle', 'p1a: Caterpie']
+    return [line.split('|') for line in msg.split('\n')]
+
+
+def get_move_information(split_msg):
+    # Given a |move| event from the PS protocol, extract the user of the move and the move object
     try:
-        split_move_line = m.split("|")
-        return split_move_line[2], data.all_move_json[normalize_name(split_move_line[3])]
+        return split_msg[2], data.all_move_json[normalize_name(split_msg[3])]
     except KeyError:
-        logger.debug("Unknown move {} - using standard 0 priority move".format(normalize_name(m.split('|')[3])))
-        return m.split('|')[2], {constants.ID: "unknown", constants.PRIORITY: 0}
+        logger.debug("Unknown move {} - using standard 0 priority move".format(normalize_name(split_msg[3])))
+        return split_msg[2], {constants.ID: "unknown", constants.PRIORITY: 0}
+
+
+def get_turn_moves(events):
+    # the moves used this turn, or None if either side switched because then the order of the moves says nothing
+    moves = []
+    for split_msg in events:
+        if len(split_msg) < 2:
+            continue
+        elif split_msg[1] == 'switch':
+            return None
+        elif split_msg[1] == 'move':
+            moves.append(get_move_information(split_msg))
+    return moves
 
 
 def request(battle, split_msg):
@@ -781,7 +799,7 @@ def transform(battle, split_msg):
     if is_opponent(battle, split_msg):
         transformed_into_name = battle.user.active.name
 
-        battle_copy = deepcopy(battle)
+        battle_copy = battle.clone()
         battle.opponent.active.boosts = deepcopy(battle.user.active.boosts)
 
         battle_copy.user.from_json(battle_copy.request_json)
@@ -811,7 +829,7 @@ def noinit(battle, split_msg):
         logger.debug("Renamed battle to {}".format(battle.battle_tag))
 
 
-def check_speed_ranges(battle, msg_lines):
+def check_speed_ranges(battle, events):
     """
     Intention:
         This function is intended to set the min or max possible speed that the opponent's
@@ -838,10 +856,10 @@ def check_speed_ranges(battle, msg_lines):
             - Grassy Glide is used when Grassy Terrain is up
     """
     # If either side switched this turn - don't do this check
-    if any(ln.startswith("|switch|") for ln in msg_lines) or not battle.request_json:
+    moves = get_turn_moves(events)
+    if moves is None or not battle.request_json:
         return
 
-    moves = [get_move_information(m) for m in msg_lines if m.startswith('|move|')]
     if len(moves) != 2 or moves[0][1][constants.PRIORITY] != moves[1][1][constants.PRIORITY]:
         return
 
@@ -856,7 +874,7 @@ def check_speed_ranges(battle, msg_lines):
     ):
         return
 
-    battle_copy = deepcopy(battle)
+    battle_copy = battle.clone()
     battle_copy.user.from_json(battle_copy.request_json)
 
     speed_threshold = int(
@@ -902,12 +920,12 @@ def check_speed_ranges(battle, msg_lines):
             "Updated {}'s min speed to {}".format(battle.opponent.active.name, battle.opponent.active.speed_range.min))
 
 
-def check_choicescarf(battle, msg_lines):
+def check_choicescarf(battle, events):
     # If either side switched this turn - don't do this check
-    if any(ln.startswith("|switch|") for ln in msg_lines) or not battle.request_json:
+    moves = get_turn_moves(events)
+    if moves is None or not battle.request_json:
         return
 
-    moves = [get_move_information(m) for m in msg_lines if m.startswith('|move|')]
     if len(moves) != 2 or moves[0][0].startswith(battle.user.name) or moves[0][1][constants.PRIORITY] != moves[1][1][constants.PRIORITY]:
         return
 
@@ -919,7 +937,7 @@ def check_choicescarf(battle, msg_lines):
     ):
         return
 
-    battle_copy = deepcopy(battle)
+    battle_copy = battle.clone()
     battle_copy.user.from_json(battle_copy.request_json)
     if battle.battle_type == constants.RANDOM_BATTLE:
         battle_copy.opponent.active.set_spread('serious', '85,85,85,85,85,85')  # random battles have known spreads
@@ -942,7 +960,7 @@ def check_choicescarf(battle, msg_lines):
         battle.opponent.active.item = 'choicescarf'
 
 
-def get_damage_dealt(battle, split_msg, next_messages):
+def get_damage_dealt(battle, split_msg, next_events):
     move_name = normalize_name(split_msg[3])
     critical_hit = False
 
@@ -953,8 +971,7 @@ def get_damage_dealt(battle, split_msg, next_messages):
         attacking_side = battle.user
         defending_side = battle.opponent
 
-    for line in next_messages:
-        next_line_split = line.split('|')
+    for next_line_split in next_events:
         # if one of these strings appears in index 1 then
         # exit out since we are done with this pokemon's move
         if len(next_line_split) < 2 or next_line_split[1] in MOVE_END_STRINGS:
@@ -1011,9 +1028,10 @@ def check_choice_band_or_specs(battle, damage_dealt):
 
     min_damage_with_choice_item = float('inf')
     max_damage_without_choice_item = float('-inf')
-    potential_battles = battle.prepare_battles(guess_mega_evo_opponent=False, join_moves_together=True)
+    # every item could be the one that was used, so none of the sets are dropped
+    potential_battles = battle.prepare_battles(guess_mega_evo_opponent=False, join_moves_together=True, max_battles=0, probability_cutoff=1)
 
-    battle_copy = deepcopy(battle)
+    battle_copy = battle.clone()
     battle_copy.user.from_json(battle.request_json)
     for b in potential_battles:
 
@@ -1064,7 +1082,7 @@ def check_choice_band_or_specs(battle, damage_dealt):
             raise ValueError("{} is neither 'choiceband' or 'choicespecs'")
 
 
-def check_heavydutyboots(battle, msg_lines):
+def check_heavydutyboots(battle, events):
     side_to_check = battle.opponent
 
     if (
@@ -1075,8 +1093,7 @@ def check_heavydutyboots(battle, msg_lines):
 
     if side_to_check.side_conditions[constants.STEALTH_ROCK] > 0:
         pkmn_took_stealthrock_damage = False
-        for line in msg_lines:
-            split_line = line.split('|')
+        for split_line in events:
 
             # |-damage|p2a: Weedle|88/100|[from] Stealth Rock
             if (
@@ -1100,8 +1117,7 @@ def check_heavydutyboots(battle, msg_lines):
         side_to_check.active.ability != 'levitate'
     ):
         pkmn_took_spikes_damage = False
-        for line in msg_lines:
-            split_line = line.split('|')
+        for split_line in events:
 
             # |-damage|p2a: Weedle|88/100|[from] Spikes
             if (
@@ -1127,8 +1143,7 @@ def check_heavydutyboots(battle, msg_lines):
         side_to_check.active.ability not in constants.IMMUNE_TO_POISON_ABILITIES
     ):
         pkmn_took_toxicspikes_poison = False
-        for line in msg_lines:
-            split_line = line.split('|')
+        for split_line in events:
 
             # a pokemon can be toxic-ed from sources other than toxicspikes
             # stopping at one of these strings ensures those other sources aren't considered
@@ -1156,8 +1171,7 @@ def check_heavydutyboots(battle, msg_lines):
             side_to_check.active.ability != 'levitate'
     ):
         pkmn_was_affected_by_stickyweb = False
-        for line in msg_lines:
-            split_line = line.split('|')
+        for split_line in events:
 
             # |-activate|p2a: Gengar|move: Sticky Web
             if (
@@ -1176,74 +1190,74 @@ def check_heavydutyboots(battle, msg_lines):
             side_to_check.active.can_have_heavydutyboots = False
 
 
+BATTLE_MODIFIERS = {
+    'request': request,
+    'switch': switch_or_drag,
+    'faint': faint,
+    'drag': switch_or_drag,
+    '-heal': heal_or_damage,
+    '-damage': heal_or_damage,
+    'move': move,
+    '-boost': boost,
+    '-unboost': unboost,
+    '-status': status,
+    '-activate': activate,
+    '-prepare': prepare,
+    '-start': start_volatile_status,
+    '-end': end_volatile_status,
+    '-curestatus': curestatus,
+    '-cureteam': cureteam,
+    '-weather': weather,
+    '-fieldstart': fieldstart,
+    '-fieldend': fieldend,
+    '-sidestart': sidestart,
+    '-sideend': sideend,
+    '-swapsideconditions': swapsideconditions,
+    '-item': set_item,
+    '-enditem': remove_item,
+    '-immune': set_ability,
+    '-ability': set_opponent_ability_from_ability_tag,
+    'detailschange': form_change,
+    'replace': form_change,
+    '-formechange': form_change,
+    '-transform': transform,
+    '-mega': mega,
+    '-terastallize': terastallize,
+    '-zpower': zpower,
+    '-clearnegativeboost': clearnegativeboost,
+    '-clearallboost': clearallboost,
+    '-singleturn': singleturn,
+    'upkeep': upkeep,
+    'inactive': inactive,
+    'inactiveoff': inactiveoff,
+    'turn': turn,
+    'noinit': noinit,
+}
+
+
 def update_battle(battle, msg):
-    msg_lines = msg.split('\n')
+    events = tokenize(msg)
 
     action = None
-    check_speed_ranges(battle, msg_lines)
-    for i, line in enumerate(msg_lines):
-        split_msg = line.split('|')
+    check_speed_ranges(battle, events)
+    for i, split_msg in enumerate(events):
         if len(split_msg) < 2:
             continue
 
         action = split_msg[1].strip()
 
-        battle_modifiers_lookup = {
-            'request': request,
-            'switch': switch_or_drag,
-            'faint': faint,
-            'drag': switch_or_drag,
-            '-heal': heal_or_damage,
-            '-damage': heal_or_damage,
-            'move': move,
-            '-boost': boost,
-            '-unboost': unboost,
-            '-status': status,
-            '-activate': activate,
-            '-prepare': prepare,
-            '-start': start_volatile_status,
-            '-end': end_volatile_status,
-            '-curestatus': curestatus,
-            '-cureteam': cureteam,
-            '-weather': weather,
-            '-fieldstart': fieldstart,
-            '-fieldend': fieldend,
-            '-sidestart': sidestart,
-            '-sideend': sideend,
-            '-swapsideconditions': swapsideconditions,
-            '-item': set_item,
-            '-enditem': remove_item,
-            '-immune': set_ability,
-            '-ability': set_opponent_ability_from_ability_tag,
-            'detailschange': form_change,
-            'replace': form_change,
-            '-formechange': form_change,
-            '-transform': transform,
-            '-mega': mega,
-            '-terastallize': terastallize,
-            '-zpower': zpower,
-            '-clearnegativeboost': clearnegativeboost,
-            '-clearallboost': clearallboost,
-            '-singleturn': singleturn,
-            'upkeep': upkeep,
-            'inactive': inactive,
-            'inactiveoff': inactiveoff,
-            'turn': turn,
-            'noinit': noinit,
-        }
-
-        function_to_call = battle_modifiers_lookup.get(action)
+        function_to_call = BATTLE_MODIFIERS.get(action)
         if function_to_call is not None:
             function_to_call(battle, split_msg)
 
         if action == 'move' and is_opponent(battle, split_msg):
-            check_choicescarf(battle, msg_lines)
-            damage_dealt = get_damage_dealt(battle, split_msg, msg_lines[i + 1:])
+            check_choicescarf(battle, events)
+            damage_dealt = get_damage_dealt(battle, split_msg, events[i + 1:])
             if damage_dealt:
                 check_choice_band_or_specs(battle, damage_dealt)
 
         elif action == 'switch' and is_opponent(battle, split_msg):
-            check_heavydutyboots(battle, msg_lines[i+1:])
+            check_heavydutyboots(battle, events[i+1:])
 
         if action == 'turn':
             return True
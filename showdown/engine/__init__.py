@@ -8,6 +8,7 @@ from .objects import (
 
 from .find_state_instructions import get_all_state_instructions
 from .damage_calculator import calculate_damage
+from .damage_matrix import get_damage_matrix
 
 __all__ = [
     'State',
@@ -16,5 +17,6 @@ __all__ = [
     'StateMutator',
     'TransposeInstruction',
     'get_all_state_instructions',
-    'calculate_damage'
+    'calculate_damage',
+    'get_damage_matrix'
 ]
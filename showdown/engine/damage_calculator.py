@@ -1,9 +1,15 @@
+import threading
 from copy import copy
-from copy import deepcopy
 
 import constants
 import data
 
+try:
+    import numpy as np
+except ImportError:
+    # numpy is only needed to calculate the damage rolls of many moves at once, which is done one move at a time without it
+    np = None
+
 
 pokemon_type_indicies = {
     'normal': 0,
@@ -51,6 +57,32 @@ damage_multipication_array = [[1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1/2, 0, 1, 1,
                               [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]]
 
 
+def _get_type_effectiveness_table():
+    # the modifier of every attacking type against every pair of defending types, keyed by the attacking type then the defending types
+    table = dict()
+    for attacking_type, attacking_type_index in pokemon_type_indicies.items():
+        multipliers = damage_multipication_array[attacking_type_index]
+        table[attacking_type] = {(): 1}
+        for first_type, first_type_index in pokemon_type_indicies.items():
+            table[attacking_type][(first_type,)] = multipliers[first_type_index]
+            for second_type, second_type_index in pokemon_type_indicies.items():
+                table[attacking_type][(first_type, second_type)] = multipliers[first_type_index] * multipliers[second_type_index]
+    return table
+
+
+TYPE_EFFECTIVENESS = _get_type_effectiveness_table()
+
+# the multipliers applied to a move's damage for each calc_type
+DAMAGE_ROLL_MULTIPLIERS = {
+    'average': (0.925,),
+    'min': (0.85,),
+    'max': (1,),
+    'min_max': (0.85, 1),
+    'min_max_average': (0.85, 0.925, 1),
+    'all': (0.85, 0.86, 0.87, 0.88, 0.89, 0.90, 0.91, 0.92, 0.93, 0.94, 0.95, 0.96, 0.97, 0.98, 0.99, 1),
+}
+
+
 SPECIAL_LOGIC_MOVES = {
     "seismictoss": lambda attacker, defender: [int(attacker.level)] if "ghost" not in defender.types else None,
     "nightshade": lambda attacker, defender: [int(attacker.level)] if "normal" not in defender.types else None,
@@ -65,27 +97,53 @@ SPECIAL_LOGIC_MOVES = {
 DEFAULT_TERRAIN_DAMAGE_BOOST = 1.3
 TERRAIN_DAMAGE_BOOST = DEFAULT_TERRAIN_DAMAGE_BOOST
 
+# the same attacker, defender, and move are calculated many times in a search
+# results are remembered using everything the damage formula reads, and the oldest result is removed when it is full
+# battles that run at the same time search in different threads, so changes to the cache are locked
+DAMAGE_CACHE_SIZE = 50000
+_damage_cache = dict()
+_damage_cache_lock = threading.Lock()
+
+
+def clear_damage_cache():
+    # must be called when anything the damage formula reads that is not part of the key changes (i.e. generation mods)
+    with _damage_cache_lock:
+        _damage_cache.clear()
+
+
+def pokemon_damage_key(pkmn):
+    return (
+        pkmn.id,
+        pkmn.level,
+        tuple(pkmn.types),
+        pkmn.ability,
+        pkmn.item,
+        pkmn.status,
+        pkmn.terastallized,
+        pkmn.attack,
+        pkmn.defense,
+        pkmn.special_attack,
+        pkmn.special_defense,
+        pkmn.attack_boost,
+        pkmn.defense_boost,
+        pkmn.special_attack_boost,
+        pkmn.special_defense_boost,
+        frozenset(pkmn.volatile_status)
+    )
+
 
 def _calculate_damage(attacker, defender, move, conditions=None, calc_type='average'):
     # This function assumes the `move` dictionary has already been updated to account for move/item/ability special-effects
     # You may want to use `calculate_damage`
 
-    acceptable_calc_types = ['average', 'min', 'max', 'min_max', 'min_max_average', 'all']
-    if calc_type not in acceptable_calc_types:
-        raise ValueError("{} is not one of {}".format(calc_type, acceptable_calc_types))
+    check_calc_type(calc_type)
 
     attacking_move = get_move(move)
     if attacking_move is None:
         raise TypeError("Invalid move: {}".format(move))
 
-    attacking_type = attacking_move.get(constants.CATEGORY)
-    if attacking_type == constants.PHYSICAL:
-        attack = constants.ATTACK
-        defense = constants.DEFENSE
-    elif attacking_type == constants.SPECIAL:
-        attack = constants.SPECIAL_ATTACK
-        defense = constants.SPECIAL_DEFENSE
-    else:
+    attack, defense = get_attack_and_defense_stats(attacking_move)
+    if attack is None:
         return None
 
     try:
@@ -99,19 +157,66 @@ def _calculate_damage(attacker, defender, move, conditions=None, calc_type='aver
     if conditions is None:
         conditions = {}
 
-    attacking_stats = attacker.calculate_boosted_stats()
-    defending_stats = defender.calculate_boosted_stats()
+    key = (
+        attacking_move[constants.ID],
+        attacking_move[constants.BASE_POWER],
+        attacking_move[constants.TYPE],
+        attacking_move[constants.CATEGORY],
+        attacking_move.get(constants.PRIORITY),
+        pokemon_damage_key(attacker),
+        pokemon_damage_key(defender),
+        conditions.get(constants.WEATHER),
+        conditions.get(constants.TERRAIN),
+        conditions.get(constants.REFLECT),
+        conditions.get(constants.LIGHT_SCREEN),
+        conditions.get(constants.AURORA_VEIL),
+        calc_type
+    )
+    try:
+        return list(_damage_cache[key])
+    except KeyError:
+        pass
+
+    damage = _calculate_base_damage(attacker, defender, attacking_move, attack, defense, conditions)
+    damage_rolls = list(set(get_damage_rolls(damage, calc_type)))
+
+    with _damage_cache_lock:
+        if len(_damage_cache) >= DAMAGE_CACHE_SIZE:
+            del _damage_cache[next(iter(_damage_cache))]
+        _damage_cache[key] = tuple(damage_rolls)
+
+    return damage_rolls
+
+
+def check_calc_type(calc_type):
+    if calc_type not in DAMAGE_ROLL_MULTIPLIERS:
+        raise ValueError("{} is not one of {}".format(calc_type, list(DAMAGE_ROLL_MULTIPLIERS)))
+
+
+def get_attack_and_defense_stats(attacking_move):
+    attacking_type = attacking_move.get(constants.CATEGORY)
+    if attacking_type == constants.PHYSICAL:
+        return constants.ATTACK, constants.DEFENSE
+    elif attacking_type == constants.SPECIAL:
+        return constants.SPECIAL_ATTACK, constants.SPECIAL_DEFENSE
+    return None, None
+
+
+def _calculate_base_damage(attacker, defender, attacking_move, attack, defense, conditions):
+    # the damage of a move before the random damage roll is applied
+    attacking_stat = attacker.get_boosted_stat(attack)
+    defending_stat = defender.get_boosted_stat(defense)
 
     if attacker.ability == 'unaware':
         if defense == constants.DEFENSE:
-            defending_stats[defense] = defender.defense
+            defending_stat = defender.defense
         elif defense == constants.SPECIAL_DEFENSE:
-            defending_stats[defense] = defender.special_defense
+            defending_stat = defender.special_defense
     if defender.ability == 'unaware':
         if attack == constants.ATTACK:
-            attacking_stats[attack] = attacker.attack
+            attacking_stat = attacker.attack
         elif defense == constants.SPECIAL_ATTACK:
-            attacking_stats[attack] = attacker.special_attack
+            attacking_stat = attacker.special_attack
 
     defending_types = defender.types
     if attacking_move[constants.ID] == 'thousandarrows' and 'flying' in defending_types:
@@ -128,29 +233,33 @@ def _calculate_damage(attacker, defender, move, conditions=None, calc_type='aver
     # ice types get 1.5x DEF in snow
     try:
         if conditions[constants.WEATHER] == constants.SAND and 'rock' in defender.types:
-            defending_stats[constants.SPECIAL_DEFENSE] = int(defending_stats[constants.SPECIAL_DEFENSE] * 1.5)
+            if defense == constants.SPECIAL_DEFENSE:
+                defending_stat = int(defending_stat * 1.5)
         elif conditions[constants.WEATHER] == constants.SNOW and 'ice' in defender.types:
-            defending_stats[constants.DEFENSE] = int(defending_stats[constants.DEFENSE] * 1.5)
+            if defense == constants.DEFENSE:
+                defending_stat = int(defending_stat * 1.5)
     except KeyError:
         pass
 
     if defender.ability == "tabletsofruin":
-        attacking_stats[constants.ATTACK] *= 0.75
+        if attack == constants.ATTACK:
+            attacking_stat *= 0.75
     elif defender.ability == "vesselofruin":
-        attacking_stats[constants.SPECIAL_ATTACK] *= 0.75
+        if attack == constants.SPECIAL_ATTACK:
+            attacking_stat *= 0.75
     if attacker.ability == "swordofruin":
-        defending_stats[constants.DEFENSE] *= 0.75
+        if defense == constants.DEFENSE:
+            defending_stat *= 0.75
     elif attacker.ability == "beadsofruin":
-        defending_stats[constants.SPECIAL_DEFENSE] *= 0.75
+        if defense == constants.SPECIAL_DEFENSE:
+            defending_stat *= 0.75
 
     damage = int(int((2 * attacker.level) / 5) + 2) * attacking_move[constants.BASE_POWER]
-    damage = int(damage * attacking_stats[attack] / defending_stats[defense])
+    damage = int(damage * attacking_stat / defending_stat)
     damage = int(damage / 50) + 2
     damage *= calculate_modifier(attacker, defender, defending_types, attacking_move, conditions)
 
-    damage_rolls = get_damage_rolls(damage, calc_type)
-
-    return list(set(damage_rolls))
+    return damage
 
 
 def is_super_effective(move_type, defending_pokemon_types):
@@ -182,55 +291,36 @@ def calculate_modifier(attacker, defender, defending_types, attacking_move, cond
 
 
 def get_move(move):
+    # a move from the moves JSON is shared by every caller, so it must be copied before it is changed
     if isinstance(move, dict):
         return move
     if isinstance(move, str):
-        return deepcopy(data.all_move_json.get(move, None))
+        return data.all_move_json.get(move, None)
     else:
         return None
 
 
 def get_damage_rolls(damage, calc_type):
-    if calc_type == 'average':
-        damage *= 0.925
-        return [int(damage)]
-    elif calc_type == 'min':
-        return [int(damage * 0.85)]
-    elif calc_type == 'max':
-        return [int(damage)]
-    elif calc_type == 'min_max':
-        return [
-            int(damage * 0.85),
-            int(damage)
-        ]
-    elif calc_type == 'min_max_average':
-        return [
-            int(damage * 0.85),
-            int(damage * 0.925),
-            int(damage)
-        ]
-    elif calc_type == 'all':
-        return [
-            int(damage * 0.85),
-            int(damage * 0.86),
-            int(damage * 0.87),
-            int(damage * 0.88),
-            int(damage * 0.89),
-            int(damage * 0.90),
-            int(damage * 0.91),
-            int(damage * 0.92),
-            int(damage * 0.93),
-            int(damage * 0.94),
-            int(damage * 0.95),
-            int(damage * 0.96),
-            int(damage * 0.97),
-            int(damage * 0.98),
-            int(damage * 0.99),
-            int(damage)
-        ]
+    return [int(damage * multiplier) for multiplier in DAMAGE_ROLL_MULTIPLIERS[calc_type]]
+
+
+def get_move_set_damage_rolls(damages, calc_type):
+    # the damage rolls of every damage in `damages`, the same as `get_damage_rolls` gives for each of them
+    multipliers = DAMAGE_ROLL_MULTIPLIERS[calc_type]
+    if np is None:
+        return [[int(damage * multiplier) for multiplier in multipliers] for damage in damages]
+
+    # damage is never negative so flooring it is the same as `int`
+    return np.floor(np.outer(damages, multipliers)).astype(int).tolist()
 
 
 def type_effectiveness_modifier(attacking_move_type, defending_types):
+    try:
+        return TYPE_EFFECTIVENESS[attacking_move_type][tuple(defending_types)]
+    except KeyError:
+        pass
+
+    # a pokemon can have more than two types (i.e. from trick-or-treat)
     modifier = 1
     attacking_type_index = pokemon_type_indicies[attacking_move_type]
     for pkmn_type in defending_types:
@@ -379,6 +469,12 @@ def volatile_status_modifier(attacking_move, attacker, defender):
 
 def calculate_damage(state, attacking_side_string, attacking_move, defending_move, calc_type='average'):
     # a wrapper for `_calculate_damage` that takes into account move/item/ability special-effects
+    attacking_side, defending_side, attacking_move_dict, conditions = get_attacking_move_in_state(state, attacking_side_string, attacking_move, defending_move)
+    return _calculate_damage(attacking_side.active, defending_side.active, attacking_move_dict, conditions=conditions, calc_type=calc_type)
+
+
+def get_attacking_move_in_state(state, attacking_side_string, attacking_move, defending_move):
+    # the attacking move updated for the move/item/ability special-effects in `state`, along with the sides and the conditions it is used in
     from showdown.engine.find_state_instructions import update_attacking_move
     from showdown.engine.find_state_instructions import user_moves_first
 
@@ -410,6 +506,7 @@ def calculate_damage(state, attacking_side_string, attacking_move, defending_mov
     if constants.CHARGE in attacking_move_dict[constants.FLAGS]:
         attacking_move_dict = attacking_move_dict.copy()
         # a charge move doesn't need to charge when only calculating damage
+        attacking_move_dict[constants.FLAGS] = attacking_move_dict[constants.FLAGS].copy()
         attacking_move_dict[constants.FLAGS].pop(constants.CHARGE, None)
 
     attacking_move_dict = update_attacking_move(
@@ -423,7 +520,7 @@ def calculate_damage(state, attacking_side_string, attacking_move, defending_mov
         state.field
     )
 
-    return _calculate_damage(attacking_side.active, defending_side.active, attacking_move_dict, conditions=conditions, calc_type=calc_type)
+    return attacking_side, defending_side, attacking_move_dict, conditions
 
 
 def calculate_futuresight_damage(state, attacking_side_string, future_sight_user, calc_type='average'):
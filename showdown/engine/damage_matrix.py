@@ -0,0 +1,156 @@
+from collections import namedtuple
+
+import constants
+
+from .damage_calculator import SPECIAL_LOGIC_MOVES
+from .damage_calculator import _calculate_base_damage
+from .damage_calculator import check_calc_type
+from .damage_calculator import get_attack_and_defense_stats
+from .damage_calculator import get_move_set_damage_rolls
+from .find_state_instructions import get_effective_speed
+from .find_state_instructions import lookup_move
+from .find_state_instructions import update_attacking_move
+from .find_state_instructions import user_moves_first_with_speeds
+from .instruction_generator import accuracy_multiplier_lookup
+
+
+DamageMatrixEntry = namedtuple(
+    'DamageMatrixEntry',
+    ['user_damage', 'opponent_damage', 'user_ko_chance', 'opponent_ko_chance', 'user_moves_first']
+)
+
+
+def get_damage_conditions(state, defending_side):
+    return {
+        constants.REFLECT: defending_side.side_conditions[constants.REFLECT],
+        constants.LIGHT_SCREEN: defending_side.side_conditions[constants.LIGHT_SCREEN],
+        constants.AURORA_VEIL: defending_side.side_conditions[constants.AURORA_VEIL],
+        constants.WEATHER: state.weather,
+        constants.TERRAIN: state.field
+    }
+
+
+def get_hit_chance(attacking_move, attacker, defender):
+    accuracy = attacking_move[constants.ACCURACY]
+    if accuracy is True:
+        return 1
+    return min(100, accuracy * accuracy_multiplier_lookup[attacker.accuracy_boost] / accuracy_multiplier_lookup[defender.evasion_boost]) / 100
+
+
+def get_damage_matrix(state, user_options, opponent_options, calc_type='all'):
+    """
+    Calculates how much damage each side's option does to the other side for every pair of options in `state`
+
+    Returns a dictionary keyed by (user_option, opponent_option) containing a DamageMatrixEntry:
+        user_damage / opponent_damage: the expected damage the user's / opponent's option does to the pokemon it hits,
+            including the chance that the move misses. A move used against a switch hits the pokemon being switched in
+        user_ko_chance / opponent_ko_chance: the chance that the option knocks out the pokemon it hits
+        user_moves_first: whether the user's option happens before the opponent's
+
+    The speeds and conditions are worked out once for every pair, and the damage rolls of every pair are
+    calculated together. Only the damage of each option against the state as it is is calculated:
+    the effects of the option that happens first (i.e. a boost) are not applied before the second option.
+    """
+    check_calc_type(calc_type)
+
+    user_effective_speed = get_effective_speed(state, state.user)
+    opponent_effective_speed = get_effective_speed(state, state.opponent)
+    user_conditions = get_damage_conditions(state, state.opponent)
+    opponent_conditions = get_damage_conditions(state, state.user)
+    user_moves = {option: lookup_move(option) for option in user_options}
+    opponent_moves = {option: lookup_move(option) for option in opponent_options}
+
+    # (option pair, attacking side, the damage rolls or None if they are in `base_damages`, the pokemon that is hit, hit chance)
+    damage_to_roll = []
+    base_damages = []
+    speed_order = dict()
+    for user_option in user_options:
+        for opponent_option in opponent_options:
+            user_move = user_moves[user_option]
+            opponent_move = opponent_moves[opponent_option]
+            user_first = user_moves_first_with_speeds(state, user_move, opponent_move, user_effective_speed, opponent_effective_speed)
+            speed_order[(user_option, opponent_option)] = user_first
+
+            for attacking_side, defending_side, attacking_move, defending_move, first_move, conditions in (
+                (state.user, state.opponent, user_move, opponent_move, user_first, user_conditions),
+                (state.opponent, state.user, opponent_move, user_move, not user_first, opponent_conditions),
+            ):
+                damage = get_option_damage(state, attacking_side, defending_side, attacking_move, defending_move, first_move, conditions)
+                if damage is None:
+                    continue
+
+                damage_rolls, base_damage, defender, hit_chance = damage
+                if damage_rolls is None:
+                    base_damages.append(base_damage)
+                damage_to_roll.append(((user_option, opponent_option), attacking_side is state.user, damage_rolls, defender, hit_chance))
+
+    damage_matrix = {
+        pair: {'user_damage': 0, 'opponent_damage': 0, 'user_ko_chance': 0, 'opponent_ko_chance': 0, 'user_moves_first': user_first}
+        for pair, user_first in speed_order.items()
+    }
+
+    all_base_damage_rolls = iter(get_move_set_damage_rolls(base_damages, calc_type))
+    for pair, user_is_attacking, damage_rolls, defender, hit_chance in damage_to_roll:
+        if damage_rolls is None:
+            damage_rolls = next(all_base_damage_rolls)
+
+        damage_rolls = [min(max(damage, 0), defender.hp) for damage in damage_rolls]
+        expected_damage = hit_chance * sum(damage_rolls) / len(damage_rolls)
+        ko_chance = hit_chance * sum(damage >= defender.hp for damage in damage_rolls) / len(damage_rolls)
+        if user_is_attacking:
+            damage_matrix[pair]['user_damage'] = expected_damage
+            damage_matrix[pair]['user_ko_chance'] = ko_chance
+        else:
+            damage_matrix[pair]['opponent_damage'] = expected_damage
+            damage_matrix[pair]['opponent_ko_chance'] = ko_chance
+
+    return {pair: DamageMatrixEntry(**entry) for pair, entry in damage_matrix.items()}
+
+
+def get_option_damage(state, attacking_side, defending_side, attacking_move, defending_move, first_move, conditions):
+    # returns None if the option does no damage
+    # otherwise returns (damage rolls, None, ...) for a move with fixed damage, or (None, damage before rolls, ...)
+    if constants.SWITCH_STRING in attacking_move or attacking_side.active.hp <= 0:
+        return None
+
+    # a switch happens before a move unless the move is faster than the switch (pursuit)
+    if constants.SWITCH_STRING in defending_move and not first_move:
+        defender = defending_side.reserve[defending_move[constants.SWITCH_STRING]]
+    else:
+        defender = defending_side.active
+
+    if defender.hp <= 0:
+        return None
+
+    if constants.CHARGE in attacking_move[constants.FLAGS]:
+        # a charge move's damage is what it does once it has charged
+        attacking_move = attacking_move.copy()
+        attacking_move[constants.FLAGS] = attacking_move[constants.FLAGS].copy()
+        attacking_move[constants.FLAGS].pop(constants.CHARGE, None)
+
+    attacking_move = update_attacking_move(
+        attacking_side,
+        attacking_side.active,
+        defender,
+        attacking_move,
+        defending_move,
+        first_move,
+        state.weather,
+        state.field
+    )
+
+    attack, defense = get_attack_and_defense_stats(attacking_move)
+    if attack is None:
+        return None
+
+    hit_chance = get_hit_chance(attacking_move, attacking_side.active, defender)
+    if attacking_move[constants.ID] in SPECIAL_LOGIC_MOVES:
+        damage_rolls = SPECIAL_LOGIC_MOVES[attacking_move[constants.ID]](attacking_side.active, defender)
+        if damage_rolls is None:
+            return None
+        return damage_rolls, None, defender, hit_chance
+    elif attacking_move[constants.BASE_POWER] == 0:
+        return [0], None, defender, hit_chance
+
+    base_damage = _calculate_base_damage(attacking_side.active, defender, attacking_move, attack, defense, conditions)
+    return None, base_damage, defender, hit_chance
@@ -117,12 +117,37 @@ def evaluate_pokemon(pkmn, side):
     return round(score)
 
 
-def evaluate(state):
-    score = 0
+def count_alive_reserves(state, side_string):
+    # the opponent's unrevealed pokemon are assumed to be alive
+    if side_string == constants.USER:
+        return len([p.hp for p in state.user.reserve.values() if p.hp > 0])
 
     number_of_opponent_reserve_revealed = len(state.opponent.reserve) + 1
-    bot_alive_reserve_count = len([p.hp for p in state.user.reserve.values() if p.hp > 0])
-    opponent_alive_reserves_count = len([p for p in state.opponent.reserve.values() if p.hp > 0]) + (6-number_of_opponent_reserve_revealed)
+    return len([p for p in state.opponent.reserve.values() if p.hp > 0]) + (6-number_of_opponent_reserve_revealed)
+
+
+def evaluate_side_conditions(side, alive_reserve_count):
+    score = 0
+    for condition, count in side.side_conditions.items():
+        if condition in Scoring.STATIC_SCORED_SIDE_CONDITIONS:
+            score += count * Scoring.STATIC_SCORED_SIDE_CONDITIONS[condition]
+        elif condition in Scoring.POKEMON_COUNT_SCORED_SIDE_CONDITIONS:
+            score += count * Scoring.POKEMON_COUNT_SCORED_SIDE_CONDITIONS[condition] * alive_reserve_count
+
+    return score
+
+
+def evaluate_matchup(state):
+    try:
+        matchup_score = Scoring.MATCHUP_BONUS * effectiveness[state.user.active.id][state.opponent.active.id]
+        matchup_score -= Scoring.MATCHUP_BONUS * effectiveness[state.opponent.active.id][state.user.active.id]
+        return matchup_score
+    except KeyError:
+        return 0
+
+
+def evaluate(state):
+    score = 0
 
     # evaluate the bot's pokemon
     score += evaluate_pokemon(state.user.active, state.user)
@@ -136,25 +161,144 @@ def evaluate(state):
         this_pkmn_score = evaluate_pokemon(pkmn, state.opponent)
         score -= this_pkmn_score
 
-    # evaluate the side-conditions for the bot
-    for condition, count in state.user.side_conditions.items():
-        if condition in Scoring.STATIC_SCORED_SIDE_CONDITIONS:
-            score += count * Scoring.STATIC_SCORED_SIDE_CONDITIONS[condition]
-        elif condition in Scoring.POKEMON_COUNT_SCORED_SIDE_CONDITIONS:
-            score += count * Scoring.POKEMON_COUNT_SCORED_SIDE_CONDITIONS[condition] * bot_alive_reserve_count
-
-    # evaluate the side-conditions for the opponent
-    for condition, count in state.opponent.side_conditions.items():
-        if condition in Scoring.STATIC_SCORED_SIDE_CONDITIONS:
-            score -= count * Scoring.STATIC_SCORED_SIDE_CONDITIONS[condition]
-        elif condition in Scoring.POKEMON_COUNT_SCORED_SIDE_CONDITIONS:
-            score -= count * Scoring.POKEMON_COUNT_SCORED_SIDE_CONDITIONS[condition] * opponent_alive_reserves_count
+    # evaluate the side-conditions
+    score += evaluate_side_conditions(state.user, count_alive_reserves(state, constants.USER))
+    score -= evaluate_side_conditions(state.opponent, count_alive_reserves(state, constants.OPPONENT))
 
-    try:
-        matchup_score = Scoring.MATCHUP_BONUS * effectiveness[state.user.active.id][state.opponent.active.id]
-        matchup_score -= Scoring.MATCHUP_BONUS * effectiveness[state.opponent.active.id][state.user.active.id]
-        score += matchup_score
-    except KeyError:
-        pass
+    score += evaluate_matchup(state)
 
     return int(score)
+
+
+class IncrementalEvaluation:
+    """
+    Remembers the score of every pokemon and every side's side-conditions in a state so that evaluating the state
+    after a few instructions only calculates the parts of the score that those instructions changed
+
+    The StateMutator that owns it adds the pokemon and sides that its instructions change to
+    `changed_pokemon` and `changed_sides`. The score is always the same as `evaluate` gives.
+    """
+
+    def __init__(self, state):
+        self.state = state
+        self.pokemon_scores = {constants.USER: dict(), constants.OPPONENT: dict()}
+        self.pokemon_totals = {constants.USER: 0, constants.OPPONENT: 0}
+        self.side_condition_scores = {constants.USER: 0, constants.OPPONENT: 0}
+
+        # (side_string, pokemon id) of the pokemon changed since the last evaluation
+        self.changed_pokemon = set()
+        self.changed_sides = set()
+
+        self.reset()
+
+    def reset(self):
+        for side_string in (constants.USER, constants.OPPONENT):
+            side = getattr(self.state, side_string)
+            scores = {pkmn.id: evaluate_pokemon(pkmn, side) for pkmn in [side.active] + list(side.reserve.values())}
+            self.pokemon_scores[side_string] = scores
+            self.pokemon_totals[side_string] = sum(scores.values())
+            self.side_condition_scores[side_string] = evaluate_side_conditions(side, count_alive_reserves(self.state, side_string))
+
+        self.changed_pokemon.clear()
+        self.changed_sides.clear()
+
+    def evaluate(self):
+        for side_string, pkmn_id in self.changed_pokemon:
+            side = getattr(self.state, side_string)
+            pkmn = side.active if side.active.id == pkmn_id else side.reserve[pkmn_id]
+            score = evaluate_pokemon(pkmn, side)
+            self.pokemon_totals[side_string] += score - self.pokemon_scores[side_string][pkmn_id]
+            self.pokemon_scores[side_string][pkmn_id] = score
+        self.changed_pokemon.clear()
+
+        for side_string in self.changed_sides:
+            side = getattr(self.state, side_string)
+            self.side_condition_scores[side_string] = evaluate_side_conditions(side, count_alive_reserves(self.state, side_string))
+        self.changed_sides.clear()
+
+        score = self.pokemon_totals[constants.USER] - self.pokemon_totals[constants.OPPONENT]
+        score += self.side_condition_scores[constants.USER] - self.side_condition_scores[constants.OPPONENT]
+        score += evaluate_matchup(self.state)
+
+        return int(score)
+
+
+def evaluate_pokemon_bounds(toxic_count, active):
+    # the lowest and highest score that evaluate_pokemon can give a pokemon that is alive
+    # boosts and volatile statuses are removed when a pokemon switches out so only the active pokemon can have them
+    lowest = Scoring.POKEMON_ALIVE_STATIC + min(
+        min(Scoring.POKEMON_STATIC_STATUSES.values()),
+        Scoring.TOXIC(toxic_count),
+        Scoring.BURN(4)
+    )
+    # a status can raise the score, i.e. a burn on a pokemon with guts
+    highest = Scoring.POKEMON_ALIVE_STATIC + Scoring.POKEMON_HP * math.log(10) + max(
+        max(Scoring.POKEMON_STATIC_STATUSES.values()),
+        max(Scoring.BURN(burn_multiplier) for burn_multiplier in range(-2, 5))
+    )
+
+    if active:
+        boost_weights = sum(Scoring.POKEMON_BOOSTS.values())
+        volatile_statuses = Scoring.POKEMON_VOLATILE_STATUSES.values()
+        lowest += Scoring.POKEMON_BOOST_DIMINISHING_RETURNS[-6] * boost_weights + sum(v for v in volatile_statuses if v < 0)
+        highest += Scoring.POKEMON_BOOST_DIMINISHING_RETURNS[6] * boost_weights + sum(v for v in volatile_statuses if v > 0)
+
+    return min(math.floor(lowest), 0), math.ceil(highest)
+
+
+def evaluate_side_bounds(side, alive_count, hazard_count, turns):
+    # the lowest and highest score that one side's pokemon and side-conditions can add
+    toxic_count = side.side_conditions[constants.TOXIC_COUNT] + turns
+    reserve_lowest, reserve_highest = evaluate_pokemon_bounds(toxic_count, False)
+    active_lowest, active_highest = evaluate_pokemon_bounds(toxic_count, True)
+
+    lowest = 0
+    highest = 0
+    if alive_count:
+        lowest += active_lowest + (alive_count - 1) * reserve_lowest
+        highest += active_highest + (alive_count - 1) * reserve_highest
+
+    for value in Scoring.STATIC_SCORED_SIDE_CONDITIONS.values():
+        lowest += min(value, 0)
+        highest += max(value, 0)
+
+    max_layers = {constants.SPIKES: 3, constants.TOXIC_SPIKES: 2}
+    for condition, value in Scoring.POKEMON_COUNT_SCORED_SIDE_CONDITIONS.items():
+        score = value * max_layers.get(condition, 1) * hazard_count
+        lowest += min(score, 0)
+        highest += max(score, 0)
+
+    return lowest, highest
+
+
+def evaluation_bounds(state, turns):
+    """
+    The lowest and highest score that `evaluate` can give any state reached from `state` within `turns` turns
+
+    Pokemon that have fainted are never revived and the opponent's unrevealed pokemon are only
+    scored by the hazards on their side, so only the pokemon that are alive in `state` can add to the score.
+    """
+    user_alive = [p for p in [state.user.active] + list(state.user.reserve.values()) if p.hp > 0]
+    opponent_alive = [p for p in [state.opponent.active] + list(state.opponent.reserve.values()) if p.hp > 0]
+
+    user_lowest, user_highest = evaluate_side_bounds(state.user, len(user_alive), len(user_alive), turns)
+    opponent_lowest, opponent_highest = evaluate_side_bounds(
+        state.opponent,
+        len(opponent_alive),
+        len(opponent_alive) + 5 - len(state.opponent.reserve),
+        turns
+    )
+
+    matchup = 0
+    for user_pkmn in user_alive:
+        for opponent_pkmn in opponent_alive:
+            matchup = max(
+                matchup,
+                abs(effectiveness.get(user_pkmn.id, {}).get(opponent_pkmn.id, 0)) +
+                abs(effectiveness.get(opponent_pkmn.id, {}).get(user_pkmn.id, 0))
+            )
+    matchup *= Scoring.MATCHUP_BONUS
+
+    lowest = user_lowest - opponent_highest - matchup
+    highest = user_highest - opponent_lowest + matchup
+    return math.floor(lowest), math.ceil(highest)
@@ -29,7 +29,7 @@ def lookup_move(move_name):
 
 
 def get_effective_speed(state, side):
-    boosted_speed = side.active.calculate_boosted_stats()[constants.SPEED]
+    boosted_speed = side.active.get_boosted_stat(constants.SPEED)
 
     if state.weather == constants.SUN and side.active.ability == 'chlorophyll':
         boosted_speed *= 2
@@ -80,7 +80,10 @@ def get_effective_priority(side, move, field):
 def user_moves_first(state, user_move, opponent_move):
     user_effective_speed = get_effective_speed(state, state.user)
     opponent_effective_speed = get_effective_speed(state, state.opponent)
+    return user_moves_first_with_speeds(state, user_move, opponent_move, user_effective_speed, opponent_effective_speed)
 
+
+def user_moves_first_with_speeds(state, user_move, opponent_move, user_effective_speed, opponent_effective_speed):
     # both users selected a switch
     if constants.SWITCH_STRING in user_move and constants.SWITCH_STRING in opponent_move:
         return user_effective_speed > opponent_effective_speed
@@ -370,7 +373,10 @@ def get_state_instructions_from_move(mutator, attacking_move, defending_move, at
                 these_instructions = copy(instruction_set)
                 these_instructions.update_percentage(1 / amount_of_damage_rolls)
                 temp_instructions += instruction_generator.get_instructions_from_damage(mutator, defender, dmg, move_accuracy, attacking_move, these_instructions)
-        all_instructions = temp_instructions
+
+        # damage rolls that do the same damage (i.e. all of them knock the defender out) give the same instructions
+        # combining them here means the rest of the move's effects are only generated once for them
+        all_instructions = remove_duplicate_instructions(temp_instructions, compare_frozen=True)
 
     if defending_pokemon.ability in constants.ABILITY_AFTER_MOVE:
         temp_instructions = []
@@ -446,15 +452,54 @@ def get_state_instructions_from_move(mutator, attacking_move, defending_move, at
     return all_instructions
 
 
-def remove_duplicate_instructions(list_of_instructions):
-    new_instructions = [list_of_instructions[0]]
-    for instruction_1 in list_of_instructions[1:]:
-        for instruction_2 in new_instructions:
-            if instruction_1.has_same_instructions_as(instruction_2):
-                instruction_2.percentage += instruction_1.percentage
-                break
+def remove_duplicate_instructions(list_of_instructions, compare_frozen=False):
+    # instructions that are the same are combined into one, adding their percentages together
+    # they are found by looking up the instructions in a dictionary rather than comparing every pair
+    #
+    # when more instructions are going to be generated from these, `compare_frozen` must be True:
+    # a frozen set of instructions is not added to so it cannot be combined with one that is not frozen
+    new_instructions = []
+    instructions_lookup = dict()
+    for instruction in list_of_instructions:
+        key = (tuple(instruction.instructions), compare_frozen and instruction.frozen)
+        try:
+            existing_instruction = instructions_lookup.get(key)
+        except TypeError:
+            # some instructions (changing types) contain a list and cannot be looked up
+            existing_instruction = next(
+                (
+                    i for i in new_instructions
+                    if i.has_same_instructions_as(instruction) and (not compare_frozen or i.frozen == instruction.frozen)
+                ),
+                None
+            )
+            key = None
+
+        if existing_instruction is not None:
+            existing_instruction.percentage += instruction.percentage
         else:
-            new_instructions.append(instruction_1)
+            new_instructions.append(instruction)
+            if key is not None:
+                instructions_lookup[key] = instruction
+
+    return new_instructions
+
+
+def remove_unlikely_instructions(list_of_instructions, probability_floor):
+    # outcomes less likely than `probability_floor` are dropped and their probability is shared by the rest
+    # the most likely outcome is always kept
+    if probability_floor <= 0 or len(list_of_instructions) == 1:
+        return list_of_instructions
+
+    new_instructions = [i for i in list_of_instructions if i.percentage >= probability_floor]
+    if len(new_instructions) == len(list_of_instructions):
+        return list_of_instructions
+    elif not new_instructions:
+        new_instructions = [max(list_of_instructions, key=lambda i: i.percentage)]
+
+    modifier = sum(i.percentage for i in list_of_instructions) / sum(i.percentage for i in new_instructions)
+    for instruction in new_instructions:
+        instruction.update_percentage(modifier)
 
     return new_instructions
 
@@ -468,7 +513,7 @@ def end_of_turn_triggered(user_move, opponent_move):
     return True
 
 
-def get_all_state_instructions(mutator, user_move_string, opponent_move_string):
+def get_all_state_instructions(mutator, user_move_string, opponent_move_string, probability_floor=0):
     user_move = lookup_move(user_move_string)
     opponent_move = lookup_move(opponent_move_string)
 
@@ -478,11 +523,17 @@ def get_all_state_instructions(mutator, user_move_string, opponent_move_string):
 
     all_instructions = []
     if bot_moves_first:
-        instructions = get_state_instructions_from_move(mutator, user_move, opponent_move, constants.USER, constants.OPPONENT, True, instructions)
+        instructions = remove_duplicate_instructions(
+            get_state_instructions_from_move(mutator, user_move, opponent_move, constants.USER, constants.OPPONENT, True, instructions),
+            compare_frozen=True
+        )
         for instruction in instructions:
             all_instructions += get_state_instructions_from_move(mutator, opponent_move, user_move, constants.OPPONENT, constants.USER, False, instruction)
     else:
-        instructions = get_state_instructions_from_move(mutator, opponent_move, user_move, constants.OPPONENT, constants.USER, True, instructions)
+        instructions = remove_duplicate_instructions(
+            get_state_instructions_from_move(mutator, opponent_move, user_move, constants.OPPONENT, constants.USER, True, instructions),
+            compare_frozen=True
+        )
         for instruction in instructions:
             all_instructions += get_state_instructions_from_move(mutator, user_move, opponent_move, constants.USER, constants.OPPONENT, False, instruction)
 
@@ -493,5 +544,6 @@ def get_all_state_instructions(mutator, user_move_string, opponent_move_string):
         all_instructions = temp_instructions
 
     all_instructions = remove_duplicate_instructions(all_instructions)
+    all_instructions = remove_unlikely_instructions(all_instructions, probability_floor)
 
     return all_instructions
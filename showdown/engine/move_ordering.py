@@ -0,0 +1,84 @@
+from collections import defaultdict
+
+import constants
+import data
+from .damage_calculator import type_effectiveness_modifier
+
+
+def estimate_damage(attacker, defender, move_name):
+    # a cheap estimate of how much damage a move does that is only used to decide which moves to search first
+    move = data.all_move_json.get(move_name)
+    if move is None or move[constants.CATEGORY] not in constants.DAMAGING_CATEGORIES:
+        return 0
+
+    damage = move[constants.BASE_POWER] * type_effectiveness_modifier(move[constants.TYPE], defender.types)
+    if move[constants.TYPE] in attacker.types:
+        damage *= 1.5
+    return damage
+
+
+class MoveOrdering:
+    """
+    Decides the order that moves are searched in so that the search can prune as much as possible
+
+    Moves are searched in this order:
+        - the best move-pair remembered for the state by the transposition table
+        - killer moves: the moves that most recently caused a cutoff at the same depth
+        - moves that have caused many cutoffs anywhere in the search (history)
+        - moves that are estimated to do the most damage
+
+    The bot's strongest moves are searched first because a high score lets the rest of the bot's moves be pruned.
+    The opponent's strongest moves are searched first because a low score lets the rest of that row be pruned.
+    """
+
+    def __init__(self):
+        self.user_killers = dict()
+        self.opponent_killers = dict()
+        self.user_history = defaultdict(int)
+        self.opponent_history = defaultdict(int)
+
+    def record_user_cutoff(self, user_move, depth):
+        self.user_killers[depth] = user_move
+        self.user_history[user_move] += depth * depth
+
+    def record_opponent_cutoff(self, opponent_move, depth):
+        self.opponent_killers[depth] = opponent_move
+        self.opponent_history[opponent_move] += depth * depth
+
+    @staticmethod
+    def _order(options, history, damage_function, killer, best_move):
+        def sort_key(option):
+            return (
+                option == best_move,
+                option == killer,
+                history.get(option, 0),
+                damage_function(option)
+            )
+
+        return sorted(options, key=sort_key, reverse=True)
+
+    def order(self, state, user_options, opponent_options, depth, best_reply=None):
+        best_user_move, best_opponent_move = best_reply or (None, None)
+
+        user_options = self._order(
+            user_options,
+            self.user_history,
+            lambda move: estimate_damage(state.user.active, state.opponent.active, move),
+            self.user_killers.get(depth),
+            best_user_move
+        )
+        opponent_options = self._order(
+            opponent_options,
+            self.opponent_history,
+            lambda move: estimate_damage(state.opponent.active, state.user.active, move),
+            self.opponent_killers.get(depth),
+            best_opponent_move
+        )
+
+        return user_options, opponent_options
+
+    def clear(self):
+        self.user_killers.clear()
+        self.opponent_killers.clear()
+        self.user_history.clear()
+        self.opponent_history.clear()
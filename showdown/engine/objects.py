@@ -1,9 +1,15 @@
+import hashlib
+import struct
+from array import array
 from collections import defaultdict
 from copy import copy
+from itertools import islice
 
 import constants
 import data
 
+from .evaluate import IncrementalEvaluation
+
 
 boost_multiplier_lookup = {
     -6: 2/8,
@@ -21,6 +27,117 @@ boost_multiplier_lookup = {
     6: 8/2
 }
 
+# the attributes of a Pokemon that hold each boost and each stat
+# looking these up is faster than comparing the stat against every boost in turn
+BOOST_ATTRIBUTES = {
+    constants.ATTACK: 'attack_boost',
+    constants.DEFENSE: 'defense_boost',
+    constants.SPECIAL_ATTACK: 'special_attack_boost',
+    constants.SPECIAL_DEFENSE: 'special_defense_boost',
+    constants.SPEED: 'speed_boost',
+    constants.ACCURACY: 'accuracy_boost',
+    constants.EVASION: 'evasion_boost',
+}
+
+STAT_ATTRIBUTES = {
+    constants.ATTACK: 'attack',
+    constants.DEFENSE: 'defense',
+    constants.SPECIAL_ATTACK: 'special_attack',
+    constants.SPECIAL_DEFENSE: 'special_defense',
+    constants.SPEED: 'speed',
+}
+
+
+# states are serialized into a canonical binary format:
+# two states that zobrist_hash the same way serialize to the same bytes,
+# so the serialization can be used to identify a state across processes and between runs
+#
+# the values are written to three arrays that are each packed at once: small integers (levels, boosts, counts, ...),
+# numbers that may be floats (hp, stats, ...) and strings. The bytes are the lengths of the three arrays followed by the arrays
+SERIALIZATION_VERSION = 1
+
+_HEADER_STRUCT = struct.Struct('<BIII')
+_STRING_SEPARATOR = '\x1f'
+_NONE_STRING = '\x00'
+
+# the kinds of value written by `_pack_value`
+_NONE = 0
+_FALSE = 1
+_TRUE = 2
+_NUMBER = 3
+_STRING = 4
+
+
+class _Writer(object):
+    __slots__ = ('small', 'numbers', 'strings')
+
+    def __init__(self):
+        self.small = array('h')
+        self.numbers = array('d')
+        self.strings = []
+
+    def to_bytes(self):
+        strings = _STRING_SEPARATOR.join(self.strings).encode()
+        return b''.join((
+            _HEADER_STRUCT.pack(SERIALIZATION_VERSION, len(self.small), len(self.numbers), len(strings)),
+            self.small.tobytes(),
+            self.numbers.tobytes(),
+            strings
+        ))
+
+
+class _Reader(object):
+    __slots__ = ('small', 'numbers', 'strings')
+
+    def __init__(self, buffer):
+        version, small_length, numbers_length, strings_length = _HEADER_STRUCT.unpack_from(buffer)
+        if version != SERIALIZATION_VERSION:
+            raise ValueError("Cannot deserialize a state with version {}".format(version))
+
+        offset = _HEADER_STRUCT.size
+        small = array('h')
+        small.frombytes(buffer[offset:offset + small_length * small.itemsize])
+        offset += small_length * small.itemsize
+
+        numbers = array('d')
+        numbers.frombytes(buffer[offset:offset + numbers_length * numbers.itemsize])
+        offset += numbers_length * numbers.itemsize
+
+        strings = bytes(buffer[offset:offset + strings_length]).decode().split(_STRING_SEPARATOR)
+
+        self.small = iter(small)
+        # 100.0 and 100 are written the same way. Whole numbers are read back as ints
+        self.numbers = iter([int(n) if n.is_integer() else n for n in numbers])
+        self.strings = iter([None if s == _NONE_STRING else s for s in strings])
+
+    def value(self):
+        kind = next(self.small)
+        if kind == _NONE:
+            return None
+        elif kind == _FALSE:
+            return False
+        elif kind == _TRUE:
+            return True
+        elif kind == _NUMBER:
+            return next(self.numbers)
+        return next(self.strings)
+
+
+def _pack_value(writer, value):
+    # values that are not always the same type (weather, wish, futuresight, ...) are written along with their kind
+    if value is None:
+        writer.small.append(_NONE)
+    elif value is False:
+        writer.small.append(_FALSE)
+    elif value is True:
+        writer.small.append(_TRUE)
+    elif isinstance(value, str):
+        writer.small.append(_STRING)
+        writer.strings.append(value)
+    else:
+        writer.small.append(_NUMBER)
+        writer.numbers.append(value)
+
 
 class State(object):
     __slots__ = ('user', 'opponent', 'weather', 'field', 'trick_room', 'max_chosen_team_size')
@@ -108,6 +225,58 @@ class State(object):
 
         return False
 
+    def zobrist_hash(self):
+        # every component of the state is hashed independently and the results are combined with xor
+        # this lets the StateMutator keep the hash up to date as instructions are applied and reversed
+        state_hash = hash((constants.WEATHER, self.weather))
+        state_hash ^= hash((constants.FIELD, self.field))
+        state_hash ^= hash((constants.TRICK_ROOM, self.trick_room))
+        state_hash ^= hash((constants.MAX_CHOSEN_TEAM_SIZE_DICT, self.max_chosen_team_size))
+        state_hash ^= self.user.zobrist_hash(constants.USER)
+        state_hash ^= self.opponent.zobrist_hash(constants.OPPONENT)
+        return state_hash
+
+    def serialize(self):
+        writer = _Writer()
+        _pack_value(writer, self.weather)
+        _pack_value(writer, self.field)
+        _pack_value(writer, self.trick_room)
+        _pack_value(writer, self.max_chosen_team_size)
+        self.user.pack(writer)
+        self.opponent.pack(writer)
+        return writer.to_bytes()
+
+    def fingerprint(self):
+        # unlike zobrist_hash this does not use python's hash(), which is different in every process
+        # so it can be used to identify a state in another process or in a cache that is kept between runs
+        return int.from_bytes(hashlib.blake2b(self.serialize(), digest_size=8).digest(), 'little')
+
+    def clone(self):
+        return State(
+            self.user.clone(),
+            self.opponent.clone(),
+            self.weather,
+            self.field,
+            self.trick_room,
+            self.max_chosen_team_size
+        )
+
+    @classmethod
+    def deserialize(cls, buffer):
+        reader = _Reader(buffer)
+        weather = reader.value()
+        field = reader.value()
+        trick_room = reader.value()
+        max_chosen_team_size = reader.value()
+        return State(
+            Side.unpack(reader),
+            Side.unpack(reader),
+            weather,
+            field,
+            trick_room,
+            max_chosen_team_size
+        )
+
     @classmethod
     def from_dict(cls, state_dict):
         return State(
@@ -164,6 +333,66 @@ class Side(object):
         else:
             return False
 
+    def zobrist_hash(self, side):
+        side_hash = hash((side, constants.ACTIVE, self.active.id))
+        side_hash ^= hash((side, constants.WISH, self.wish))
+        side_hash ^= hash((side, constants.FUTURE_SIGHT, self.future_sight))
+
+        # a side-condition with a count of 0 is the same as it not existing
+        for condition, count in self.side_conditions.items():
+            if count:
+                side_hash ^= hash((side, constants.SIDE_CONDITIONS, condition, count))
+
+        side_hash ^= self.active.zobrist_hash(side)
+        for pkmn in self.reserve.values():
+            side_hash ^= pkmn.zobrist_hash(side)
+
+        return side_hash
+
+    def pack(self, writer):
+        _pack_value(writer, self.wish[0])
+        _pack_value(writer, self.wish[1])
+        _pack_value(writer, self.future_sight[0])
+        _pack_value(writer, self.future_sight[1])
+
+        # a side-condition with a count of 0 is the same as it not existing
+        side_conditions = sorted((condition, count) for condition, count in self.side_conditions.items() if count)
+        writer.small.append(len(side_conditions))
+        for condition, count in side_conditions:
+            writer.strings.append(condition)
+            writer.small.append(count)
+
+        self.active.pack(writer)
+        writer.small.append(len(self.reserve))
+        for pkmn_id in sorted(self.reserve):
+            self.reserve[pkmn_id].pack(writer)
+
+    def clone(self):
+        return Side(
+            self.active.clone(),
+            {pkmn_id: pkmn.clone() for pkmn_id, pkmn in self.reserve.items()},
+            self.wish,
+            copy(self.side_conditions),
+            self.future_sight
+        )
+
+    @classmethod
+    def unpack(cls, reader):
+        wish = (reader.value(), reader.value())
+        future_sight = (reader.value(), reader.value())
+
+        side_conditions = defaultdict(int)
+        for _ in range(next(reader.small)):
+            side_conditions[next(reader.strings)] = next(reader.small)
+
+        active = Pokemon.unpack(reader)
+        reserve = dict()
+        for _ in range(next(reader.small)):
+            pkmn = Pokemon.unpack(reader)
+            reserve[pkmn.id] = pkmn
+
+        return Side(active, reserve, wish, side_conditions, future_sight)
+
     @classmethod
     def from_dict(cls, side_dict):
         return Side(
@@ -302,21 +531,20 @@ class Pokemon(object):
        }.items(), key=lambda x: x[1])[0]
 
     def get_boost_from_boost_string(self, boost_string):
-        if boost_string == constants.ATTACK:
-            return self.attack_boost
-        elif boost_string == constants.DEFENSE:
-            return self.defense_boost
-        elif boost_string == constants.SPECIAL_ATTACK:
-            return self.special_attack_boost
-        elif boost_string == constants.SPECIAL_DEFENSE:
-            return self.special_defense_boost
-        elif boost_string == constants.SPEED:
-            return self.speed_boost
-        elif boost_string == constants.ACCURACY:
-            return self.accuracy_boost
-        elif boost_string == constants.EVASION:
-            return self.evasion_boost
-        raise ValueError("{} is not a valid boost".format(boost_string))
+        try:
+            return getattr(self, BOOST_ATTRIBUTES[boost_string])
+        except KeyError:
+            raise ValueError("{} is not a valid boost".format(boost_string))
+
+    def get_boosted_stat(self, stat):
+        # the same as calculate_boosted_stats()[stat] without calculating the other stats
+        return boost_multiplier_lookup[getattr(self, BOOST_ATTRIBUTES[stat])] * getattr(self, STAT_ATTRIBUTES[stat])
+
+    def get_move(self, move_name):
+        for move in self.moves:
+            if move[constants.ID] == move_name:
+                return move
+        return None
 
     def forced_move(self):
         if "phantomforce" in self.volatile_status:
@@ -351,6 +579,150 @@ class Pokemon(object):
 
         return True
 
+    def zobrist_hash(self, side):
+        # attributes that are never changed by the StateMutator are hashed together
+        pkmn_hash = hash((side, self.id, self.level, self.ability, self.nature, tuple(self.evs), self.terastallized, tuple(m[constants.ID] for m in self.moves)))
+
+        pkmn_hash ^= hash((side, self.id, constants.HITPOINTS, self.hp))
+        pkmn_hash ^= hash((side, self.id, constants.STATS, (self.maxhp, self.attack, self.defense, self.special_attack, self.special_defense, self.speed)))
+        pkmn_hash ^= hash((side, self.id, constants.STATUS, self.status))
+        pkmn_hash ^= hash((side, self.id, constants.ITEM, self.item))
+        pkmn_hash ^= hash((side, self.id, constants.TYPES, tuple(self.types)))
+        pkmn_hash ^= hash((side, self.id, constants.SEEN, self.seen))
+
+        pkmn_hash ^= hash((side, self.id, constants.ATTACK, self.attack_boost))
+        pkmn_hash ^= hash((side, self.id, constants.DEFENSE, self.defense_boost))
+        pkmn_hash ^= hash((side, self.id, constants.SPECIAL_ATTACK, self.special_attack_boost))
+        pkmn_hash ^= hash((side, self.id, constants.SPECIAL_DEFENSE, self.special_defense_boost))
+        pkmn_hash ^= hash((side, self.id, constants.SPEED, self.speed_boost))
+        pkmn_hash ^= hash((side, self.id, constants.ACCURACY, self.accuracy_boost))
+        pkmn_hash ^= hash((side, self.id, constants.EVASION, self.evasion_boost))
+
+        for volatile_status in self.volatile_status:
+            pkmn_hash ^= hash((side, self.id, constants.VOLATILE_STATUS, volatile_status))
+
+        for move in self.moves:
+            if move.get(constants.DISABLED):
+                pkmn_hash ^= hash((side, self.id, constants.DISABLED, move[constants.ID]))
+
+        return pkmn_hash
+
+    def pack(self, writer):
+        writer.small.extend((
+            self.level,
+            *self.evs,
+            self.attack_boost,
+            self.defense_boost,
+            self.special_attack_boost,
+            self.special_defense_boost,
+            self.speed_boost,
+            self.accuracy_boost,
+            self.evasion_boost,
+            self.terastallized,
+            self.seen,
+            len(self.types),
+            len(self.volatile_status),
+            len(self.moves)
+        ))
+        writer.numbers.extend((
+            self.hp,
+            self.maxhp,
+            self.attack,
+            self.defense,
+            self.special_attack,
+            self.special_defense,
+            self.speed
+        ))
+        writer.strings.extend((
+            self.id,
+            _NONE_STRING if self.ability is None else self.ability,
+            _NONE_STRING if self.item is None else self.item,
+            self.nature,
+            _NONE_STRING if self.status is None else self.status,
+            *self.types,
+            *sorted(self.volatile_status)
+        ))
+        for move in self.moves:
+            current_pp = move.get(constants.CURRENT_PP)
+            writer.strings.append(move[constants.ID])
+            writer.small.append(bool(move.get(constants.DISABLED)))
+            writer.small.append(-1 if current_pp is None else current_pp)
+
+    def clone(self):
+        # __init__ is skipped so that the burn multiplier is not calculated again
+        pkmn = Pokemon.__new__(Pokemon)
+        pkmn.id = self.id
+        pkmn.level = self.level
+        pkmn.types = self.types
+        pkmn.hp = self.hp
+        pkmn.maxhp = self.maxhp
+        pkmn.ability = self.ability
+        pkmn.item = self.item
+        pkmn.attack = self.attack
+        pkmn.defense = self.defense
+        pkmn.special_attack = self.special_attack
+        pkmn.special_defense = self.special_defense
+        pkmn.speed = self.speed
+        pkmn.nature = self.nature
+        pkmn.evs = self.evs
+        pkmn.attack_boost = self.attack_boost
+        pkmn.defense_boost = self.defense_boost
+        pkmn.special_attack_boost = self.special_attack_boost
+        pkmn.special_defense_boost = self.special_defense_boost
+        pkmn.speed_boost = self.speed_boost
+        pkmn.accuracy_boost = self.accuracy_boost
+        pkmn.evasion_boost = self.evasion_boost
+        pkmn.status = self.status
+        pkmn.terastallized = self.terastallized
+        pkmn.burn_multiplier = self.burn_multiplier
+        pkmn.seen = self.seen
+
+        # the StateMutator changes these in place
+        pkmn.volatile_status = set(self.volatile_status)
+        pkmn.moves = [copy(m) for m in self.moves]
+        return pkmn
+
+    @classmethod
+    def unpack(cls, reader):
+        level, *evs_and_boosts, terastallized, seen, number_of_types, number_of_volatile_statuses, number_of_moves = islice(reader.small, 19)
+        evs = tuple(evs_and_boosts[:6])
+        boosts = evs_and_boosts[6:]
+        hp, maxhp, attack, defense, special_attack, special_defense, speed = islice(reader.numbers, 7)
+        identifier, ability, item, nature, status = islice(reader.strings, 5)
+        types = list(islice(reader.strings, number_of_types))
+        volatile_status = set(islice(reader.strings, number_of_volatile_statuses))
+
+        moves = []
+        for move_id in islice(reader.strings, number_of_moves):
+            move = {constants.ID: move_id, constants.DISABLED: bool(next(reader.small))}
+            current_pp = next(reader.small)
+            if current_pp != -1:
+                move[constants.CURRENT_PP] = current_pp
+            moves.append(move)
+
+        return Pokemon(
+            identifier,
+            level,
+            types,
+            hp,
+            maxhp,
+            ability,
+            item,
+            attack,
+            defense,
+            special_attack,
+            special_defense,
+            speed,
+            nature,
+            evs,
+            *boosts,
+            status,
+            bool(terastallized),
+            volatile_status,
+            moves,
+            bool(seen)
+        )
+
     @classmethod
     def from_state_pokemon_dict(cls, d):
         return Pokemon(
@@ -461,12 +833,22 @@ class Pokemon(object):
 
 
 class TransposeInstruction:
-    __slots__ = ('percentage', 'instructions', 'frozen')
+    __slots__ = ('percentage', 'instructions', 'frozen', '_compiled')
 
     def __init__(self, percentage, instructions, frozen=False):
         self.percentage = percentage
         self.instructions = instructions
         self.frozen = frozen
+        self._compiled = tuple()
+
+    def compiled(self):
+        # instructions are only ever added to the end of the list
+        # so only the instructions added since the last call need to be compiled
+        if len(self._compiled) > len(self.instructions):
+            self._compiled = tuple()
+        if len(self._compiled) < len(self.instructions):
+            self._compiled += compile_instructions(self.instructions[len(self._compiled):])
+        return self._compiled
 
     def update_percentage(self, modifier):
         self.percentage *= modifier
@@ -478,7 +860,9 @@ class TransposeInstruction:
         return self.instructions == other.instructions
 
     def __copy__(self):
-        return TransposeInstruction(self.percentage, copy(self.instructions), self.frozen)
+        new_instruction = TransposeInstruction(self.percentage, copy(self.instructions), self.frozen)
+        new_instruction._compiled = self._compiled
+        return new_instruction
 
     def __repr__(self):
         return "{}: {}".format(self.percentage, str(self.instructions))
@@ -489,10 +873,63 @@ class TransposeInstruction:
             self.frozen == other.frozen
 
 
+# the opcode of each instruction is its position in this tuple
+MUTATOR_INSTRUCTIONS = (
+    constants.MUTATOR_SEEN,
+    constants.MUTATOR_SWITCH,
+    constants.MUTATOR_APPLY_VOLATILE_STATUS,
+    constants.MUTATOR_REMOVE_VOLATILE_STATUS,
+    constants.MUTATOR_DAMAGE,
+    constants.MUTATOR_HEAL,
+    constants.MUTATOR_BOOST,
+    constants.MUTATOR_UNBOOST,
+    constants.MUTATOR_APPLY_STATUS,
+    constants.MUTATOR_REMOVE_STATUS,
+    constants.MUTATOR_SIDE_START,
+    constants.MUTATOR_SIDE_END,
+    constants.MUTATOR_WISH_START,
+    constants.MUTATOR_WISH_DECREMENT,
+    constants.MUTATOR_FUTURESIGHT_START,
+    constants.MUTATOR_FUTURESIGHT_DECREMENT,
+    constants.MUTATOR_DISABLE_MOVE,
+    constants.MUTATOR_ENABLE_MOVE,
+    constants.MUTATOR_WEATHER_START,
+    constants.MUTATOR_FIELD_START,
+    constants.MUTATOR_FIELD_END,
+    constants.MUTATOR_TOGGLE_TRICKROOM,
+    constants.MUTATOR_CHANGE_TYPE,
+    constants.MUTATOR_CHANGE_ITEM,
+    constants.MUTATOR_CHANGE_STATS,
+)
+MUTATOR_OPCODES = {instruction: opcode for opcode, instruction in enumerate(MUTATOR_INSTRUCTIONS)}
+
+
+def compile_instructions(instructions):
+    """
+    Encodes a list of instructions as (opcode, arguments) tuples for StateMutator.apply_compiled
+
+    Applying compiled instructions does not look up the instruction's method or copy its arguments,
+    so instructions that are applied and reversed more than once should be compiled first.
+    """
+    return tuple(
+        (MUTATOR_OPCODES[instruction[0]], instruction[1:])
+        for instruction in instructions
+    )
+
+
 class StateMutator:
 
     def __init__(self, state):
         self.state = state
+
+        # a hash of the state that is kept up to date as instructions are applied and reversed
+        # it is calculated the first time it is used and is only valid as long as
+        # the state is modified exclusively through this object from then on
+        self._hash = None
+
+        # the parts of the state's score are kept up to date in the same way once the state is first evaluated
+        self._evaluation = None
+
         self.apply_instructions = {
             constants.MUTATOR_SEEN: self.seen,
             constants.MUTATOR_SWITCH: self.switch,
@@ -548,6 +985,10 @@ class StateMutator:
             constants.MUTATOR_CHANGE_STATS: self.reverse_change_stats
         }
 
+        # the methods for compiled instructions are looked up by opcode
+        self.apply_functions = [self.apply_instructions[instruction] for instruction in MUTATOR_INSTRUCTIONS]
+        self.reverse_functions = [self.reverse_instructions[instruction] for instruction in MUTATOR_INSTRUCTIONS]
+
     def apply_one(self, instruction):
         method = self.apply_instructions[instruction[0]]
         method(*instruction[1:])
@@ -562,217 +1003,305 @@ class StateMutator:
             method = self.reverse_instructions[instruction[0]]
             method(*instruction[1:])
 
+    def apply_compiled(self, compiled_instructions):
+        apply_functions = self.apply_functions
+        for opcode, arguments in compiled_instructions:
+            apply_functions[opcode](*arguments)
+
+    def reverse_compiled(self, compiled_instructions):
+        reverse_functions = self.reverse_functions
+        for opcode, arguments in reversed(compiled_instructions):
+            reverse_functions[opcode](*arguments)
+
     def get_side(self, side):
         return getattr(self.state, side)
 
-    def disable_move(self, side, move_name):
-        side = self.get_side(side)
-        try:
-            move = next(filter(lambda x: x[constants.ID] == move_name, side.active.moves))
-        except StopIteration:
+    @property
+    def hash(self):
+        if self._hash is None:
+            self._hash = self.state.zobrist_hash()
+        return self._hash
+
+    def evaluate(self):
+        if self._evaluation is None:
+            self._evaluation = IncrementalEvaluation(self.state)
+        return self._evaluation.evaluate()
+
+    def pokemon_changed(self, side_string, pkmn):
+        if self._evaluation is not None:
+            self._evaluation.changed_pokemon.add((side_string, pkmn.id))
+
+    def side_conditions_changed(self, side_string):
+        if self._evaluation is not None:
+            self._evaluation.changed_sides.add(side_string)
+
+    def update_hash(self, *component):
+        # xor-ing a component into the hash and xor-ing it out are the same operation
+        if self._hash is not None:
+            self._hash ^= hash(component)
+
+    def disable_move(self, side_string, move_name):
+        side = self.get_side(side_string)
+        move = side.active.get_move(move_name)
+        if move is None:
             raise ValueError("{} not in pokemon's moves: {}".format(move_name, side.active.moves))
 
+        if not move.get(constants.DISABLED):
+            self.update_hash(side_string, side.active.id, constants.DISABLED, move_name)
         move[constants.DISABLED] = True
 
-    def enable_move(self, side, move_name):
-        side = self.get_side(side)
-        try:
-            move = next(filter(lambda x: x[constants.ID] == move_name, side.active.moves))
-        except StopIteration:
+    def enable_move(self, side_string, move_name):
+        side = self.get_side(side_string)
+        move = side.active.get_move(move_name)
+        if move is None:
             raise ValueError("{} not in pokemon's moves: {}".format(move_name, side.active.moves))
 
+        if move.get(constants.DISABLED):
+            self.update_hash(side_string, side.active.id, constants.DISABLED, move_name)
         move[constants.DISABLED] = False
 
-
-    def seen(self, side, pokemon_name):
-        side = self.get_side(side)
+    def set_seen(self, side_string, pokemon_name, seen):
+        side = self.get_side(side_string)
         if side.active.id == pokemon_name:
-            side.active.seen = True
+            pkmn = side.active
         else:
-            reserve = side.reserve[pokemon_name]
-            reserve.seen = True
+            pkmn = side.reserve[pokemon_name]
+
+        self.update_hash(side_string, pkmn.id, constants.SEEN, pkmn.seen)
+        pkmn.seen = seen
+        self.update_hash(side_string, pkmn.id, constants.SEEN, pkmn.seen)
+
+    def seen(self, side, pokemon_name):
+        self.set_seen(side, pokemon_name, True)
 
     def reverse_seen(self, side, pokemon_name):
-        side = self.get_side(side)
-        if side.active.id == pokemon_name:
-            side.active.seen = False
-        else:
-            reserve = side.reserve[pokemon_name]
-            reserve.seen = False
+        self.set_seen(side, pokemon_name, False)
 
-    def switch(self, side, _, switch_pokemon_name):
+    def switch(self, side_string, _, switch_pokemon_name):
         # the second parameter to this function is the current active pokemon
         # this value must be here for reversing purposes
-        side = self.get_side(side)
+        side = self.get_side(side_string)
 
+        self.update_hash(side_string, constants.ACTIVE, side.active.id)
         side.reserve[side.active.id] = side.active
         side.active = side.reserve.pop(switch_pokemon_name)
+        self.update_hash(side_string, constants.ACTIVE, side.active.id)
+
+        # hazards are scored using the number of reserves that are alive
+        self.side_conditions_changed(side_string)
 
     def reverse_switch(self, side, previous_active, current_active):
         self.switch(side, current_active, previous_active)
 
-    def apply_volatile_status(self, side, volatile_status):
-        side = self.get_side(side)
+    def apply_volatile_status(self, side_string, volatile_status):
+        side = self.get_side(side_string)
+        if volatile_status not in side.active.volatile_status:
+            self.update_hash(side_string, side.active.id, constants.VOLATILE_STATUS, volatile_status)
         side.active.volatile_status.add(volatile_status)
+        self.pokemon_changed(side_string, side.active)
 
-    def remove_volatile_status(self, side, volatile_status):
-        side = self.get_side(side)
+    def remove_volatile_status(self, side_string, volatile_status):
+        side = self.get_side(side_string)
         side.active.volatile_status.remove(volatile_status)
+        self.update_hash(side_string, side.active.id, constants.VOLATILE_STATUS, volatile_status)
+        self.pokemon_changed(side_string, side.active)
 
-    def damage(self, side, amount):
-        side = self.get_side(side)
+    def damage(self, side_string, amount):
+        side = self.get_side(side_string)
+        self.update_hash(side_string, side.active.id, constants.HITPOINTS, side.active.hp)
         side.active.hp -= amount
+        self.update_hash(side_string, side.active.id, constants.HITPOINTS, side.active.hp)
+        self.pokemon_changed(side_string, side.active)
 
-    def heal(self, side, amount):
-        side = self.get_side(side)
+    def heal(self, side_string, amount):
+        side = self.get_side(side_string)
+        self.update_hash(side_string, side.active.id, constants.HITPOINTS, side.active.hp)
         side.active.hp += amount
-
-    def boost(self, side, stat, amount):
-        side = self.get_side(side)
-        if stat == constants.ATTACK:
-            side.active.attack_boost += amount
-        elif stat == constants.DEFENSE:
-            side.active.defense_boost += amount
-        elif stat == constants.SPECIAL_ATTACK:
-            side.active.special_attack_boost += amount
-        elif stat == constants.SPECIAL_DEFENSE:
-            side.active.special_defense_boost += amount
-        elif stat == constants.SPEED:
-            side.active.speed_boost += amount
-        elif stat == constants.ACCURACY:
-            side.active.accuracy_boost += amount
-        elif stat == constants.EVASION:
-            side.active.evasion_boost += amount
-        else:
-            raise ValueError("Invalid stat: {}".format(stat))
+        self.update_hash(side_string, side.active.id, constants.HITPOINTS, side.active.hp)
+        self.pokemon_changed(side_string, side.active)
+
+    def boost(self, side_string, stat, amount):
+        side = self.get_side(side_string)
+        boost_attribute = BOOST_ATTRIBUTES[stat]
+        old_boost = getattr(side.active, boost_attribute)
+        setattr(side.active, boost_attribute, old_boost + amount)
+        self.update_hash(side_string, side.active.id, stat, old_boost)
+        self.update_hash(side_string, side.active.id, stat, old_boost + amount)
+        self.pokemon_changed(side_string, side.active)
 
     def unboost(self, side, stat, amount):
         self.boost(side, stat, -1*amount)
 
-    def apply_status(self, side, status):
-        side = self.get_side(side)
+    def apply_status(self, side_string, status):
+        side = self.get_side(side_string)
+        self.update_hash(side_string, side.active.id, constants.STATUS, side.active.status)
         side.active.status = status
+        self.update_hash(side_string, side.active.id, constants.STATUS, side.active.status)
+        self.pokemon_changed(side_string, side.active)
 
     def remove_status(self, side, _):
         # the second parameter of this function is the status being removed
         # this value must be here for reverse purposes
         self.apply_status(side, None)
 
-    def side_start(self, side, effect, amount):
-        side = self.get_side(side)
+    def change_side_condition(self, side_string, effect, amount):
+        side = self.get_side(side_string)
+
+        # a side-condition with a count of 0 is not part of the hash
+        if side.side_conditions[effect]:
+            self.update_hash(side_string, constants.SIDE_CONDITIONS, effect, side.side_conditions[effect])
         side.side_conditions[effect] += amount
+        if side.side_conditions[effect]:
+            self.update_hash(side_string, constants.SIDE_CONDITIONS, effect, side.side_conditions[effect])
+
+        self.side_conditions_changed(side_string)
+        if effect == constants.TOXIC_COUNT and self._evaluation is not None:
+            # every badly poisoned pokemon is scored using the toxic count of its side
+            self.pokemon_changed(side_string, side.active)
+            for pkmn in side.reserve.values():
+                self.pokemon_changed(side_string, pkmn)
+
+    def side_start(self, side, effect, amount):
+        self.change_side_condition(side, effect, amount)
 
     def reverse_side_start(self, side, effect, amount):
-        side = self.get_side(side)
-        side.side_conditions[effect] -= amount
+        self.change_side_condition(side, effect, -1*amount)
 
     def side_end(self, side, effect, amount):
-        side = self.get_side(side)
-        side.side_conditions[effect] -= amount
+        self.change_side_condition(side, effect, -1*amount)
 
     def reverse_side_end(self, side, effect, amount):
         self.side_start(side, effect, amount)
 
+    def set_future_sight(self, side_string, future_sight):
+        side = self.get_side(side_string)
+        self.update_hash(side_string, constants.FUTURE_SIGHT, side.future_sight)
+        side.future_sight = future_sight
+        self.update_hash(side_string, constants.FUTURE_SIGHT, side.future_sight)
+
     def start_futuresight(self, side, pkmn_name, _):
         # the second parameter is the current futuresight_amount
         # it is here for reversing purposes
-        side = self.get_side(side)
-        side.future_sight = (3, pkmn_name)
+        self.set_future_sight(side, (3, pkmn_name))
 
     def reverse_start_futuresight(self, side, _, old_pkmn_name):
-        side = self.get_side(side)
-        side.future_sight = (0, old_pkmn_name)
+        self.set_future_sight(side, (0, old_pkmn_name))
 
     def decrement_futuresight(self, side):
-        side = self.get_side(side)
-        side.future_sight = (side.future_sight[0] - 1, side.future_sight[1])
+        future_sight = self.get_side(side).future_sight
+        self.set_future_sight(side, (future_sight[0] - 1, future_sight[1]))
 
     def reverse_decrement_futuresight(self, side):
-        side = self.get_side(side)
-        side.future_sight = (side.future_sight[0] + 1, side.future_sight[1])
+        future_sight = self.get_side(side).future_sight
+        self.set_future_sight(side, (future_sight[0] + 1, future_sight[1]))
+
+    def set_wish(self, side_string, wish):
+        side = self.get_side(side_string)
+        self.update_hash(side_string, constants.WISH, side.wish)
+        side.wish = wish
+        self.update_hash(side_string, constants.WISH, side.wish)
 
     def start_wish(self, side, health, _):
         # the third parameter is the current wish amount
         # it is here for reversing purposes
-        side = self.get_side(side)
-        side.wish = (2, health)
+        self.set_wish(side, (2, health))
 
     def reserve_start_wish(self, side, _, previous_wish_amount):
-        side = self.get_side(side)
-        side.wish = (0, previous_wish_amount)
+        self.set_wish(side, (0, previous_wish_amount))
 
     def decrement_wish(self, side):
-        side = self.get_side(side)
-        side.wish = (side.wish[0] - 1, side.wish[1])
+        wish = self.get_side(side).wish
+        self.set_wish(side, (wish[0] - 1, wish[1]))
 
     def reverse_decrement_wish(self, side):
-        side = self.get_side(side)
-        side.wish = (side.wish[0] + 1, side.wish[1])
+        wish = self.get_side(side).wish
+        self.set_wish(side, (wish[0] + 1, wish[1]))
+
+    def set_weather(self, weather):
+        self.update_hash(constants.WEATHER, self.state.weather)
+        self.state.weather = weather
+        self.update_hash(constants.WEATHER, self.state.weather)
 
     def start_weather(self, weather, _):
         # the second parameter is the current weather
         # the value is here for reversing purposes
-        self.state.weather = weather
+        self.set_weather(weather)
 
     def reverse_start_weather(self, _, old_weather):
-        self.state.weather = old_weather
+        self.set_weather(old_weather)
+
+    def set_field(self, field):
+        self.update_hash(constants.FIELD, self.state.field)
+        self.state.field = field
+        self.update_hash(constants.FIELD, self.state.field)
 
     def start_field(self, field, _):
         # the second parameter is the current field
         # the value is here for reversing purposes
-        self.state.field = field
+        self.set_field(field)
 
     def reverse_start_field(self, _, old_field):
-        self.state.field = old_field
+        self.set_field(old_field)
 
     def end_field(self, _):
         # the second parameter is the current field
         # the value is here for reversing purposes
-        self.state.field = None
+        self.set_field(None)
 
     def reverse_end_field(self, old_field):
-        self.state.field = old_field
+        self.set_field(old_field)
 
     def toggle_trickroom(self):
+        self.update_hash(constants.TRICK_ROOM, self.state.trick_room)
         self.state.trick_room ^= True
+        self.update_hash(constants.TRICK_ROOM, self.state.trick_room)
+
+    def set_types(self, side_string, types):
+        side = self.get_side(side_string)
+        self.update_hash(side_string, side.active.id, constants.TYPES, tuple(side.active.types))
+        side.active.types = types
+        self.update_hash(side_string, side.active.id, constants.TYPES, tuple(side.active.types))
 
     def change_types(self, side, new_types, _):
         # the third parameter is the current types of the active pokemon
         # they must be here for reversing purposes
-        side = self.get_side(side)
-        side.active.types = new_types
+        self.set_types(side, new_types)
 
     def reverse_change_types(self, side, _, old_types):
-        side = self.get_side(side)
-        side.active.types = old_types
+        self.set_types(side, old_types)
+
+    def set_item(self, side_string, item):
+        side = self.get_side(side_string)
+        self.update_hash(side_string, side.active.id, constants.ITEM, side.active.item)
+        side.active.item = item
+        self.update_hash(side_string, side.active.id, constants.ITEM, side.active.item)
 
     def change_item(self, side, new_item, _):
         # the third parameter is the current item
         # it must be here for reversing purposes
-        side = self.get_side(side)
-        side.active.item = new_item
+        self.set_item(side, new_item)
 
     def reverse_change_item(self, side, _, old_item):
-        side = self.get_side(side)
-        side.active.item = old_item
+        self.set_item(side, old_item)
+
+    def set_stats(self, side_string, stats):
+        side = self.get_side(side_string)
+        pkmn = side.active
+        self.update_hash(side_string, pkmn.id, constants.STATS, (pkmn.maxhp, pkmn.attack, pkmn.defense, pkmn.special_attack, pkmn.special_defense, pkmn.speed))
+        pkmn.maxhp = stats[0]
+        pkmn.attack = stats[1]
+        pkmn.defense = stats[2]
+        pkmn.special_attack = stats[3]
+        pkmn.special_defense = stats[4]
+        pkmn.speed = stats[5]
+        self.update_hash(side_string, pkmn.id, constants.STATS, (pkmn.maxhp, pkmn.attack, pkmn.defense, pkmn.special_attack, pkmn.special_defense, pkmn.speed))
+        self.pokemon_changed(side_string, pkmn)
 
     def change_stats(self, side, new_stats, _):
         # the third parameter is the old stats
         # is must be here for reversing purposes
-        side = self.get_side(side)
-        side.active.maxhp = new_stats[0]
-        side.active.attack = new_stats[1]
-        side.active.defense = new_stats[2]
-        side.active.special_attack = new_stats[3]
-        side.active.special_defense = new_stats[4]
-        side.active.speed = new_stats[5]
+        self.set_stats(side, new_stats)
 
     def reverse_change_stats(self, side, _, old_stats):
         # the second parameter are the new stats
-        side = self.get_side(side)
-        side.active.maxhp = old_stats[0]
-        side.active.attack = old_stats[1]
-        side.active.defense = old_stats[2]
-        side.active.special_attack = old_stats[3]
-        side.active.special_defense = old_stats[4]
-        side.active.speed = old_stats[5]
+        self.set_stats(side, old_stats)
@@ -0,0 +1,161 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import data
+from config import ShowdownConfig
+from data.mods.apply_mods import apply_mods
+
+from .evaluate import Scoring
+from .objects import StateMutator
+from .move_ordering import MoveOrdering
+from .select_best_move import get_payoff_matrix
+from .select_best_move import pick_safest
+from .transposition_table import TranspositionTable
+
+
+# the process pool is kept between decisions so that every worker only loads the data once
+# it is shared by every battle that is running
+_process_pool = None
+_process_pool_key = None
+_process_pool_lock = threading.Lock()
+
+# the tasks that have not finished, so they can be cancelled when the pool is shut down
+# `shutdown(cancel_futures=True)` would do this but it needs Python 3.9
+_pending_futures = set()
+
+# each worker keeps its own transposition table between the tasks it is given
+_worker_transposition_table = TranspositionTable()
+_worker_search_settings = None
+
+
+def _initialize_worker(generation):
+    # `data` has loaded the moves and pokedex by the time it is imported
+    # the generation's changes to them only need to be applied once per worker
+    if generation is not None:
+        apply_mods(generation)
+
+
+def get_process_pool(num_processes, generation):
+    global _process_pool, _process_pool_key
+
+    with _process_pool_lock:
+        if _process_pool is None or _process_pool_key != (num_processes, generation):
+            shutdown_process_pool()
+
+            # workers are spawned rather than forked so they start from the unmodified data
+            _process_pool = ProcessPoolExecutor(
+                max_workers=num_processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_initialize_worker,
+                initargs=(generation,)
+            )
+            _process_pool_key = (num_processes, generation)
+
+        return _process_pool
+
+
+def shutdown_process_pool():
+    global _process_pool, _process_pool_key
+    if _process_pool is not None:
+        for future in list(_pending_futures):
+            future.cancel()
+        _process_pool.shutdown()
+        _pending_futures.clear()
+    _process_pool = None
+    _process_pool_key = None
+
+
+def get_search_settings(transposition_table_size):
+    # the parts of the search that are changed for each battle and need to be copied to the workers
+    return (
+        dict(data.effectiveness),
+        Scoring.POKEMON_ALIVE_STATIC,
+        ShowdownConfig.damage_calc_type,
+        ShowdownConfig.search_probability_floor,
+        transposition_table_size
+    )
+
+
+def _use_search_settings(search_settings):
+    global _worker_search_settings
+    if search_settings == _worker_search_settings:
+        return
+
+    effectiveness, pokemon_alive_static, damage_calc_type, probability_floor, transposition_table_size = search_settings
+    data.effectiveness.clear()
+    data.effectiveness.update(effectiveness)
+    Scoring.POKEMON_ALIVE_STATIC = pokemon_alive_static
+    ShowdownConfig.damage_calc_type = damage_calc_type
+    ShowdownConfig.search_probability_floor = probability_floor
+
+    # scores remembered with the previous settings are no longer correct
+    _worker_transposition_table.clear()
+    _worker_transposition_table.max_size = transposition_table_size
+    _worker_search_settings = search_settings
+
+
+def _search_rows(search_settings, state, user_options, opponent_options, depth, prune, alpha, deadline):
+    _use_search_settings(search_settings)
+    mutator = StateMutator(state)
+    return get_payoff_matrix(
+        mutator,
+        user_options,
+        opponent_options,
+        depth=depth,
+        prune=prune,
+        transposition_table=_worker_transposition_table,
+        deadline=deadline,
+        alpha=alpha,
+        move_ordering=MoveOrdering(),
+        probability_floor=ShowdownConfig.search_probability_floor
+    )
+
+
+def get_payoff_matrices_in_parallel(pool, search_settings, states_and_options, depth=2, prune=True, deadline=None):
+    """
+    Searches each user option of each state in its own task in `pool`
+
+    When pruning, the first user option of every state is searched first so that the rest
+    of that state's user options can be pruned using its score. If every state has the same first
+    user option, its worst score over all of the states is used to prune all of them.
+
+    :param pool: a ProcessPoolExecutor from get_process_pool
+    :param search_settings: the result of get_search_settings
+    :param states_and_options: a list of (state, user_options, opponent_options)
+    :return: a list containing the payoff matrix of each state. These are the same as get_payoff_matrix returns
+    """
+    def submit(state, user_options, opponent_options, alpha):
+        future = pool.submit(_search_rows, search_settings, state, user_options, opponent_options, depth, prune, alpha, deadline)
+        _pending_futures.add(future)
+        future.add_done_callback(_pending_futures.discard)
+        return future
+
+    payoff_matrices = [dict() for _ in states_and_options]
+
+    if prune:
+        first_row_futures = [submit(state, user_options[:1], opponent_options, float('-inf')) for state, user_options, opponent_options in states_and_options]
+        for i, future in enumerate(first_row_futures):
+            payoff_matrices[i].update(future.result())
+        alphas = [pick_safest(scores)[1] for scores in payoff_matrices]
+
+        # when every state starts with the same option the bot is guaranteed its worst score over all of the states
+        first_user_options = set(user_options[0] for _, user_options, _ in states_and_options)
+        if len(first_user_options) == 1:
+            alphas = [min(alphas)] * len(alphas)
+
+        remaining_row_futures = [
+            [submit(state, [user_option], opponent_options, alphas[i]) for user_option in user_options[1:]]
+            for i, (state, user_options, opponent_options) in enumerate(states_and_options)
+        ]
+    else:
+        remaining_row_futures = [
+            [submit(state, [user_option], opponent_options, float('-inf')) for user_option in user_options]
+            for state, user_options, opponent_options in states_and_options
+        ]
+
+    for i, futures in enumerate(remaining_row_futures):
+        for future in futures:
+            payoff_matrices[i].update(future.result())
+
+    return payoff_matrices
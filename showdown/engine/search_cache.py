@@ -0,0 +1,185 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import data
+from config import ShowdownConfig
+
+from .evaluate import Scoring
+from .objects import SERIALIZATION_VERSION
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 100000
+
+# the engine's source and the data it reads decide the result of a search
+# results saved by a different version of either are never used
+_ENGINE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+_DATA_DIRECTORY = os.path.dirname(os.path.abspath(data.__file__))
+_ENGINE_PATHS = [
+    _ENGINE_DIRECTORY,
+    os.path.join(_DATA_DIRECTORY, 'moves.json'),
+    os.path.join(_DATA_DIRECTORY, 'pokedex.json'),
+    os.path.join(_DATA_DIRECTORY, 'mods')
+]
+
+_engine_version = None
+
+
+def get_engine_version():
+    global _engine_version
+    if _engine_version is not None:
+        return _engine_version
+
+    digest = hashlib.blake2b(str(SERIALIZATION_VERSION).encode(), digest_size=16)
+    for path in _ENGINE_PATHS:
+        if os.path.isdir(path):
+            file_names = sorted(
+                os.path.join(directory, f)
+                for directory, _, files in os.walk(path)
+                for f in files if f.endswith(('.py', '.json'))
+            )
+        else:
+            file_names = [path]
+
+        for file_name in file_names:
+            digest.update(os.path.relpath(file_name, path).encode())
+            with open(file_name, 'rb') as f:
+                digest.update(f.read())
+
+    _engine_version = digest.hexdigest()
+    return _engine_version
+
+
+def get_search_cache_key(states_and_options, depth, prune, generation):
+    """
+    Creates the key of a search of the states in `states_and_options` to `depth`
+
+    The key contains the fingerprint and options of every state, the engine version, and the
+    settings that are changed for each battle and change the result of a search
+    """
+    key = {
+        'engine_version': get_engine_version(),
+        'generation': generation,
+        'depth': depth,
+        'prune': prune,
+        'damage_calc_type': ShowdownConfig.damage_calc_type,
+        'probability_floor': ShowdownConfig.search_probability_floor,
+        'pokemon_alive_static': Scoring.POKEMON_ALIVE_STATIC,
+        'effectiveness': data.effectiveness,
+        'states': [
+            (state.fingerprint(), sorted(user_options), sorted(opponent_options))
+            for state, user_options, opponent_options in states_and_options
+        ]
+    }
+    return hashlib.blake2b(json.dumps(key, sort_keys=True).encode(), digest_size=16).digest()
+
+
+def _payoff_matrices_to_json(payoff_matrices):
+    # json keys must be strings, so each matrix is stored as a list of [user_move, opponent_move, score]
+    return json.dumps([[[user_move, opponent_move, score] for (user_move, opponent_move), score in m.items()] for m in payoff_matrices])
+
+
+def _payoff_matrices_from_json(payoff_matrices_json):
+    return [{(user_move, opponent_move): score for user_move, opponent_move, score in m} for m in json.loads(payoff_matrices_json)]
+
+
+class SearchCache:
+    """
+    Stores the payoff matrices of a search in an SQLite database so they can be used in later battles
+
+    The cache is disabled until it is opened with a path.
+    Entries are keyed by get_search_cache_key.
+    When there are more than `max_size` entries the ones that were used least recently are removed.
+    An error reading or writing the database is logged and treated as a cache miss.
+    The connection is shared by the threads of every battle that is running, so it is only used by one at a time.
+    """
+
+    def __init__(self, path=None, max_size=DEFAULT_MAX_SIZE):
+        self.path = None
+        self.max_size = max_size
+        self.connection = None
+        self.lock = threading.RLock()
+        if path is not None:
+            self.open(path, max_size)
+
+    def open(self, path, max_size=DEFAULT_MAX_SIZE):
+        with self.lock:
+            self.max_size = max_size
+            if path == self.path:
+                return
+
+            self.close()
+            if path is None or max_size <= 0:
+                return
+
+            try:
+                self.connection = sqlite3.connect(path, timeout=10, check_same_thread=False)
+                self.connection.execute(
+                    "CREATE TABLE IF NOT EXISTS search_results ("
+                    "key BLOB PRIMARY KEY, "
+                    "payoff_matrices TEXT NOT NULL, "
+                    "last_used REAL NOT NULL)"
+                )
+                self.connection.execute("CREATE INDEX IF NOT EXISTS search_results_last_used ON search_results (last_used)")
+                self.connection.commit()
+                self.path = path
+            except sqlite3.Error as e:
+                logger.warning("Could not open the search cache at {}: {}".format(path, e))
+                self.close()
+
+    def close(self):
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+            self.connection = None
+            self.path = None
+
+    def get(self, key):
+        with self.lock:
+            if self.connection is None:
+                return None
+
+            try:
+                row = self.connection.execute("SELECT payoff_matrices FROM search_results WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+
+                self.connection.execute("UPDATE search_results SET last_used = ? WHERE key = ?", (time.time(), key))
+                self.connection.commit()
+                return _payoff_matrices_from_json(row[0])
+            except sqlite3.Error as e:
+                logger.warning("Could not read from the search cache: {}".format(e))
+                return None
+
+    def store(self, key, payoff_matrices):
+        with self.lock:
+            if self.connection is None:
+                return
+
+            try:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO search_results (key, payoff_matrices, last_used) VALUES (?, ?, ?)",
+                    (key, _payoff_matrices_to_json(payoff_matrices), time.time())
+                )
+                number_to_remove = len(self) - self.max_size
+                if number_to_remove > 0:
+                    self.connection.execute(
+                        "DELETE FROM search_results WHERE key IN "
+                        "(SELECT key FROM search_results ORDER BY last_used LIMIT ?)",
+                        (number_to_remove,)
+                    )
+                self.connection.commit()
+            except sqlite3.Error as e:
+                logger.warning("Could not write to the search cache: {}".format(e))
+
+    def __len__(self):
+        with self.lock:
+            if self.connection is None:
+                return 0
+            return self.connection.execute("SELECT COUNT(*) FROM search_results").fetchone()[0]
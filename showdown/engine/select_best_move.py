@@ -1,10 +1,14 @@
 import math
+import time
 from collections import defaultdict
 
 import constants
 
-from .evaluate import evaluate
+from .evaluate import evaluation_bounds
 from .find_state_instructions import get_all_state_instructions
+from .transposition_table import EXACT
+from .transposition_table import LOWER_BOUND
+from .transposition_table import UPPER_BOUND
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,6 +16,10 @@ logger = logging.getLogger(__name__)
 WON_BATTLE = 100
 
 
+class SearchTimeout(Exception):
+    pass
+
+
 def remove_guaranteed_opponent_moves(score_lookup):
     """This method removes enemy moves from the score-lookup that do not give the bot a choice.
        For example - if the bot has 1 pokemon left, the opponent is faster, and can kill your active pokemon with move X
@@ -66,73 +74,270 @@ def move_item_to_front_of_list(l, item):
     return [l[i] for i in all_indicies]
 
 
-def get_payoff_matrix(mutator, user_options, opponent_options, depth=2, prune=True):
+def order_options(user_options, opponent_options, move_pair):
+    # searching the best move-pair first lets the search prune more of the tree
+    user_move, opponent_move = move_pair
+    if user_move in user_options:
+        user_options = move_item_to_front_of_list(user_options, user_move)
+    if opponent_move in opponent_options:
+        opponent_options = move_item_to_front_of_list(opponent_options, opponent_move)
+    return user_options, opponent_options
+
+
+def get_safest_score(mutator, depth, prune=True, transposition_table=None, deadline=None, cancel=None, alpha=float('-inf'), beta=float('inf'), move_ordering=None, probability_floor=0):
+    """
+    :param mutator: a StateMutator object representing the state of the battle
+    :param depth: the remaining depth before the state is evaluated
+    :param prune: specify whether or not to prune the tree
+    :param transposition_table: an optional TranspositionTable used to remember the scores of states already searched
+    :param deadline: an optional time.time() value after which a SearchTimeout is raised
+    :param cancel: an optional threading.Event. A SearchTimeout is raised once it is set
+    :param alpha: a score that the bot is already guaranteed elsewhere in the search
+    :param beta: a score that the opponent can already hold the bot to elsewhere in the search
+    :param move_ordering: an optional MoveOrdering object used to decide which moves are searched first
+    :param probability_floor: outcomes of a turn that are less likely than this are not searched
+    :return: the score of the safest move combination from the mutator's state.
+             A score <= alpha is only an upper bound and a score >= beta is only a lower bound of the real score
+    """
+    best_reply = None
+    if transposition_table is not None:
+        entry = transposition_table.get(mutator.hash, depth, alpha, beta)
+        if entry is not None:
+            return entry.score
+
+        # a shallower search of this state still knows which move-pair is likely to be the best
+        best_reply = transposition_table.get_best_reply(mutator.hash)
+
+    user_options, opponent_options = mutator.state.get_all_options()
+    if move_ordering is not None:
+        user_options, opponent_options = move_ordering.order(mutator.state, user_options, opponent_options, depth, best_reply)
+    elif best_reply is not None:
+        user_options, opponent_options = order_options(user_options, opponent_options, best_reply)
+
+    best_reply, score = pick_safest(
+        get_payoff_matrix(
+            mutator,
+            user_options,
+            opponent_options,
+            depth=depth,
+            prune=prune,
+            transposition_table=transposition_table,
+            deadline=deadline,
+            cancel=cancel,
+            alpha=alpha,
+            beta=beta,
+            move_ordering=move_ordering,
+            probability_floor=probability_floor
+        )
+    )
+
+    if transposition_table is not None:
+        if score <= alpha:
+            flag = UPPER_BOUND
+        elif score >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        transposition_table.store(mutator.hash, depth, score, best_reply, flag)
+
+    return score
+
+
+def get_move_pair_score(mutator, user_move, opponent_move, depth, prune=True, transposition_table=None, deadline=None, cancel=None, alpha=float('-inf'), beta=float('inf'), move_ordering=None, probability_floor=0):
+    """
+    :return: the expected score of the bot using `user_move` and the opponent using `opponent_move`.
+             A score <= alpha is only an upper bound and a score >= beta is only a lower bound of the real score
+    """
+    state_instructions = get_all_state_instructions(mutator, user_move, opponent_move, probability_floor)
+
+    # the outcomes that are not searched yet can only score between the lowest and highest score of any state
+    # so the window tells when the outcomes already searched decide which side of the window the score is on
+    use_window = depth > 0 and (alpha > float('-inf') or beta < float('inf'))
+    if use_window:
+        lowest_score, highest_score = evaluation_bounds(mutator.state, depth)
+        lowest_score -= WON_BATTLE*depth
+        highest_score += WON_BATTLE*depth
+
+    last_index = len(state_instructions) - 1
+    remaining_percentage = sum(i.percentage for i in state_instructions)
+    score = 0
+    for i, instructions in enumerate(state_instructions):
+        this_percentage = instructions.percentage
+        if use_window:
+            if score + remaining_percentage*highest_score <= alpha:
+                return min(score + remaining_percentage*highest_score, alpha)
+            elif score + remaining_percentage*lowest_score >= beta:
+                return max(score + remaining_percentage*lowest_score, beta)
+
+        # from here on `remaining_percentage` is the probability of the outcomes after this one
+        remaining_percentage = max(remaining_percentage - this_percentage, 0) if i < last_index else 0
+
+        mutator.apply(instructions.instructions)
+        try:
+            if depth == 0:
+                t_score = mutator.evaluate()
+
+            elif use_window and this_percentage > 0:
+                outcome_alpha = (alpha - score - remaining_percentage*highest_score) / this_percentage
+                outcome_beta = (beta - score - remaining_percentage*lowest_score) / this_percentage
+                t_score = get_safest_score(mutator, depth, prune=prune, transposition_table=transposition_table, deadline=deadline, cancel=cancel, alpha=outcome_alpha, beta=outcome_beta, move_ordering=move_ordering, probability_floor=probability_floor)
+
+                # rounding must not turn a bound into a score that looks exact
+                if t_score <= outcome_alpha:
+                    return min(score + t_score*this_percentage + remaining_percentage*highest_score, alpha)
+                elif t_score >= outcome_beta:
+                    return max(score + t_score*this_percentage + remaining_percentage*lowest_score, beta)
+
+            else:
+                t_score = get_safest_score(mutator, depth, prune=prune, transposition_table=transposition_table, deadline=deadline, cancel=cancel, move_ordering=move_ordering, probability_floor=probability_floor)
+        finally:
+            mutator.reverse(instructions.instructions)
+
+        score += t_score * this_percentage
+
+    return score
+
+
+def get_payoff_matrix(mutator, user_options, opponent_options, depth=2, prune=True, transposition_table=None, deadline=None, cancel=None, alpha=float('-inf'), beta=float('inf'), move_ordering=None, probability_floor=0):
     """
     :param mutator: a StateMutator object representing the state of the battle
     :param user_options: options for the bot
     :param opponent_options: options for the opponent
     :param depth: the remaining depth before the state is evaluated
     :param prune: specify whether or not to prune the tree
-    :return: a dictionary representing the potential move combinations and their associated scores
+    :param transposition_table: an optional TranspositionTable shared by every state visited in the search
+    :param deadline: an optional time.time() value after which a SearchTimeout is raised.
+                     The mutator's state is restored before the exception leaves this function
+    :param cancel: an optional threading.Event. A SearchTimeout is raised once it is set, the same as a deadline
+    :param alpha: a score that the bot is already guaranteed elsewhere in the search
+    :param beta: a score that the opponent can already hold the bot to elsewhere in the search
+    :param move_ordering: an optional MoveOrdering object used to decide which moves are searched first
+    :param probability_floor: outcomes of a turn that are less likely than this are not searched.
+                              The probability of the outcomes that are searched is scaled up to replace them
+    :return: a dictionary representing the potential move combinations and their associated scores.
+             When pruning, a score is only searched until it is known that it cannot change the safest score:
+             a score at or above the worst score of its row is only a lower bound of the real score
     """
 
-    winner = mutator.state.battle_is_finished()
-    if winner:
-        return {(constants.DO_NOTHING_MOVE, constants.DO_NOTHING_MOVE): evaluate(mutator.state) + WON_BATTLE*depth*winner}
+    return get_joint_payoff_matrices(
+        [mutator],
+        user_options,
+        [opponent_options],
+        depth=depth,
+        prune=prune,
+        transposition_table=transposition_table,
+        deadline=deadline,
+        cancel=cancel,
+        alpha=alpha,
+        beta=beta,
+        move_ordering=move_ordering,
+        probability_floor=probability_floor
+    )[0]
 
-    depth -= 1
 
-    # if the battle is not over, but the opponent has no moves - we want to return the user options as moves
-    # this is a special case in a random battle where the opponent's pokemon has fainted, but the opponent still
-    # has reserves left that are unseen
-    if opponent_options == [constants.DO_NOTHING_MOVE] and mutator.state.opponent.active.hp == 0:
-        return {(user_option, constants.DO_NOTHING_MOVE): evaluate(mutator.state) for user_option in user_options}
+def get_joint_payoff_matrices(mutators, user_options, opponent_options_list, depth=2, prune=True, transposition_table=None, deadline=None, cancel=None, alpha=float('-inf'), beta=float('inf'), move_ordering=None, probability_floor=0):
+    """
+    Searches several states that the battle could be in at the same time.
+    These are the hypotheses about the opponent's sets created by Battle.prepare_battles
+
+    The bot's options must be the same in every state. The bot's worst score for an option is the worst score of that
+    option in any of the states, so an option can be pruned in every state as soon as one state shows that it is not
+    the safest. The opponent's move that caused the prune is searched first for the bot's next option.
+
+    :param mutators: a list of StateMutator objects, one for each state
+    :param user_options: options for the bot
+    :param opponent_options_list: a list of the options for the opponent in each state
+    :return: a list containing the payoff matrix of each state. See get_payoff_matrix
+    """
+    for mutator, opponent_options in zip(mutators, opponent_options_list):
+        if (
+            mutator.state.battle_is_finished() or
+            (opponent_options == [constants.DO_NOTHING_MOVE] and mutator.state.opponent.active.hp == 0)
+        ):
+            if len(mutators) == 1:
+                return [get_special_case_payoff_matrix(mutator, user_options, depth)]
 
-    state_scores = dict()
+            return [
+                get_payoff_matrix(m, user_options, o, depth=depth, prune=prune, transposition_table=transposition_table, deadline=deadline, cancel=cancel, alpha=alpha, beta=beta, move_ordering=move_ordering, probability_floor=probability_floor)
+                for m, o in zip(mutators, opponent_options_list)
+            ]
+
+    depth -= 1
+
+    payoff_matrices = [dict() for _ in mutators]
+    columns = [(i, opponent_move) for i, opponent_options in enumerate(opponent_options_list) for opponent_move in opponent_options]
 
     best_score = float('-inf')
-    for i, user_move in enumerate(user_options):
+    for user_move in user_options:
         worst_score_for_this_row = float('inf')
         skip = False
 
-        # opponent_options can change during the loop
-        # using opponent_options[:] makes a copy when iterating to ensure no funny-business
-        for j, opponent_move in enumerate(opponent_options[:]):
+        # columns can change during the loop
+        # using columns[:] makes a copy when iterating to ensure no funny-business
+        for column in columns[:]:
+            i, opponent_move = column
             if skip:
-                state_scores[(user_move, opponent_move)] = float('nan')
+                payoff_matrices[i][(user_move, opponent_move)] = float('nan')
                 continue
 
-            score = 0
-            state_instructions = get_all_state_instructions(mutator, user_move, opponent_move)
-            if depth == 0:
-                for instructions in state_instructions:
-                    mutator.apply(instructions.instructions)
-                    t_score = evaluate(mutator.state)
-                    score += (t_score * instructions.percentage)
-                    mutator.reverse(instructions.instructions)
+            if (deadline is not None and time.time() > deadline) or (cancel is not None and cancel.is_set()):
+                raise SearchTimeout()
 
+            if prune:
+                # only a score between the best row so far and the worst score of this row so far matters
+                cell_alpha = max(alpha, best_score)
+                cell_beta = min(beta, worst_score_for_this_row)
             else:
-                for instructions in state_instructions:
-                    this_percentage = instructions.percentage
-                    mutator.apply(instructions.instructions)
-                    next_turn_user_options, next_turn_opponent_options = mutator.state.get_all_options()
-                    safest = pick_safest(get_payoff_matrix(mutator, next_turn_user_options, next_turn_opponent_options, depth=depth, prune=prune))
-                    score += safest[1] * this_percentage
-                    mutator.reverse(instructions.instructions)
+                cell_alpha = float('-inf')
+                cell_beta = float('inf')
 
-            state_scores[(user_move, opponent_move)] = score
+            score = get_move_pair_score(
+                mutators[i],
+                user_move,
+                opponent_move,
+                depth,
+                prune=prune,
+                transposition_table=transposition_table,
+                deadline=deadline,
+                cancel=cancel,
+                alpha=cell_alpha,
+                beta=cell_beta,
+                move_ordering=move_ordering,
+                probability_floor=probability_floor
+            )
+
+            payoff_matrices[i][(user_move, opponent_move)] = score
 
             if score < worst_score_for_this_row:
                 worst_score_for_this_row = score
 
-            if prune and score < best_score:
+            if prune and score <= cell_alpha:
                 skip = True
 
                 # MOST of the time in pokemon, an opponent's move that causes a prune will cause a prune elsewhere
                 # move this item to the front of the list to prune faster
-                opponent_options = move_item_to_front_of_list(opponent_options, opponent_move)
+                columns = move_item_to_front_of_list(columns, column)
+                if move_ordering is not None:
+                    move_ordering.record_opponent_cutoff(opponent_move, depth)
 
         if worst_score_for_this_row > best_score:
             best_score = worst_score_for_this_row
 
-    return state_scores
+        # the opponent will not allow this state to happen because they can hold the bot to beta elsewhere
+        if prune and best_score >= beta:
+            if move_ordering is not None:
+                move_ordering.record_user_cutoff(user_move, depth)
+            break
+
+    return payoff_matrices
+
+
+def get_special_case_payoff_matrix(mutator, user_options, depth):
+    winner = mutator.state.battle_is_finished()
+    if winner:
+        return {(constants.DO_NOTHING_MOVE, constants.DO_NOTHING_MOVE): mutator.evaluate() + WON_BATTLE*depth*winner}
+
+    # if the battle is not over, but the opponent has no moves - we want to return the user options as moves
+    # this is a special case in a random battle where the opponent's pokemon has fainted, but the opponent still
+    # has reserves left that are unseen
+    return {(user_option, constants.DO_NOTHING_MOVE): mutator.evaluate() for user_option in user_options}
@@ -56,8 +56,8 @@ def barbbarrage(attacking_side, attacking_move, defending_move, attacking_pokemo
 
 def foulplay(attacking_side, attacking_move, defending_move, attacking_pokemon, defending_pokemon, first_move, weather, terrain):
     attacking_move = attacking_move.copy()
-    attacking_move[constants.BASE_POWER] *= defending_pokemon.calculate_boosted_stats()[constants.ATTACK] / \
-                                            attacking_pokemon.calculate_boosted_stats()[constants.ATTACK]
+    attacking_move[constants.BASE_POWER] *= defending_pokemon.get_boosted_stat(constants.ATTACK) / \
+                                            attacking_pokemon.get_boosted_stat(constants.ATTACK)
     return attacking_move
 
 
@@ -95,14 +95,14 @@ def avalanche(attacking_side, attacking_move, defending_move, attacking_pokemon,
 def gyroball(attacking_side, attacking_move, defending_move, attacking_pokemon, defending_pokemon, first_move, weather, terrain):
     # power = (25 × TargetSpeed ÷ UserSpeed) + 1
     attacking_move = attacking_move.copy()
-    attacker_speed = attacking_pokemon.calculate_boosted_stats()[constants.SPEED]
-    defender_speed = defending_pokemon.calculate_boosted_stats()[constants.SPEED]
+    attacker_speed = attacking_pokemon.get_boosted_stat(constants.SPEED)
+    defender_speed = defending_pokemon.get_boosted_stat(constants.SPEED)
     attacking_move[constants.BASE_POWER] = min(150, (25 * defender_speed / attacker_speed) + 1)
     return attacking_move
 
 
 def electroball(attacking_side, attacking_move, defending_move, attacking_pokemon, defending_pokemon, first_move, weather, terrain):
-    speed_ratio = defending_pokemon.calculate_boosted_stats()[constants.SPEED] / attacking_pokemon.calculate_boosted_stats()[constants.SPEED]
+    speed_ratio = defending_pokemon.get_boosted_stat(constants.SPEED) / attacking_pokemon.get_boosted_stat(constants.SPEED)
 
     attacking_move = attacking_move.copy()
     if speed_ratio < 0.25:
@@ -236,7 +236,7 @@ def strengthsap(attacking_side, attacking_move, defending_move, attacking_pokemo
         constants.ATTACK: -1
     }
     attacking_move[constants.HEAL] = [
-        defending_pokemon.calculate_boosted_stats()[constants.ATTACK],
+        defending_pokemon.get_boosted_stat(constants.ATTACK),
         attacking_pokemon.maxhp
     ]
     attacking_move[constants.HEAL_TARGET] = constants.SELF
@@ -0,0 +1,74 @@
+import threading
+from collections import namedtuple
+
+
+TranspositionEntry = namedtuple('TranspositionEntry', ['depth', 'score', 'best_reply', 'flag'])
+
+DEFAULT_MAX_SIZE = 250000
+
+# a search with a window can stop as soon as it knows the score is outside of that window
+# the score it stores is then only a bound on the real score
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+
+class TranspositionTable:
+    """
+    Stores the result of searching a state so that the search does not have to expand it again
+
+    Entries are keyed by the hash that a StateMutator keeps for its state.
+    An entry can be used for any search of the same state that needs the same depth or less.
+    Entries that only hold a bound on the score can be used if the bound is outside of the searched window.
+    When the table is full the oldest entry is removed.
+    Battles that run at the same time search in different threads, so changes to the table are locked.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self.table = dict()
+        self.lock = threading.Lock()
+
+    def get(self, state_hash, depth, alpha=float('-inf'), beta=float('inf')):
+        entry = self.table.get(state_hash)
+        if entry is None or entry.depth < depth:
+            return None
+
+        if (
+            entry.flag == EXACT or
+            (entry.flag == LOWER_BOUND and entry.score >= beta) or
+            (entry.flag == UPPER_BOUND and entry.score <= alpha)
+        ):
+            return entry
+        return None
+
+    def get_best_reply(self, state_hash):
+        entry = self.table.get(state_hash)
+        if entry is not None:
+            return entry.best_reply
+        return None
+
+    def store(self, state_hash, depth, score, best_reply, flag=EXACT):
+        if self.max_size <= 0:
+            return
+
+        with self.lock:
+            existing_entry = self.table.pop(state_hash, None)
+            if existing_entry is not None and (
+                existing_entry.depth > depth or
+                (existing_entry.depth == depth and existing_entry.flag == EXACT and flag != EXACT)
+            ):
+                self.table[state_hash] = existing_entry
+                return
+
+            if len(self.table) >= self.max_size:
+                del self.table[next(iter(self.table))]
+
+            self.table[state_hash] = TranspositionEntry(depth, score, best_reply, flag)
+
+    def clear(self):
+        with self.lock:
+            self.table.clear()
+
+    def __len__(self):
+        return len(self.table)
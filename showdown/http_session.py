@@ -0,0 +1,56 @@
+import asyncio
+import functools
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# seconds to wait for a connection and for each read of the response
+HTTP_TIMEOUT = (5, 30)
+
+# a request that could not connect or got a server error is retried with a growing delay between the tries
+HTTP_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.5
+
+
+def create_session():
+    # a session keeps its connections open, so the requests to the same host after the first one do not reconnect
+    retry = Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=[500, 502, 503, 504],
+        allowed_methods=None,
+        raise_on_status=False
+    )
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(max_retries=retry))
+    session.mount("https://", HTTPAdapter(max_retries=retry))
+    return session
+
+
+session = create_session()
+
+
+def get(url, **kwargs):
+    kwargs.setdefault("timeout", HTTP_TIMEOUT)
+    return session.get(url, **kwargs)
+
+
+def post(url, **kwargs):
+    kwargs.setdefault("timeout", HTTP_TIMEOUT)
+    return session.post(url, **kwargs)
+
+
+async def run_in_executor(function, *args, **kwargs):
+    # runs a blocking function in a thread so the event loop keeps handling every other battle while it waits
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, functools.partial(function, *args, **kwargs))
+
+
+async def async_get(url, **kwargs):
+    return await run_in_executor(get, url, **kwargs)
+
+
+async def async_post(url, **kwargs):
+    return await run_in_executor(post, url, **kwargs)
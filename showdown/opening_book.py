@@ -0,0 +1,65 @@
+import hashlib
+import json
+import logging
+import os
+
+
+logger = logging.getLogger(__name__)
+
+# opening books are only read from disk once
+_opening_books = dict()
+
+
+def get_opening_book_key(pokemon_battle_type, battle):
+    """
+    Creates the key of the team preview in `battle`
+
+    The key contains the format, the bot's team in the order it was sent, and the opponent's previewed pokemon.
+    Spreads are not part of the key because they are not in the request that Pokemon Showdown sends
+    """
+    user_team = [
+        [pkmn.name, pkmn.level, pkmn.item, pkmn.ability, sorted(m.name for m in pkmn.moves)]
+        for pkmn in battle.user.reserve
+    ]
+    opponent_team = sorted(pkmn.name for pkmn in battle.opponent.reserve)
+    key = [pokemon_battle_type, battle.max_chosen_team_size, user_team, opponent_team]
+    return hashlib.blake2b(json.dumps(key).encode(), digest_size=8).hexdigest()
+
+
+def load_opening_book(path):
+    if path is None or not os.path.isfile(path):
+        return dict()
+
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_opening_book(opening_book, path):
+    with open(path, 'w') as f:
+        json.dump(opening_book, f, separators=(',', ':'), sort_keys=True)
+
+
+def get_opening_book(path):
+    if path not in _opening_books:
+        _opening_books[path] = load_opening_book(path)
+        if path is not None:
+            logger.debug("Loaded {} team previews from the opening book {}".format(len(_opening_books[path]), path))
+    return _opening_books[path]
+
+
+def get_team_order(opening_book, pokemon_battle_type, battle):
+    # returns the 1-based team indexes that were picked for this team preview, or None if it is not in the book
+    team_order = opening_book.get(get_opening_book_key(pokemon_battle_type, battle))
+    if team_order is None:
+        return None
+
+    team_order = [int(i) for i in team_order]
+    if len(team_order) != battle.max_chosen_team_size or not all(1 <= i <= len(battle.user.reserve) for i in team_order):
+        logger.warning("Ignoring an invalid team order in the opening book: {}".format(team_order))
+        return None
+
+    return team_order
+
+
+def add_team_order(opening_book, pokemon_battle_type, battle, team_order):
+    opening_book[get_opening_book_key(pokemon_battle_type, battle)] = "".join(str(i) for i in team_order)
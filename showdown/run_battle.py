@@ -2,7 +2,6 @@ import importlib
 import json
 import asyncio
 import concurrent.futures
-from copy import deepcopy
 import logging
 from data.mods.apply_mods import apply_mods
 
@@ -14,11 +13,25 @@ from showdown.engine.evaluate import Scoring
 from showdown.battle import Pokemon
 from showdown.battle import LastUsedMove
 from showdown.battle_modifier import async_update_battle
+from showdown.battle_bots.helpers import transposition_table
+from showdown.battle_bots.helpers import search_cache
+from showdown.battle_bots.pondering import start_pondering
+from showdown.opening_book import get_opening_book
+from showdown.opening_book import get_team_order
 
 from showdown.websocket_client import PSWebsocketClient
+from showdown.http_session import run_in_executor
 
 logger = logging.getLogger(__name__)
 
+# searches run in these threads so the event loop can keep reading the messages of every battle
+# the threads are shared by all of the battles that are running
+search_executor = concurrent.futures.ThreadPoolExecutor(thread_name_prefix="search")
+
+# the standard sets of every pokemon seen in each format
+# battles in the same format share data.pokemon_sets, so a battle adding its sets must keep the others'
+battle_sets = dict()
+
 
 def battle_is_finished(battle_tag, msg):
     return (
@@ -28,19 +41,32 @@ def battle_is_finished(battle_tag, msg):
     )
 
 
-async def async_pick_move(battle, team_preview=False):
-    battle_copy = deepcopy(battle)
+def ponder_should_stop(battle_tag, msg):
+    # the turn the ponderer was searching has happened once the next request or turn arrives
+    return (
+        msg.startswith(">{}".format(battle_tag)) and
+        any(s in msg for s in ["|{}|".format(constants.REQUEST_STRING), constants.TURN_STRING, constants.WIN_STRING, constants.TIE_STRING])
+    )
+
+
+def get_battle_for_decision(battle):
+    # a copy of the battle with the bot's side updated from the latest request
+    battle_copy = battle.clone()
     if constants.TEAM_PREVIEW in battle_copy.request_json and battle_copy.request_json[constants.TEAM_PREVIEW]:
         pass
     else:
         battle_copy.user.from_json(battle_copy.request_json)
         battle_copy.user.active.seen = True
+    return battle_copy
+
+
+async def async_pick_move(battle, team_preview=False):
+    battle_copy = get_battle_for_decision(battle)
 
     loop = asyncio.get_event_loop()
-    with concurrent.futures.ThreadPoolExecutor() as pool:
-        best_move = await loop.run_in_executor(
-            pool, battle_copy.find_best_move, team_preview
-        )
+    best_move = await loop.run_in_executor(
+        search_executor, battle_copy.find_best_move, team_preview
+    )
     choice = best_move[0]
     if constants.SWITCH_STRING in choice:
         battle.user.last_used_move = LastUsedMove(battle.user.active.name, "switch {}".format(choice.split()[-1]), battle.turn)
@@ -49,8 +75,9 @@ async def async_pick_move(battle, team_preview=False):
     return best_move
 
 
-async def handle_team_preview(battle, ps_websocket_client):
-    battle_copy = deepcopy(battle)
+async def pick_team_order(battle):
+    # searches for the pokemon to lead with, returning the 1-based team indexes in the order they are chosen
+    battle_copy = battle.clone()
     battle_copy.user.active = Pokemon.get_dummy()
     battle_copy.opponent.active = Pokemon.get_dummy()
 
@@ -70,6 +97,17 @@ async def handle_team_preview(battle, ps_websocket_client):
             team_list_indexes.append(choice_digit)
             battle_copy.user.reserve[choice_digit - 1] = Pokemon.get_dummy()
 
+    return team_list_indexes
+
+
+async def handle_team_preview(battle, ps_websocket_client, pokemon_battle_type):
+    opening_book = get_opening_book(ShowdownConfig.opening_book_path)
+    team_list_indexes = get_team_order(opening_book, pokemon_battle_type, battle)
+    if team_list_indexes is not None:
+        logger.debug("Using the team order from the opening book: {}".format(team_list_indexes))
+    else:
+        team_list_indexes = await pick_team_order(battle)
+
     message = ["/team {}|{}".format("".join(str(x) for x in team_list_indexes), battle.rqid)]
 
     await ps_websocket_client.send_message(battle.battle_tag, message)
@@ -164,19 +202,24 @@ async def start_battle_internal(battle, opponent_id, pokemon_battle_type, genera
         battle.initialize_team_preview(user_json, opponent_pokemon, pokemon_battle_type)
         battle.during_team_preview()
 
-        smogon_usage_data = get_standard_battle_sets(
+        # downloading the usage stats takes seconds, the other battles keep being played in the meantime
+        smogon_usage_data = await run_in_executor(
+            get_standard_battle_sets,
             pokemon_battle_type,
             pokemon_names=set(p.name for p in battle.opponent.reserve + battle.user.reserve)
         )
-        data.pokemon_sets = smogon_usage_data
+        data.pokemon_sets = battle_sets.setdefault(pokemon_battle_type, dict())
+        data.pokemon_sets.update(smogon_usage_data)
         for pkmn, values in smogon_usage_data.items():
             data.effectiveness[pkmn] = values["effectiveness"]
 
-        await handle_team_preview(battle, ps_websocket_client)
+        await handle_team_preview(battle, ps_websocket_client, pokemon_battle_type)
 
 
 async def start_battle(ps_websocket_client, msgs, pokemon_battle_type, generation):
     battle, opponent_id, user_json = await initialize_battle_with_tag(ps_websocket_client, msgs)
+
+    search_cache.open(ShowdownConfig.search_cache_path, ShowdownConfig.search_cache_size)
     battle.generation = pokemon_battle_type[:4]
 
     if any([bt in pokemon_battle_type for bt in constants.RANDOM_TEAM_FORMATS]):
@@ -195,8 +238,13 @@ async def start_battle(ps_websocket_client, msgs, pokemon_battle_type, generatio
 
 async def pokemon_battle(ps_websocket_client, msgs, pokemon_battle_type, generation):
     battle = await start_battle(ps_websocket_client, msgs, pokemon_battle_type, generation)
+    ponderer = None
     while True:
         msg = await ps_websocket_client.receive_message()
+        if ponderer is not None and ponder_should_stop(battle.battle_tag, msg):
+            ponderer.stop()
+            ponderer = None
+
         if battle_is_finished(battle.battle_tag, msg):
             if constants.WIN_STRING in msg:
                 winner = msg.split(constants.WIN_STRING)[-1].split('\n')[0].strip()
@@ -211,3 +259,6 @@ async def pokemon_battle(ps_websocket_client, msgs, pokemon_battle_type, generat
             if action_required and not battle.wait:
                 best_move = await async_pick_move(battle)
                 await ps_websocket_client.send_message(battle.battle_tag, best_move)
+                # the search processes have their own transposition tables, which the ponderer cannot fill
+                if ShowdownConfig.ponder and ShowdownConfig.search_processes <= 1:
+                    ponderer = start_pondering(get_battle_for_decision(battle), best_move[0], transposition_table)
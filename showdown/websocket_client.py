@@ -1,9 +1,9 @@
 import asyncio
 import websockets
-import requests
 import json
 import time
 import constants
+from showdown.http_session import async_post
 
 import logging
 logger = logging.getLogger(__name__)
@@ -64,7 +64,7 @@ class PSWebsocketClient:
         logger.debug("Logging in...")
         client_id, challstr = await self.get_id_and_challstr()
         if self.password:
-            response = requests.post(
+            response = await async_post(
                 self.login_uri,
                 data={
                     'act': 'login',
@@ -75,7 +75,7 @@ class PSWebsocketClient:
             )
 
         else:
-            response = requests.post(
+            response = await async_post(
                 self.login_uri,
                 data={
                     'act': 'getassertion',
@@ -163,3 +163,31 @@ class PSWebsocketClient:
     async def save_replay(self, battle_tag):
         message = ["/savereplay"]
         await self.send_message(battle_tag, message)
+
+
+class RoomClient(PSWebsocketClient):
+    """
+    A client for the rooms that share one PSWebsocketClient, i.e. battles that are played at the same time
+
+    Only the BattleManager reads from the connection. It puts each message in the queue of the room the message
+    is for, and this client reads from that queue. Messages are sent on the shared connection.
+    """
+
+    def __init__(self, ps_websocket_client, queue):
+        self.ps_websocket_client = ps_websocket_client
+        self.username = ps_websocket_client.username
+        self.password = ps_websocket_client.password
+        self.address = ps_websocket_client.address
+        self.login_uri = ps_websocket_client.login_uri
+        self.queue = queue
+
+    async def receive_message(self):
+        message = await self.queue.get()
+        # the connection failed while this room was waiting for it
+        if isinstance(message, Exception):
+            raise message
+        return message
+
+    async def send_message(self, room, message_list):
+        await self.ps_websocket_client.send_message(room, message_list)
+        self.last_message = self.ps_websocket_client.last_message
@@ -2,12 +2,19 @@ import unittest
 from unittest import mock
 
 import constants
+from config import ShowdownConfig
+from data.parse_smogon_stats import MOVES_STRING
+from data.parse_smogon_stats import SPREADS_STRING
+from data.parse_smogon_stats import ABILITY_STRING
+from data.parse_smogon_stats import ITEM_STRING
 
+from showdown.battle import get_ranked_combinations
 from showdown.battle import LastUsedMove
 from showdown.battle import Battle
 from showdown.battle import Battler
 from showdown.battle import Pokemon
 from showdown.battle import Move
+from showdown.engine.objects import Pokemon as TransposePokemon
 
 
 # so we can instantiate a Battle object for testing
@@ -20,6 +27,152 @@ class TestPokemonInit(unittest.TestCase):
         Pokemon(name, 100)
 
 
+class TestToTransposePokemon(unittest.TestCase):
+    def test_transpose_pokemon_is_the_same_as_the_one_created_from_the_dictionary(self):
+        p = Pokemon('pikachu', 100)
+        p.add_move('thunderbolt')
+        p.boosts[constants.SPEED] = 2
+        p.volatile_statuses.append(constants.SUBSTITUTE)
+
+        self.assertEqual(
+            str(TransposePokemon.from_state_pokemon_dict(p.to_dict())),
+            str(p.to_transpose_pokemon())
+        )
+
+
+class TestBattleClone(unittest.TestCase):
+    def setUp(self):
+        self.battle = Battle(None)
+        self.battle.user.active = Pokemon('pikachu', 100)
+        self.battle.user.active.add_move('thunderbolt')
+        self.battle.user.reserve = [Pokemon('starmie', 100)]
+        self.battle.opponent.active = Pokemon('clefable', 100)
+        self.battle.opponent.reserve = [self.battle.opponent.active, Pokemon('toxapex', 100)]
+        self.clone = self.battle.clone()
+
+    def test_changing_the_clone_boosts_does_not_change_the_battle(self):
+        self.clone.user.active.boosts[constants.SPEED] = 2
+        self.assertEqual(0, self.battle.user.active.boosts[constants.SPEED])
+
+    def test_changing_the_clone_volatile_statuses_does_not_change_the_battle(self):
+        self.clone.user.active.volatile_statuses.append(constants.SUBSTITUTE)
+        self.assertEqual([], self.battle.user.active.volatile_statuses)
+
+    def test_changing_the_clone_moves_does_not_change_the_battle(self):
+        self.clone.user.active.moves[0].disabled = True
+        self.clone.user.active.add_move('surf')
+        self.assertFalse(self.battle.user.active.moves[0].disabled)
+        self.assertEqual(1, len(self.battle.user.active.moves))
+
+    def test_changing_the_clone_stats_does_not_change_the_battle(self):
+        self.clone.user.active.stats[constants.SPEED] = 1
+        self.assertNotEqual(1, self.battle.user.active.stats[constants.SPEED])
+
+    def test_changing_the_clone_reserve_and_side_conditions_does_not_change_the_battle(self):
+        self.clone.user.reserve.pop()
+        self.clone.user.side_conditions[constants.SPIKES] = 1
+        self.assertEqual(1, len(self.battle.user.reserve))
+        self.assertEqual(0, self.battle.user.side_conditions[constants.SPIKES])
+
+    def test_active_pokemon_in_the_reserve_is_still_the_active_pokemon_in_the_clone(self):
+        self.assertIs(self.clone.opponent.active, self.clone.opponent.reserve[0])
+        self.assertIsNot(self.battle.opponent.active, self.clone.opponent.active)
+
+    def test_clone_creates_the_same_state(self):
+        self.assertEqual(
+            self.battle.create_state().serialize(),
+            self.clone.create_state().serialize()
+        )
+
+
+class TestGetRankedCombinations(unittest.TestCase):
+    def test_combinations_are_yielded_from_most_to_least_likely(self):
+        combinations = list(get_ranked_combinations(
+            [('a', 1), ('b', 3)],
+            [('x', 2), ('y', 1), ('z', 1)],
+        ))
+        probabilities = [p for p, _ in combinations]
+
+        self.assertEqual(('b', 'x'), combinations[0][1])
+        self.assertEqual(sorted(probabilities, reverse=True), probabilities)
+
+    def test_every_combination_is_yielded_once(self):
+        combinations = [c for _, c in get_ranked_combinations([('a', 1), ('b', 3)], [('x', 2), ('y', 1), ('z', 1)])]
+        self.assertEqual(6, len(combinations))
+        self.assertEqual(6, len(set(combinations)))
+
+    def test_probabilities_add_up_to_one(self):
+        combinations = get_ranked_combinations([('a', 10), ('b', 30)], [('x', 2), ('y', 0)])
+        self.assertAlmostEqual(1, sum(p for p, _ in combinations))
+
+    def test_options_with_no_weight_are_equally_likely(self):
+        self.assertEqual([0.5, 0.5], [p for p, _ in get_ranked_combinations([('a', 0), ('b', 0)])])
+
+    def test_nothing_is_yielded_when_there_are_no_options(self):
+        self.assertEqual([], list(get_ranked_combinations([('a', 1)], [])))
+
+
+class TestPrepareBattles(unittest.TestCase):
+    def setUp(self):
+        ShowdownConfig.pokemon_mode = 'gen8ou'
+        ShowdownConfig.max_set_hypotheses = 0
+        ShowdownConfig.set_hypotheses_probability = 1
+        self.pokemon_sets_patch = mock.patch.dict('data.pokemon_sets', {
+            'garchomp': {
+                SPREADS_STRING: [('jolly', '0,252,0,0,4,252', 60), ('impish', '252,0,252,0,4,0', 40)],
+                ITEM_STRING: [('choicescarf', 50), ('rockyhelmet', 30), ('lifeorb', 20)],
+                ABILITY_STRING: [('roughskin', 100)],
+                MOVES_STRING: [('earthquake', 95), ('stealthrock', 50), ('scaleshot', 45), ('firefang', 40), ('stoneedge', 35)],
+            }
+        })
+        self.pokemon_sets_patch.start()
+
+        self.battle = Battle(None)
+        self.battle.battle_type = constants.STANDARD_BATTLE
+        self.battle.user.active = Pokemon('clefable', 100)
+        self.battle.opponent.active = Pokemon('garchomp', 100)
+
+    def tearDown(self):
+        self.pokemon_sets_patch.stop()
+
+    def test_most_likely_set_is_first(self):
+        garchomp = self.battle.prepare_battles()[0].opponent.active
+        self.assertEqual('jolly', garchomp.nature)
+        self.assertEqual('choicescarf', garchomp.item)
+        self.assertEqual(['earthquake', 'scaleshot', 'firefang', 'stoneedge'], [m.name for m in garchomp.moves])
+
+    def test_sets_that_do_not_make_sense_are_not_created(self):
+        for battle in self.battle.prepare_battles():
+            garchomp = battle.opponent.active
+            self.assertFalse(garchomp.item == 'choicescarf' and garchomp.get_move('stealthrock') is not None)
+
+    def test_max_battles_limits_the_number_of_sets(self):
+        self.assertEqual(3, len(self.battle.prepare_battles(max_battles=3)))
+
+    def test_max_battles_keeps_the_most_likely_sets(self):
+        all_battles = self.battle.prepare_battles()
+        battles = self.battle.prepare_battles(max_battles=3)
+        self.assertEqual(
+            [b.opponent.active.to_dict() for b in all_battles[:3]],
+            [b.opponent.active.to_dict() for b in battles]
+        )
+
+    def test_probability_cutoff_drops_the_least_likely_sets(self):
+        all_battles = self.battle.prepare_battles()
+        battles = self.battle.prepare_battles(probability_cutoff=0.2)
+        self.assertLess(len(battles), len(all_battles))
+
+    def test_configured_max_set_hypotheses_is_used(self):
+        ShowdownConfig.max_set_hypotheses = 2
+        self.assertEqual(2, len(self.battle.prepare_battles()))
+
+    def test_generated_battles_are_created_as_they_are_used(self):
+        battles = self.battle.generate_battles()
+        probability, battle = next(battles)
+        self.assertEqual('choicescarf', battle.opponent.active.item)
+        self.assertGreater(probability, 0)
+
+
 class TestGetPossibleMoves(unittest.TestCase):
     def test_gets_four_moves_when_none_are_known(self):
         p = Pokemon('pikachu', 100)
@@ -0,0 +1,195 @@
+import asyncio
+import unittest
+from unittest import mock
+
+import constants
+from config import ShowdownConfig
+from showdown.battle_manager import BattleManager
+from showdown.battle_manager import get_room
+from showdown.battle_bots.helpers import transposition_table
+from showdown.websocket_client import RoomClient
+
+
+class FakeWebsocketClient:
+    # starts a new battle every time the bot searches for one
+    username = 'bot'
+    password = None
+    address = None
+    login_uri = None
+    last_message = None
+
+    def __init__(self):
+        self.messages = asyncio.Queue()
+        self.battles_started = 0
+
+    async def receive_message(self):
+        message = await self.messages.get()
+        if isinstance(message, Exception):
+            raise message
+        return message
+
+    async def send_message(self, room, message_list):
+        self.last_message = room + "|" + "|".join(message_list)
+        if message_list[0].startswith('/search'):
+            self.battles_started += 1
+            battle_tag = 'battle-gen8ou-{}'.format(self.battles_started)
+            self.messages.put_nowait('>{}\n|init|battle\n|title|bot vs. opponent'.format(battle_tag))
+            self.messages.put_nowait('>{}\n|player|p1|bot\n|gen|8'.format(battle_tag))
+
+
+class TestGetRoom(unittest.TestCase):
+    def test_room_is_read_from_the_first_line(self):
+        self.assertEqual('battle-gen8ou-1', get_room('>battle-gen8ou-1\n|move|p1a: Pikachu|Tackle'))
+
+    def test_global_message_has_no_room(self):
+        self.assertIsNone(get_room('|updatesearch|{"searching":[]}'))
+
+
+class TestRouteMessage(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.battle_manager = self.loop.run_until_complete(self.create_battle_manager())
+
+    def tearDown(self):
+        self.loop.close()
+
+    async def create_battle_manager(self):
+        return BattleManager(FakeWebsocketClient(), max_concurrent_battles=2)
+
+    def test_global_message_goes_to_the_lobby(self):
+        self.battle_manager.route_message('|pm|user|bot|/challenge gen8ou')
+        self.assertEqual(1, self.battle_manager.lobby.queue.qsize())
+
+    def test_message_for_a_chat_room_goes_to_the_lobby(self):
+        self.battle_manager.route_message('>lobby\n|c|user|hello')
+        self.assertEqual(1, self.battle_manager.lobby.queue.qsize())
+
+    def test_new_battle_gets_its_own_queue(self):
+        self.battle_manager.route_message('>battle-gen8ou-1\n|init|battle')
+        self.assertEqual('battle-gen8ou-1', self.battle_manager.new_battles.get_nowait())
+        self.assertEqual(1, self.battle_manager.battle_queues['battle-gen8ou-1'].qsize())
+
+    def test_messages_for_different_battles_go_to_their_own_queues(self):
+        self.battle_manager.route_message('>battle-gen8ou-1\n|init|battle')
+        self.battle_manager.route_message('>battle-gen8ou-2\n|init|battle')
+        self.battle_manager.route_message('>battle-gen8ou-2\n|turn|1')
+
+        self.assertEqual(1, self.battle_manager.battle_queues['battle-gen8ou-1'].qsize())
+        self.assertEqual(2, self.battle_manager.battle_queues['battle-gen8ou-2'].qsize())
+
+    def test_message_for_a_battle_that_is_not_being_played_is_ignored(self):
+        self.battle_manager.route_message('>battle-gen8ou-1\n|turn|1')
+        self.assertEqual(dict(), self.battle_manager.battle_queues)
+        self.assertTrue(self.battle_manager.lobby.queue.empty())
+
+    def test_renamed_battle_uses_the_same_queue(self):
+        self.battle_manager.route_message('>battle-gen8ou-1\n|init|battle')
+        self.battle_manager.route_message('>battle-gen8ou-1\n|noinit|rename|battle-gen8ou-1-abc|Title')
+        self.battle_manager.route_message('>battle-gen8ou-1-abc\n|turn|1')
+
+        self.assertEqual(3, self.battle_manager.battle_queues['battle-gen8ou-1'].qsize())
+
+    def test_connection_error_is_raised_by_every_room(self):
+        self.battle_manager.route_message('>battle-gen8ou-1\n|init|battle')
+        self.battle_manager.ps_websocket_client.messages.put_nowait(ConnectionError())
+        room = RoomClient(self.battle_manager.ps_websocket_client, self.battle_manager.battle_queues['battle-gen8ou-1'])
+
+        with self.assertRaises(ConnectionError):
+            self.loop.run_until_complete(self.battle_manager.read_messages())
+        self.loop.run_until_complete(room.receive_message())
+        with self.assertRaises(ConnectionError):
+            self.loop.run_until_complete(room.receive_message())
+        with self.assertRaises(ConnectionError):
+            self.loop.run_until_complete(self.battle_manager.lobby.receive_message())
+
+
+class TestStartGeneration(unittest.TestCase):
+    def setUp(self):
+        ShowdownConfig.transposition_table_size = 1000
+        self.patches = [
+            mock.patch('showdown.battle_manager.apply_mods'),
+            mock.patch('showdown.battle_manager.check_dictionaries_are_unmodified'),
+        ]
+        for p in self.patches:
+            p.start()
+        self.battle_manager = BattleManager(FakeWebsocketClient())
+        transposition_table.clear()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        transposition_table.clear()
+
+    def test_transposition_table_is_kept_when_another_battle_starts(self):
+        self.battle_manager.start_generation(8)
+        transposition_table.store(123, 2, 10, None)
+        self.battle_manager.start_generation(8)
+
+        self.assertEqual(1, len(transposition_table))
+
+    def test_transposition_table_is_cleared_when_no_other_battle_is_running(self):
+        self.battle_manager.start_generation(8)
+        transposition_table.store(123, 2, 10, None)
+        self.battle_manager.end_generation()
+        self.battle_manager.start_generation(8)
+
+        self.assertEqual(0, len(transposition_table))
+
+
+class TestRun(unittest.TestCase):
+    def setUp(self):
+        ShowdownConfig.bot_mode = constants.SEARCH_LADDER
+        ShowdownConfig.pokemon_mode = 'gen8ou'
+        ShowdownConfig.username = 'bot'
+        ShowdownConfig.team = None
+        ShowdownConfig.log_to_file = False
+        ShowdownConfig.transposition_table_size = 1000
+
+        self.running = 0
+        self.most_running = 0
+
+        self.patches = [
+            mock.patch('showdown.battle_manager.pokemon_battle', self.pokemon_battle),
+            mock.patch('showdown.battle_manager.load_team', return_value='team'),
+            mock.patch('showdown.battle_manager.apply_mods'),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+
+    async def pokemon_battle(self, ps_websocket_client, msgs, pokemon_battle_type, generation):
+        self.running += 1
+        self.most_running = max(self.most_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        return 'bot'
+
+    async def run_battles(self, max_concurrent_battles, run_count):
+        battle_manager = BattleManager(FakeWebsocketClient(), max_concurrent_battles)
+        await battle_manager.run(run_count)
+        return battle_manager
+
+    def test_battles_are_played_at_the_same_time(self):
+        asyncio.run(self.run_battles(max_concurrent_battles=3, run_count=3))
+        self.assertEqual(3, self.most_running)
+
+    def test_no_more_than_the_max_battles_are_played_at_the_same_time(self):
+        asyncio.run(self.run_battles(max_concurrent_battles=2, run_count=5))
+        self.assertEqual(2, self.most_running)
+
+    def test_one_battle_at_a_time_plays_battles_one_after_another(self):
+        asyncio.run(self.run_battles(max_concurrent_battles=1, run_count=3))
+        self.assertEqual(1, self.most_running)
+
+    def test_results_of_every_battle_are_counted(self):
+        battle_manager = asyncio.run(self.run_battles(max_concurrent_battles=2, run_count=4))
+        self.assertEqual(4, battle_manager.wins)
+        self.assertEqual(0, battle_manager.losses)
+
+    def test_finished_battles_are_removed(self):
+        battle_manager = asyncio.run(self.run_battles(max_concurrent_battles=2, run_count=4))
+        self.assertEqual(dict(), battle_manager.battle_queues)
+        self.assertIsNone(battle_manager.generation)
@@ -14,6 +14,7 @@ from copy import deepcopy
 from showdown.engine.objects import TransposeInstruction
 from showdown.engine.find_state_instructions import get_all_state_instructions
 from showdown.engine.find_state_instructions import remove_duplicate_instructions
+from showdown.engine.find_state_instructions import remove_unlikely_instructions
 from showdown.engine.find_state_instructions import lookup_move
 from showdown.engine.find_state_instructions import user_moves_first
 from showdown.engine.objects import State
@@ -13792,6 +13793,95 @@ class TestRemoveDuplicateInstructions(unittest.TestCase):
 
         self.assertEqual(expected_instructions, new_instructions)
 
+    def test_combines_instructions_that_contain_a_list(self):
+        instructions = [
+            TransposeInstruction(
+                0.5,
+                [
+                    (constants.MUTATOR_CHANGE_TYPE, constants.USER, ['water'], ['fire'])
+                ],
+                False
+            ),
+            TransposeInstruction(
+                0.5,
+                [
+                    (constants.MUTATOR_CHANGE_TYPE, constants.USER, ['water'], ['fire'])
+                ],
+                False
+            )
+        ]
+
+        new_instructions = remove_duplicate_instructions(instructions)
+
+        expected_instructions = [
+            TransposeInstruction(
+                1.0,
+                [
+                    (constants.MUTATOR_CHANGE_TYPE, constants.USER, ['water'], ['fire'])
+                ],
+                False
+            )
+        ]
+
+        self.assertEqual(expected_instructions, new_instructions)
+
+    def test_combines_frozen_and_not_frozen_instructions_by_default(self):
+        instructions = [
+            TransposeInstruction(0.5, [(constants.MUTATOR_DAMAGE, constants.USER, 5)], False),
+            TransposeInstruction(0.5, [(constants.MUTATOR_DAMAGE, constants.USER, 5)], True)
+        ]
+
+        new_instructions = remove_duplicate_instructions(instructions)
+
+        self.assertEqual(
+            [TransposeInstruction(1.0, [(constants.MUTATOR_DAMAGE, constants.USER, 5)], False)],
+            new_instructions
+        )
+
+    def test_does_not_combine_frozen_and_not_frozen_instructions_when_comparing_frozen(self):
+        instructions = [
+            TransposeInstruction(0.5, [(constants.MUTATOR_DAMAGE, constants.USER, 5)], False),
+            TransposeInstruction(0.5, [(constants.MUTATOR_DAMAGE, constants.USER, 5)], True)
+        ]
+
+        new_instructions = remove_duplicate_instructions(instructions, compare_frozen=True)
+
+        self.assertEqual(
+            [
+                TransposeInstruction(0.5, [(constants.MUTATOR_DAMAGE, constants.USER, 5)], False),
+                TransposeInstruction(0.5, [(constants.MUTATOR_DAMAGE, constants.USER, 5)], True)
+            ],
+            new_instructions
+        )
+
+
+class TestRemoveUnlikelyInstructions(unittest.TestCase):
+    def setUp(self):
+        self.instructions = [
+            TransposeInstruction(0.7, [(constants.MUTATOR_DAMAGE, constants.USER, 5)], False),
+            TransposeInstruction(0.25, [(constants.MUTATOR_DAMAGE, constants.USER, 6)], False),
+            TransposeInstruction(0.05, [(constants.MUTATOR_DAMAGE, constants.USER, 7)], False),
+        ]
+
+    def test_does_nothing_when_probability_floor_is_0(self):
+        self.assertEqual(self.instructions, remove_unlikely_instructions(deepcopy(self.instructions), 0))
+
+    def test_removes_instructions_below_the_floor_and_scales_the_rest(self):
+        instructions = remove_unlikely_instructions(self.instructions, 0.1)
+
+        self.assertEqual(2, len(instructions))
+        self.assertAlmostEqual(0.7 / 0.95, instructions[0].percentage)
+        self.assertAlmostEqual(0.25 / 0.95, instructions[1].percentage)
+        self.assertEqual([(constants.MUTATOR_DAMAGE, constants.USER, 6)], instructions[1].instructions)
+
+    def test_keeps_the_most_likely_instruction_when_every_instruction_is_below_the_floor(self):
+        instructions = remove_unlikely_instructions(self.instructions, 0.9)
+
+        self.assertEqual(
+            [TransposeInstruction(1.0, [(constants.MUTATOR_DAMAGE, constants.USER, 5)], False)],
+            instructions
+        )
+
 
 class TestUserMovesFirst(unittest.TestCase):
     def setUp(self):
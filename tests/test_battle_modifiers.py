@@ -36,6 +36,8 @@ from showdown.battle_modifier import check_speed_ranges
 from showdown.battle_modifier import check_choicescarf
 from showdown.battle_modifier import check_heavydutyboots
 from showdown.battle_modifier import get_damage_dealt
+from showdown.battle_modifier import tokenize
+from showdown.battle_modifier import BATTLE_MODIFIERS
 from showdown.battle_modifier import singleturn
 from showdown.battle_modifier import transform
 from showdown.battle_modifier import update_battle
@@ -2187,7 +2189,7 @@ class TestCheckSpeedRanges(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_speed_ranges(self.battle, messages)
+        check_speed_ranges(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(self.battle.user.active.stats[constants.SPEED], self.battle.opponent.active.speed_range.min)
 
@@ -2201,7 +2203,7 @@ class TestCheckSpeedRanges(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_speed_ranges(self.battle, messages)
+        check_speed_ranges(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(self.battle.user.active.stats[constants.SPEED], self.battle.opponent.active.speed_range.max)
 
@@ -2215,7 +2217,7 @@ class TestCheckSpeedRanges(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_speed_ranges(self.battle, messages)
+        check_speed_ranges(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(float("inf"), self.battle.opponent.active.speed_range.max)
         self.assertEqual(0, self.battle.opponent.active.speed_range.min)
@@ -2230,7 +2232,7 @@ class TestCheckSpeedRanges(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_speed_ranges(self.battle, messages)
+        check_speed_ranges(self.battle, tokenize('\n'.join(messages)))
 
         # bot_speed * 2 should be the minspeed it has b/c it went first with paralysis
         expected_min_speed = int(self.battle.user.active.stats[constants.SPEED] * 2)
@@ -2247,7 +2249,7 @@ class TestCheckSpeedRanges(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_speed_ranges(self.battle, messages)
+        check_speed_ranges(self.battle, tokenize('\n'.join(messages)))
 
         # bot_speed / 2 should be the minspeed it has b/c it went first with paralysis
         expected_min_speed = int(self.battle.user.active.stats[constants.SPEED] / 2)
@@ -2264,7 +2266,7 @@ class TestCheckSpeedRanges(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_speed_ranges(self.battle, messages)
+        check_speed_ranges(self.battle, tokenize('\n'.join(messages)))
 
         # bot_speed / 2 should be the minspeed it has b/c it went first with tailwind up
         expected_min_speed = int(self.battle.user.active.stats[constants.SPEED] / 2)
@@ -2281,7 +2283,7 @@ class TestCheckSpeedRanges(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_speed_ranges(self.battle, messages)
+        check_speed_ranges(self.battle, tokenize('\n'.join(messages)))
 
         # bot_speed * 2 should be the minspeed it has b/c it went first with tailwind up
         expected_min_speed = int(self.battle.user.active.stats[constants.SPEED] * 2)
@@ -2299,7 +2301,7 @@ class TestCheckSpeedRanges(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_speed_ranges(self.battle, messages)
+        check_speed_ranges(self.battle, tokenize('\n'.join(messages)))
 
         # bot_speed / 2 should be the minspeed it has b/c it went first with tailwind up
         expected_min_speed = int(self.battle.user.active.stats[constants.SPEED] / 2)
@@ -2320,7 +2322,7 @@ class TestCheckSpeedRanges(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_speed_ranges(self.battle, messages)
+        check_speed_ranges(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(0, self.battle.opponent.active.speed_range.min)
 
@@ -2333,7 +2335,7 @@ class TestCheckSpeedRanges(unittest.TestCase):
             '|move|p2a: Caterpie|Stealth Rock|'
         ]
 
-        check_speed_ranges(self.battle, messages)
+        check_speed_ranges(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(self.battle.user.active.stats[constants.SPEED], self.battle.opponent.active.speed_range.max)
 
@@ -2348,7 +2350,7 @@ class TestCheckSpeedRanges(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_speed_ranges(self.battle, messages)
+        check_speed_ranges(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(0, self.battle.opponent.active.speed_range.min)
 
@@ -2362,7 +2364,7 @@ class TestCheckSpeedRanges(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_speed_ranges(self.battle, messages)
+        check_speed_ranges(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(self.battle.user.active.stats[constants.SPEED], self.battle.opponent.active.speed_range.min)
 
@@ -2376,7 +2378,7 @@ class TestCheckSpeedRanges(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_speed_ranges(self.battle, messages)
+        check_speed_ranges(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(self.battle.user.active.stats[constants.SPEED], self.battle.opponent.active.speed_range.min)
 
@@ -2390,7 +2392,7 @@ class TestCheckSpeedRanges(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_speed_ranges(self.battle, messages)
+        check_speed_ranges(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(0, self.battle.opponent.active.speed_range.min)
 
@@ -2404,7 +2406,7 @@ class TestCheckSpeedRanges(unittest.TestCase):
             '|move|p2a: Caterpie|Stealth Rock|',
         ]
 
-        check_speed_ranges(self.battle, messages)
+        check_speed_ranges(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(self.battle.user.active.stats[constants.SPEED]*1.5, self.battle.opponent.active.speed_range.max)
 
@@ -2420,7 +2422,7 @@ class TestCheckSpeedRanges(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|',
         ]
 
-        check_speed_ranges(self.battle, messages)
+        check_speed_ranges(self.battle, tokenize('\n'.join(messages)))
 
         # this is meant to show the rounding inherent with way pokemon floors values
         # floor(317 / 1.5) = 211
@@ -2440,7 +2442,7 @@ class TestCheckSpeedRanges(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_speed_ranges(self.battle, messages)
+        check_speed_ranges(self.battle, tokenize('\n'.join(messages)))
 
         # the minspeed should take into account the fact that the opponent has a boost
         # therefore, the minimum (unboosted) speed must be divided by the boost multiplier
@@ -2460,7 +2462,7 @@ class TestCheckSpeedRanges(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_speed_ranges(self.battle, messages)
+        check_speed_ranges(self.battle, tokenize('\n'.join(messages)))
 
         # the minspeed should take into account the fact that the opponent has a boost
         # therefore, the minimum (unboosted) speed must be divided by the boost multiplier
@@ -2481,7 +2483,7 @@ class TestCheckSpeedRanges(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_speed_ranges(self.battle, messages)
+        check_speed_ranges(self.battle, tokenize('\n'.join(messages)))
 
         # the minspeed should take into account the fact that the opponent has a boost
         # therefore, the minimum (unboosted) speed must be divided by the boost multiplier
@@ -2500,7 +2502,7 @@ class TestCheckSpeedRanges(unittest.TestCase):
             '|move|p1a: Caterpie|unknown-move|'
         ]
 
-        check_speed_ranges(self.battle, messages)
+        check_speed_ranges(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(150, self.battle.opponent.active.speed_range.min)
 
@@ -2513,7 +2515,7 @@ class TestCheckSpeedRanges(unittest.TestCase):
             '|move|p2a: Caterpie|unknown-move|',
         ]
 
-        check_speed_ranges(self.battle, messages)
+        check_speed_ranges(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(150, self.battle.opponent.active.speed_range.max)
 
@@ -2535,7 +2537,7 @@ class TestCheckSpeedRanges(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_speed_ranges(self.battle, messages)
+        check_speed_ranges(self.battle, tokenize('\n'.join(messages)))
         expected_min_speed = 150
         self.assertEqual(expected_min_speed, self.battle.opponent.active.speed_range.min)
 
@@ -2548,7 +2550,7 @@ class TestCheckSpeedRanges(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_speed_ranges(self.battle, messages)
+        check_speed_ranges(self.battle, tokenize('\n'.join(messages)))
         self.assertEqual(0, self.battle.opponent.active.speed_range.min)
 
     def test_bot_using_grassyglide_in_grassy_terrain_does_not_cause_maxspeed_to_be_set(self):
@@ -2560,7 +2562,7 @@ class TestCheckSpeedRanges(unittest.TestCase):
             '|move|p2a: Caterpie|Stealth Rock|',
         ]
 
-        check_speed_ranges(self.battle, messages)
+        check_speed_ranges(self.battle, tokenize('\n'.join(messages)))
         self.assertEqual(float("inf"), self.battle.opponent.active.speed_range.max)
 
     def test_move_from_magicbounce_after_switching_does_not_set_speed_range(self):
@@ -2573,7 +2575,7 @@ class TestCheckSpeedRanges(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|p2a: Caterpie|[from]ability: Magic Bounce',
         ]
 
-        check_speed_ranges(self.battle, messages)
+        check_speed_ranges(self.battle, tokenize('\n'.join(messages)))
 
         # speed ranges should be unchanged because this was a switch-in
         self.assertEqual(float("inf"), self.battle.opponent.active.speed_range.max)
@@ -2617,7 +2619,7 @@ class TestGuessChoiceScarf(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_choicescarf(self.battle, messages)
+        check_choicescarf(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual('choicescarf', self.battle.opponent.active.item)
 
@@ -2672,7 +2674,7 @@ class TestGuessChoiceScarf(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_choicescarf(self.battle, messages)
+        check_choicescarf(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(constants.UNKNOWN_ITEM, self.battle.opponent.active.item)
 
@@ -2685,7 +2687,7 @@ class TestGuessChoiceScarf(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_choicescarf(self.battle, messages)
+        check_choicescarf(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(constants.UNKNOWN_ITEM, self.battle.opponent.active.item)
 
@@ -2698,7 +2700,7 @@ class TestGuessChoiceScarf(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_choicescarf(self.battle, messages)
+        check_choicescarf(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(constants.UNKNOWN_ITEM, self.battle.opponent.active.item)
 
@@ -2711,7 +2713,7 @@ class TestGuessChoiceScarf(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_choicescarf(self.battle, messages)
+        check_choicescarf(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(constants.UNKNOWN_ITEM, self.battle.opponent.active.item)
 
@@ -2724,7 +2726,7 @@ class TestGuessChoiceScarf(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_choicescarf(self.battle, messages)
+        check_choicescarf(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(constants.UNKNOWN_ITEM, self.battle.opponent.active.item)
 
@@ -2737,7 +2739,7 @@ class TestGuessChoiceScarf(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_choicescarf(self.battle, messages)
+        check_choicescarf(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(constants.UNKNOWN_ITEM, self.battle.opponent.active.item)
 
@@ -2750,7 +2752,7 @@ class TestGuessChoiceScarf(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_choicescarf(self.battle, messages)
+        check_choicescarf(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual('choicescarf', self.battle.opponent.active.item)
 
@@ -2762,7 +2764,7 @@ class TestGuessChoiceScarf(unittest.TestCase):
             '|move|p1a: Caterpie|unknown-move|'
         ]
 
-        check_choicescarf(self.battle, messages)
+        check_choicescarf(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual('choicescarf', self.battle.opponent.active.item)
 
@@ -2774,7 +2776,7 @@ class TestGuessChoiceScarf(unittest.TestCase):
             '|move|p1a: Caterpie|unknown-move|'
         ]
 
-        check_choicescarf(self.battle, messages)
+        check_choicescarf(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(constants.UNKNOWN_ITEM, self.battle.opponent.active.item)
 
@@ -2786,7 +2788,7 @@ class TestGuessChoiceScarf(unittest.TestCase):
             '|move|p2a: Caterpie|Stealth Rock|'
         ]
 
-        check_choicescarf(self.battle, messages)
+        check_choicescarf(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(constants.UNKNOWN_ITEM, self.battle.opponent.active.item)
 
@@ -2798,7 +2800,7 @@ class TestGuessChoiceScarf(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_choicescarf(self.battle, messages)
+        check_choicescarf(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(constants.UNKNOWN_ITEM, self.battle.opponent.active.item)
 
@@ -2810,7 +2812,7 @@ class TestGuessChoiceScarf(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_choicescarf(self.battle, messages)
+        check_choicescarf(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(constants.UNKNOWN_ITEM, self.battle.opponent.active.item)
 
@@ -2824,7 +2826,7 @@ class TestGuessChoiceScarf(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_choicescarf(self.battle, messages)
+        check_choicescarf(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(constants.UNKNOWN_ITEM, self.battle.opponent.active.item)
 
@@ -2838,7 +2840,7 @@ class TestGuessChoiceScarf(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_choicescarf(self.battle, messages)
+        check_choicescarf(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(constants.UNKNOWN_ITEM, self.battle.opponent.active.item)
 
@@ -2853,7 +2855,7 @@ class TestGuessChoiceScarf(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_choicescarf(self.battle, messages)
+        check_choicescarf(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual("choicescarf", self.battle.opponent.active.item)
 
@@ -2867,7 +2869,7 @@ class TestGuessChoiceScarf(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_choicescarf(self.battle, messages)
+        check_choicescarf(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(constants.UNKNOWN_ITEM, self.battle.opponent.active.item)
 
@@ -2882,7 +2884,7 @@ class TestGuessChoiceScarf(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_choicescarf(self.battle, messages)
+        check_choicescarf(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual("choicescarf", self.battle.opponent.active.item)
 
@@ -2896,7 +2898,7 @@ class TestGuessChoiceScarf(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_choicescarf(self.battle, messages)
+        check_choicescarf(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(constants.UNKNOWN_ITEM, self.battle.opponent.active.item)
 
@@ -2911,7 +2913,7 @@ class TestGuessChoiceScarf(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_choicescarf(self.battle, messages)
+        check_choicescarf(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual("choicescarf", self.battle.opponent.active.item)
 
@@ -2922,7 +2924,7 @@ class TestGuessChoiceScarf(unittest.TestCase):
             '|move|p2a: Caterpie|Stealth Rock|',
         ]
 
-        check_choicescarf(self.battle, messages)
+        check_choicescarf(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(constants.UNKNOWN_ITEM, self.battle.opponent.active.item)
 
@@ -2935,7 +2937,7 @@ class TestGuessChoiceScarf(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_choicescarf(self.battle, messages)
+        check_choicescarf(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(None, self.battle.opponent.active.item)
 
@@ -2948,7 +2950,7 @@ class TestGuessChoiceScarf(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_choicescarf(self.battle, messages)
+        check_choicescarf(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual('leftovers', self.battle.opponent.active.item)
 
@@ -2967,7 +2969,7 @@ class TestGuessChoiceScarf(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|'
         ]
 
-        check_choicescarf(self.battle, messages)
+        check_choicescarf(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual('choicescarf', self.battle.opponent.active.item)
 
@@ -2983,7 +2985,7 @@ class TestGuessChoiceScarf(unittest.TestCase):
             '|move|p1a: Caterpie|Stealth Rock|p2a: Caterpie|[from]ability: Magic Bounce',
         ]
 
-        check_choicescarf(self.battle, messages)
+        check_choicescarf(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(constants.UNKNOWN_ITEM, self.battle.opponent.active.item)
 
@@ -3072,7 +3074,7 @@ class TestCheckHeavyDutyBoots(unittest.TestCase):
             '|-damage|p2a: Weedle|90/100'
         ]
 
-        check_heavydutyboots(self.battle, messages)
+        check_heavydutyboots(self.battle, tokenize('\n'.join(messages)))
 
         self.assertEqual(None, self.battle.opponent.active.item)
 
@@ -3403,6 +3405,23 @@ class TestInactiveOff(unittest.TestCase):
         self.assertIsNone(self.battle.time_remaining)
 
 
+class TestTokenize(unittest.TestCase):
+    def test_each_line_is_split_into_an_event(self):
+        events = tokenize('>battle-gen8ou-1\n|move|p2a: Pikachu|Tackle|p1a: Caterpie\n|\n|turn|2')
+        self.assertEqual(
+            [
+                ['>battle-gen8ou-1'],
+                ['', 'move', 'p2a: Pikachu', 'Tackle', 'p1a: Caterpie'],
+                ['', ''],
+                ['', 'turn', '2'],
+            ],
+            events
+        )
+
+    def test_every_action_in_the_dispatch_table_has_a_function(self):
+        self.assertTrue(all(callable(f) for f in BATTLE_MODIFIERS.values()))
+
+
 class TestGetDamageDealt(unittest.TestCase):
     def setUp(self):
         self.battle = Battle(None)
@@ -3427,7 +3446,7 @@ class TestGetDamageDealt(unittest.TestCase):
 
         split_msg = messages[0].split('|')
 
-        damage_dealt = get_damage_dealt(self.battle, split_msg, messages[1:])
+        damage_dealt = get_damage_dealt(self.battle, split_msg, tokenize('\n'.join(messages[1:])))
 
         expected_damage_amount_dealt = DamageDealt(attacker='pikachu', defender='caterpie', move='tackle', percent_damage=0.20, crit=False)
         self.assertEqual(expected_damage_amount_dealt, damage_dealt)
@@ -3446,7 +3465,7 @@ class TestGetDamageDealt(unittest.TestCase):
 
         split_msg = messages[0].split('|')
 
-        damage_dealt = get_damage_dealt(self.battle, split_msg, messages[1:])
+        damage_dealt = get_damage_dealt(self.battle, split_msg, tokenize('\n'.join(messages[1:])))
 
         expected_damage_amount_dealt = DamageDealt(attacker='pikachu', defender='caterpie', move='tackle', percent_damage=0.20, crit=False)
         self.assertEqual(expected_damage_amount_dealt, damage_dealt)
@@ -3466,7 +3485,7 @@ class TestGetDamageDealt(unittest.TestCase):
 
         split_msg = messages[0].split('|')
 
-        damage_dealt = get_damage_dealt(self.battle, split_msg, messages[1:])
+        damage_dealt = get_damage_dealt(self.battle, split_msg, tokenize('\n'.join(messages[1:])))
 
         expected_damage_amount_dealt = DamageDealt(attacker='pikachu', defender='caterpie', move='tackle', percent_damage=0.60, crit=False)
         self.assertEqual(expected_damage_amount_dealt, damage_dealt)
@@ -3486,7 +3505,7 @@ class TestGetDamageDealt(unittest.TestCase):
 
         split_msg = messages[0].split('|')
 
-        damage_dealt = get_damage_dealt(self.battle, split_msg, messages[1:])
+        damage_dealt = get_damage_dealt(self.battle, split_msg, tokenize('\n'.join(messages[1:])))
 
         expected_damage_amount_dealt = DamageDealt(attacker='pikachu', defender='caterpie', move='tackle', percent_damage=0.60, crit=True)
         self.assertEqual(expected_damage_amount_dealt, damage_dealt)
@@ -3505,7 +3524,7 @@ class TestGetDamageDealt(unittest.TestCase):
 
         split_msg = messages[0].split('|')
 
-        damage_dealt = get_damage_dealt(self.battle, split_msg, messages[1:])
+        damage_dealt = get_damage_dealt(self.battle, split_msg, tokenize('\n'.join(messages[1:])))
 
         expected_damage_amount_dealt = DamageDealt(attacker='pikachu', defender='caterpie', move='tackle', percent_damage=0.20, crit=False)
         self.assertEqual(expected_damage_amount_dealt, damage_dealt)
@@ -3521,7 +3540,7 @@ class TestGetDamageDealt(unittest.TestCase):
 
         split_msg = messages[0].split('|')
 
-        damage_dealt = get_damage_dealt(self.battle, split_msg, messages[1:])
+        damage_dealt = get_damage_dealt(self.battle, split_msg, tokenize('\n'.join(messages[1:])))
         self.assertIsNone(damage_dealt)
 
     def test_does_not_catch_second_moves_damage_after_a_heal(self):
@@ -3537,7 +3556,7 @@ class TestGetDamageDealt(unittest.TestCase):
 
         split_msg = messages[0].split('|')
 
-        damage_dealt = get_damage_dealt(self.battle, split_msg, messages[1:])
+        damage_dealt = get_damage_dealt(self.battle, split_msg, tokenize('\n'.join(messages[1:])))
         self.assertIsNone(damage_dealt)
 
     def test_does_not_set_damage_when_status_move_occurs(self):
@@ -3551,7 +3570,7 @@ class TestGetDamageDealt(unittest.TestCase):
 
         split_msg = messages[0].split('|')
 
-        damage_dealt = get_damage_dealt(self.battle, split_msg, messages[1:])
+        damage_dealt = get_damage_dealt(self.battle, split_msg, tokenize('\n'.join(messages[1:])))
         self.assertIsNone(damage_dealt)
 
     def test_assigns_damage_from_move_that_causes_status_as_secondary(self):
@@ -3566,7 +3585,7 @@ class TestGetDamageDealt(unittest.TestCase):
 
         split_msg = messages[0].split('|')
 
-        damage_dealt = get_damage_dealt(self.battle, split_msg, messages[1:])
+        damage_dealt = get_damage_dealt(self.battle, split_msg, tokenize('\n'.join(messages[1:])))
 
         expected_damage_amount_dealt = DamageDealt(attacker='pikachu', defender='caterpie', move='thunderbolt', percent_damage=0.20, crit=False)
         self.assertEqual(expected_damage_amount_dealt, damage_dealt)
@@ -3585,7 +3604,7 @@ class TestGetDamageDealt(unittest.TestCase):
 
         split_msg = messages[0].split('|')
 
-        damage_dealt = get_damage_dealt(self.battle, split_msg, messages[1:])
+        damage_dealt = get_damage_dealt(self.battle, split_msg, tokenize('\n'.join(messages[1:])))
 
         expected_damage_amount_dealt = DamageDealt(attacker='pikachu', defender='caterpie', move='tackle', percent_damage=1/250, crit=False)
         self.assertEqual(expected_damage_amount_dealt, damage_dealt)
@@ -3602,7 +3621,7 @@ class TestGetDamageDealt(unittest.TestCase):
 
         split_msg = messages[0].split('|')
 
-        damage_dealt = get_damage_dealt(self.battle, split_msg, messages[1:])
+        damage_dealt = get_damage_dealt(self.battle, split_msg, tokenize('\n'.join(messages[1:])))
 
         expected_damage_amount_dealt = DamageDealt(attacker='caterpie', defender='pikachu', move='tackle', percent_damage=0.01, crit=False)
         self.assertEqual(expected_damage_amount_dealt, damage_dealt)
@@ -3621,7 +3640,7 @@ class TestGetDamageDealt(unittest.TestCase):
 
         split_msg = messages[0].split('|')
 
-        damage_dealt = get_damage_dealt(self.battle, split_msg, messages[1:])
+        damage_dealt = get_damage_dealt(self.battle, split_msg, tokenize('\n'.join(messages[1:])))
 
         expected_damage_amount_dealt = DamageDealt(attacker='caterpie', defender='pikachu', move='tackle', percent_damage=1/250, crit=False)
         self.assertEqual(expected_damage_amount_dealt, damage_dealt)
@@ -3641,7 +3660,7 @@ class TestGetDamageDealt(unittest.TestCase):
 
         split_msg = messages[0].split('|')
 
-        damage_dealt = get_damage_dealt(self.battle, split_msg, messages[1:])
+        damage_dealt = get_damage_dealt(self.battle, split_msg, tokenize('\n'.join(messages[1:])))
         self.assertIsNone(damage_dealt)
 
     def test_lifeorb_does_not_assign_damage(self):
@@ -3656,7 +3675,7 @@ class TestGetDamageDealt(unittest.TestCase):
 
         split_msg = messages[0].split('|')
 
-        damage_dealt = get_damage_dealt(self.battle, split_msg, messages[1:])
+        damage_dealt = get_damage_dealt(self.battle, split_msg, tokenize('\n'.join(messages[1:])))
 
         expected_damage_dealt = DamageDealt(attacker='pikachu', defender='caterpie', move='tackle', percent_damage=0.20, crit=False)
         self.assertEqual(damage_dealt, expected_damage_dealt)
@@ -3673,7 +3692,7 @@ class TestGetDamageDealt(unittest.TestCase):
 
         split_msg = messages[0].split('|')
 
-        damage_dealt = get_damage_dealt(self.battle, split_msg, messages[1:])
+        damage_dealt = get_damage_dealt(self.battle, split_msg, tokenize('\n'.join(messages[1:])))
 
         expected_damage_dealt = DamageDealt(attacker='caterpie', defender='pikachu', move='tackle', percent_damage=0.15, crit=False)
         self.assertEqual(expected_damage_dealt, damage_dealt)
@@ -3692,7 +3711,7 @@ class TestGetDamageDealt(unittest.TestCase):
 
         split_msg = messages[0].split('|')
 
-        damage_dealt = get_damage_dealt(self.battle, split_msg, messages[1:])
+        damage_dealt = get_damage_dealt(self.battle, split_msg, tokenize('\n'.join(messages[1:])))
 
         self.assertIsNone(damage_dealt)
 
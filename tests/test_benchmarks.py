@@ -0,0 +1,52 @@
+import json
+import unittest
+
+from config import ShowdownConfig
+from benchmarks.engine import find_regressions
+from benchmarks.engine import get_benchmarks
+from benchmarks.engine import run_benchmarks
+from benchmarks.fixtures import FIXTURES
+
+
+class TestRunBenchmarks(unittest.TestCase):
+    def setUp(self):
+        ShowdownConfig.damage_calc_type = "average"
+
+    def test_every_fixture_has_options_for_both_sides(self):
+        for fixture in FIXTURES.values():
+            user_options, opponent_options = fixture().get_all_options()
+            self.assertTrue(user_options)
+            self.assertTrue(opponent_options)
+
+    def test_every_benchmark_is_run_on_every_fixture(self):
+        fixtures = {'endgame': FIXTURES['endgame']}
+        results = run_benchmarks(fixtures, get_benchmarks([1]), repeats=2, min_time=0)
+
+        self.assertEqual(
+            ['get_all_state_instructions', 'apply_reverse', 'evaluate', '_calculate_damage', 'clone', 'fingerprint', 'get_payoff_matrix_depth_1'],
+            [r['benchmark'] for r in results]
+        )
+        for result in results:
+            self.assertEqual('endgame', result['fixture'])
+            self.assertEqual(2, result['repeats'])
+            self.assertLessEqual(result['best'], result['mean'])
+
+    def test_results_can_be_written_as_json(self):
+        results = run_benchmarks({'endgame': FIXTURES['endgame']}, get_benchmarks([]), repeats=1, min_time=0)
+        self.assertEqual(results, json.loads(json.dumps(results)))
+
+
+class TestFindRegressions(unittest.TestCase):
+    def test_benchmark_slower_than_the_threshold_is_a_regression(self):
+        baseline = [{'fixture': 'endgame', 'benchmark': 'evaluate', 'best': 1.0}]
+        results = [{'fixture': 'endgame', 'benchmark': 'evaluate', 'best': 1.5}]
+        self.assertEqual([('endgame', 'evaluate', 1.5)], find_regressions(baseline, results, 1.1))
+
+    def test_benchmark_within_the_threshold_is_not_a_regression(self):
+        baseline = [{'fixture': 'endgame', 'benchmark': 'evaluate', 'best': 1.0}]
+        results = [{'fixture': 'endgame', 'benchmark': 'evaluate', 'best': 1.05}]
+        self.assertEqual([], find_regressions(baseline, results, 1.1))
+
+    def test_benchmark_missing_from_the_baseline_is_not_a_regression(self):
+        results = [{'fixture': 'endgame', 'benchmark': 'evaluate', 'best': 1.5}]
+        self.assertEqual([], find_regressions([], results, 1.1))
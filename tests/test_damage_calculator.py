@@ -1,12 +1,28 @@
+import sys
+import threading
 import unittest
+from unittest import mock
 from collections import defaultdict
+from copy import deepcopy
 
 import constants
+import data
+from config import ShowdownConfig
 from showdown.engine.damage_calculator import _calculate_damage
 from showdown.engine.damage_calculator import calculate_damage
+from showdown.engine.damage_calculator import get_damage_rolls
+from showdown.engine.damage_calculator import get_move_set_damage_rolls
+from showdown.engine.damage_calculator import type_effectiveness_modifier
+from showdown.engine.damage_calculator import pokemon_type_indicies
+from showdown.engine.damage_calculator import damage_multipication_array
+from showdown.engine.damage_calculator import clear_damage_cache
+from showdown.engine.damage_calculator import get_move
+from showdown.engine.find_state_instructions import get_all_state_instructions
+from showdown.engine import damage_calculator
 from showdown.engine.objects import State
 from showdown.engine.objects import Side
 from showdown.engine.objects import Pokemon
+from showdown.engine.objects import StateMutator
 
 from showdown.battle import Pokemon as StatePokemon
 
@@ -338,6 +354,188 @@ class TestCalculateDamageAmount(unittest.TestCase):
         self.assertEqual([18], dmg)
 
 
+class TestDamageCache(unittest.TestCase):
+    def setUp(self):
+        clear_damage_cache()
+        self.charizard = Pokemon.from_state_pokemon_dict(StatePokemon("charizard", 100).to_dict())
+        self.venusaur = Pokemon.from_state_pokemon_dict(StatePokemon("venusaur", 100).to_dict())
+
+    def tearDown(self):
+        damage_calculator.DAMAGE_CACHE_SIZE = 50000
+        clear_damage_cache()
+
+    def test_same_damage_is_returned_when_it_is_remembered(self):
+        first_dmg = _calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max')
+        second_dmg = _calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max')
+
+        self.assertEqual([300], first_dmg)
+        self.assertEqual([300], second_dmg)
+        self.assertEqual(1, len(damage_calculator._damage_cache))
+
+    def test_changing_the_returned_damage_does_not_change_the_remembered_damage(self):
+        _calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max').append(1)
+        self.assertEqual([300], _calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max'))
+
+    def test_changing_a_boost_is_not_given_the_remembered_damage(self):
+        _calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max')
+        self.charizard.special_attack_boost = 1
+
+        dmg = _calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max')
+        self.assertEqual([450], dmg)
+
+    def test_changing_a_volatile_status_is_not_given_the_remembered_damage(self):
+        _calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max')
+        self.charizard.volatile_status.add('flashfire')
+
+        dmg = _calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max')
+        self.assertEqual([450], dmg)
+
+    def test_changing_the_conditions_is_not_given_the_remembered_damage(self):
+        _calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max')
+
+        dmg = _calculate_damage(self.charizard, self.venusaur, 'fireblast', conditions={constants.WEATHER: constants.SUN}, calc_type='max')
+        self.assertEqual([450], dmg)
+
+    def test_changing_the_calc_type_is_not_given_the_remembered_damage(self):
+        _calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max')
+
+        dmg = _calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='min')
+        self.assertEqual([255], dmg)
+
+    def test_changing_the_hp_of_the_defender_changes_damage_of_superfang(self):
+        _calculate_damage(self.charizard, self.venusaur, 'superfang', calc_type='max')
+        self.venusaur.hp = 100
+
+        dmg = _calculate_damage(self.charizard, self.venusaur, 'superfang', calc_type='max')
+        self.assertEqual([50], dmg)
+
+    def test_oldest_damage_is_removed_when_the_cache_is_full(self):
+        damage_calculator.DAMAGE_CACHE_SIZE = 2
+        _calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max')
+        _calculate_damage(self.charizard, self.venusaur, 'flamethrower', calc_type='max')
+        _calculate_damage(self.charizard, self.venusaur, 'airslash', calc_type='max')
+
+        self.assertEqual(2, len(damage_calculator._damage_cache))
+        self.assertNotIn('fireblast', [key[0] for key in damage_calculator._damage_cache])
+
+    def test_cache_can_be_filled_from_many_threads_at_once(self):
+        damage_calculator.DAMAGE_CACHE_SIZE = 2
+        errors = []
+
+        def calculate_damage(boost):
+            # every thread has its own attacker, so each one adds different keys
+            attacker = Pokemon.from_state_pokemon_dict(StatePokemon("charizard", 100).to_dict())
+            attacker.special_attack_boost = boost
+            try:
+                for _ in range(200):
+                    for move in ['fireblast', 'flamethrower', 'airslash', 'solarbeam', 'focusblast']:
+                        _calculate_damage(attacker, self.venusaur, move, calc_type='max')
+            except Exception as e:
+                errors.append(e)
+
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=calculate_damage, args=(boost,)) for boost in range(-6, 7)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+        self.assertEqual([], errors)
+        self.assertLessEqual(len(damage_calculator._damage_cache), 2)
+
+
+class TestTypeEffectivenessModifier(unittest.TestCase):
+    def test_table_gives_the_product_of_the_modifier_against_each_type(self):
+        for attacking_type, attacking_type_index in pokemon_type_indicies.items():
+            for first_type, first_type_index in pokemon_type_indicies.items():
+                for second_type, second_type_index in pokemon_type_indicies.items():
+                    expected_modifier = (
+                        damage_multipication_array[attacking_type_index][first_type_index] *
+                        damage_multipication_array[attacking_type_index][second_type_index]
+                    )
+                    self.assertEqual(expected_modifier, type_effectiveness_modifier(attacking_type, [first_type, second_type]))
+
+    def test_modifier_against_no_types_is_1(self):
+        self.assertEqual(1, type_effectiveness_modifier('fire', []))
+
+    def test_modifier_against_three_types(self):
+        self.assertEqual(8, type_effectiveness_modifier('fire', ['grass', 'bug', 'steel']))
+
+    def test_unknown_type_raises_keyerror(self):
+        with self.assertRaises(KeyError):
+            type_effectiveness_modifier('fire', ['notatype'])
+
+
+class TestMoveSetDamage(unittest.TestCase):
+    def test_move_set_damage_rolls_are_the_same_as_each_damage_roll(self):
+        damages = [0, 1, 17.5, 123.4, 250.75, 999]
+        for calc_type in ['average', 'min', 'max', 'min_max', 'min_max_average', 'all']:
+            expected_damage_rolls = [get_damage_rolls(damage, calc_type) for damage in damages]
+            self.assertEqual(expected_damage_rolls, get_move_set_damage_rolls(damages, calc_type))
+
+    def test_move_set_damage_rolls_are_the_same_without_numpy(self):
+        damages = [0, 1, 17.5, 123.4, 250.75, 999]
+        expected_damage_rolls = [get_damage_rolls(damage, 'all') for damage in damages]
+        with mock.patch('showdown.engine.damage_calculator.np', None):
+            self.assertEqual(expected_damage_rolls, get_move_set_damage_rolls(damages, 'all'))
+
+
+class TestMovesAreNotModified(unittest.TestCase):
+    def setUp(self):
+        ShowdownConfig.damage_calc_type = "average"
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("charizard", 100).to_dict()),
+                {"venusaur": Pokemon.from_state_pokemon_dict(StatePokemon("venusaur", 100).to_dict())},
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("blastoise", 100).to_dict()),
+                {"pikachu": Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 100).to_dict())},
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            None,
+            None,
+            False,
+            6
+        )
+        self.moves = ['solarbeam', 'closecombat', 'dracometeor', 'crunch', 'ironhead', 'swordsdance', 'growl', 'poweruppunch', 'knockoff']
+        self.original_moves = {move: deepcopy(data.all_move_json[move]) for move in self.moves}
+
+    def assert_moves_are_not_modified(self):
+        for move in self.moves:
+            self.assertEqual(self.original_moves[move], data.all_move_json[move])
+
+    def test_get_move_returns_the_move_from_the_moves_json(self):
+        self.assertIs(data.all_move_json['fireblast'], get_move('fireblast'))
+
+    def test_calculate_damage_does_not_modify_a_charge_move(self):
+        calculate_damage(self.state, constants.USER, 'solarbeam', 'splash')
+        self.assertIn(constants.CHARGE, data.all_move_json['solarbeam'][constants.FLAGS])
+
+    def test_abilities_and_items_do_not_modify_the_moves_they_change(self):
+        mutator = StateMutator(self.state)
+        for ability in ['contrary', 'serenegrace', 'competitive', 'defiant', 'sheerforce', 'technician', 'noguard']:
+            for item in ['choiceband', 'lifeorb', 'weaknesspolicy']:
+                self.state.user.active.ability = ability
+                self.state.opponent.active.ability = ability
+                self.state.user.active.item = item
+                self.state.opponent.active.item = item
+                for move in self.moves:
+                    calculate_damage(self.state, constants.USER, move, 'splash')
+                    get_all_state_instructions(mutator, move, move)
+
+        self.assert_moves_are_not_modified()
+
+
 class TestCalculateDamage(unittest.TestCase):
     def setUp(self):
         self.blastoise = Pokemon.from_state_pokemon_dict(StatePokemon("blastoise", 100).to_dict())
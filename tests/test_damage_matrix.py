@@ -0,0 +1,113 @@
+import unittest
+from collections import defaultdict
+
+import constants
+from config import ShowdownConfig
+from showdown.battle import Pokemon as StatePokemon
+from showdown.engine.damage_calculator import calculate_damage
+from showdown.engine.damage_calculator import clear_damage_cache
+from showdown.engine.damage_matrix import get_damage_matrix
+from showdown.engine.find_state_instructions import lookup_move
+from showdown.engine.find_state_instructions import user_moves_first
+from showdown.engine.objects import State
+from showdown.engine.objects import Side
+from showdown.engine.objects import Pokemon
+
+
+class TestGetDamageMatrix(unittest.TestCase):
+    def setUp(self):
+        ShowdownConfig.damage_calc_type = "average"
+        clear_damage_cache()
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("raichu", 73).to_dict()),
+                {
+                    "xatu": Pokemon.from_state_pokemon_dict(StatePokemon("xatu", 81).to_dict()),
+                    "starmie": Pokemon.from_state_pokemon_dict(StatePokemon("starmie", 81).to_dict()),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("aromatisse", 81).to_dict()),
+                {
+                    "yveltal": Pokemon.from_state_pokemon_dict(StatePokemon("yveltal", 73).to_dict()),
+                    "toxapex": Pokemon.from_state_pokemon_dict(StatePokemon("toxapex", 73).to_dict()),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            None,
+            None,
+            False,
+            6
+        )
+
+    def test_matrix_has_an_entry_for_every_pair_of_options(self):
+        user_options = ['thunderbolt', 'nastyplot', 'switch xatu']
+        opponent_options = ['moonblast', 'switch yveltal']
+        damage_matrix = get_damage_matrix(self.state, user_options, opponent_options)
+
+        self.assertEqual(
+            {(u, o) for u in user_options for o in opponent_options},
+            set(damage_matrix)
+        )
+
+    def test_damage_is_the_same_as_calculate_damage_with_one_damage_roll(self):
+        damage_matrix = get_damage_matrix(self.state, ['thunderbolt'], ['moonblast'], calc_type='max')
+        entry = damage_matrix[('thunderbolt', 'moonblast')]
+
+        self.assertEqual(calculate_damage(self.state, constants.USER, 'thunderbolt', 'moonblast', calc_type='max')[0], entry.user_damage)
+        self.assertEqual(calculate_damage(self.state, constants.OPPONENT, 'moonblast', 'thunderbolt', calc_type='max')[0], entry.opponent_damage)
+
+    def test_expected_damage_includes_the_chance_to_miss(self):
+        damage_matrix = get_damage_matrix(self.state, ['focusblast'], ['splash'], calc_type='max')
+        damage = calculate_damage(self.state, constants.USER, 'focusblast', 'splash', calc_type='max')[0]
+
+        self.assertAlmostEqual(0.7 * damage, damage_matrix[('focusblast', 'splash')].user_damage)
+
+    def test_status_move_and_switch_do_no_damage(self):
+        damage_matrix = get_damage_matrix(self.state, ['nastyplot', 'switch xatu'], ['splash'])
+
+        self.assertEqual(0, damage_matrix[('nastyplot', 'splash')].user_damage)
+        self.assertEqual(0, damage_matrix[('switch xatu', 'splash')].user_damage)
+
+    def test_move_against_a_switch_hits_the_pokemon_switching_in(self):
+        damage_matrix = get_damage_matrix(self.state, ['thunderbolt'], ['switch toxapex', 'switch yveltal'], calc_type='max')
+
+        self.assertNotEqual(
+            damage_matrix[('thunderbolt', 'switch toxapex')].user_damage,
+            damage_matrix[('thunderbolt', 'switch yveltal')].user_damage
+        )
+
+    def test_damage_is_not_more_than_the_hp_of_the_pokemon_hit(self):
+        self.state.opponent.active.hp = 1
+        damage_matrix = get_damage_matrix(self.state, ['thunderbolt'], ['splash'])
+
+        self.assertEqual(1, damage_matrix[('thunderbolt', 'splash')].user_damage)
+        self.assertEqual(1, damage_matrix[('thunderbolt', 'splash')].user_ko_chance)
+
+    def test_ko_chance_is_the_fraction_of_damage_rolls_that_knock_out(self):
+        max_damage = calculate_damage(self.state, constants.USER, 'thunderbolt', 'splash', calc_type='max')[0]
+        min_damage = calculate_damage(self.state, constants.USER, 'thunderbolt', 'splash', calc_type='min')[0]
+        self.state.opponent.active.hp = (max_damage + min_damage) // 2
+
+        ko_chance = get_damage_matrix(self.state, ['thunderbolt'], ['splash'], calc_type='all')[('thunderbolt', 'splash')].user_ko_chance
+        self.assertTrue(0 < ko_chance < 1)
+
+    def test_user_moves_first_is_the_same_as_the_turn_order(self):
+        user_options = ['thunderbolt', 'switch xatu']
+        opponent_options = ['moonblast', 'switch yveltal']
+        damage_matrix = get_damage_matrix(self.state, user_options, opponent_options)
+
+        for (user_option, opponent_option), entry in damage_matrix.items():
+            self.assertEqual(
+                user_moves_first(self.state, lookup_move(user_option), lookup_move(opponent_option)),
+                entry.user_moves_first
+            )
+
+    def test_invalid_calc_type_raises_valueerror(self):
+        with self.assertRaises(ValueError):
+            get_damage_matrix(self.state, ['thunderbolt'], ['splash'], calc_type='notacalctype')
@@ -0,0 +1,73 @@
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+from showdown import http_session
+from showdown.http_session import HTTP_RETRIES
+from showdown.http_session import HTTP_TIMEOUT
+from showdown.http_session import async_post
+from showdown.websocket_client import PSWebsocketClient
+
+
+class TestHttpSession(unittest.TestCase):
+    def setUp(self):
+        self.session_patch = mock.patch('showdown.http_session.session')
+        self.session_mock = self.session_patch.start()
+
+    def tearDown(self):
+        self.session_patch.stop()
+
+    def test_get_uses_the_default_timeout(self):
+        http_session.get('https://www.smogon.com/stats')
+        self.session_mock.get.assert_called_once_with('https://www.smogon.com/stats', timeout=HTTP_TIMEOUT)
+
+    def test_post_timeout_can_be_changed(self):
+        http_session.post('https://play.pokemonshowdown.com/action.php', data={}, timeout=1)
+        self.session_mock.post.assert_called_once_with('https://play.pokemonshowdown.com/action.php', data={}, timeout=1)
+
+    def test_async_post_does_not_block_the_event_loop(self):
+        self.session_mock.post.side_effect = lambda *args, **kwargs: time.sleep(0.2)
+        ticks = []
+
+        async def tick():
+            for _ in range(5):
+                ticks.append(time.time())
+                await asyncio.sleep(0.02)
+
+        async def post_and_tick():
+            await asyncio.gather(async_post('https://play.pokemonshowdown.com/action.php'), tick())
+
+        asyncio.run(post_and_tick())
+        self.assertEqual(5, len(ticks))
+        self.assertLess(ticks[-1] - ticks[0], 0.2)
+
+
+class TestCreateSession(unittest.TestCase):
+    def test_requests_are_retried(self):
+        session = http_session.create_session()
+        self.assertEqual(HTTP_RETRIES, session.get_adapter('https://www.smogon.com').max_retries.total)
+
+
+class TestLogin(unittest.TestCase):
+    def setUp(self):
+        self.client = PSWebsocketClient()
+        self.client.username = 'bot'
+        self.client.password = 'password'
+        self.client.login_uri = 'https://play.pokemonshowdown.com/action.php'
+        self.client.get_id_and_challstr = mock.AsyncMock(return_value=('4', 'challstr'))
+        self.client.send_message = mock.AsyncMock()
+
+        self.async_post_patch = mock.patch('showdown.websocket_client.async_post')
+        self.async_post_mock = self.async_post_patch.start()
+
+    def tearDown(self):
+        self.async_post_patch.stop()
+
+    def test_login_sends_the_assertion(self):
+        self.async_post_mock.return_value.status_code = 200
+        self.async_post_mock.return_value.text = ']{"actionsuccess": true, "assertion": "abc"}'
+
+        asyncio.run(self.client.login())
+
+        self.client.send_message.assert_called_once_with('', ['/trn bot,0,abc'])
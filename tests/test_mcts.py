@@ -0,0 +1,91 @@
+import random
+import unittest
+from collections import defaultdict
+
+import constants
+from config import ShowdownConfig
+from showdown.battle import Pokemon as StatePokemon
+from showdown.engine.objects import State
+from showdown.engine.objects import Side
+from showdown.engine.objects import Pokemon
+from showdown.engine.objects import StateMutator
+from showdown.battle_bots.mcts.main import search
+from showdown.battle_bots.mcts.main import get_reward
+from showdown.battle_bots.mcts.main import DecoupledUCTNode
+
+
+class TestDecoupledUCTNode(unittest.TestCase):
+    def setUp(self):
+        self.node = DecoupledUCTNode(['tackle', 'growl'], ['thunderbolt', 'splash'])
+
+    def test_unvisited_moves_are_selected_first(self):
+        self.node.update('tackle', 'thunderbolt', 1)
+
+        self.assertEqual('growl', self.node.select_user_move())
+        self.assertEqual('splash', self.node.select_opponent_move())
+
+    def test_user_selects_move_with_highest_reward_and_opponent_selects_move_with_lowest_reward(self):
+        for _ in range(50):
+            self.node.update('tackle', 'thunderbolt', 0.8)
+            self.node.update('growl', 'splash', 0.2)
+
+        self.assertEqual('tackle', self.node.select_user_move())
+        self.assertEqual('splash', self.node.select_opponent_move())
+
+
+class TestSearch(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        ShowdownConfig.damage_calc_type = "average"
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("raichu", 73).to_dict()),
+                {
+                    "xatu": Pokemon.from_state_pokemon_dict(StatePokemon("xatu", 81).to_dict()),
+                },
+                (0, 0),
+                defaultdict(int),
+                (0, 0)
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("gyarados", 81).to_dict()),
+                {
+                    "yveltal": Pokemon.from_state_pokemon_dict(StatePokemon("yveltal", 73).to_dict()),
+                },
+                (0, 0),
+                defaultdict(int),
+                (0, 0)
+            ),
+            None,
+            None,
+            False,
+            6
+        )
+        self.state.user.active.moves = [
+            {constants.ID: 'thunderbolt', constants.DISABLED: False},
+            {constants.ID: 'splash', constants.DISABLED: False},
+        ]
+        self.state.opponent.active.moves = [
+            {constants.ID: 'waterfall', constants.DISABLED: False},
+        ]
+        self.mutator = StateMutator(self.state)
+
+    def test_search_does_not_change_the_state(self):
+        expected_state_hash = self.state.zobrist_hash()
+        search(self.mutator, *self.state.get_all_options(), float('inf'), max_iterations=100)
+        self.assertEqual(expected_state_hash, self.state.zobrist_hash())
+
+    def test_search_visits_the_root_once_per_iteration(self):
+        root = search(self.mutator, *self.state.get_all_options(), float('inf'), max_iterations=100)
+        self.assertEqual(100, root.visits)
+        self.assertEqual(100, sum(s.visits for s in root.user_statistics.values()))
+
+    def test_super_effective_move_is_searched_the_most(self):
+        root = search(self.mutator, *self.state.get_all_options(), float('inf'), max_iterations=300)
+        most_visited = max(root.user_statistics, key=lambda m: root.user_statistics[m].visits)
+        self.assertEqual('thunderbolt', most_visited)
+
+    def test_reward_is_between_0_and_1(self):
+        self.state.opponent.active.hp = 0
+        self.state.opponent.reserve["yveltal"].hp = 0
+        self.assertTrue(0 < get_reward(StateMutator(self.state)) <= 1)
@@ -0,0 +1,96 @@
+import unittest
+from collections import defaultdict
+
+import constants
+from showdown.battle import Pokemon as StatePokemon
+from showdown.engine.objects import State
+from showdown.engine.objects import Side
+from showdown.engine.objects import Pokemon
+from showdown.engine.move_ordering import estimate_damage
+from showdown.engine.move_ordering import MoveOrdering
+
+
+class TestEstimateDamage(unittest.TestCase):
+    def setUp(self):
+        self.raichu = Pokemon.from_state_pokemon_dict(StatePokemon("raichu", 73).to_dict())
+        self.gyarados = Pokemon.from_state_pokemon_dict(StatePokemon("gyarados", 81).to_dict())
+
+    def test_status_move_does_no_damage(self):
+        self.assertEqual(0, estimate_damage(self.raichu, self.gyarados, 'thunderwave'))
+
+    def test_switch_does_no_damage(self):
+        self.assertEqual(0, estimate_damage(self.raichu, self.gyarados, '{} pikachu'.format(constants.SWITCH_STRING)))
+
+    def test_super_effective_stab_move_does_more_damage_than_neutral_move(self):
+        self.assertGreater(
+            estimate_damage(self.raichu, self.gyarados, 'thunderbolt'),
+            estimate_damage(self.raichu, self.gyarados, 'bodyslam')
+        )
+
+    def test_stab_increases_damage(self):
+        self.assertEqual(90 * 4 * 1.5, estimate_damage(self.raichu, self.gyarados, 'thunderbolt'))
+
+
+class TestMoveOrdering(unittest.TestCase):
+    def setUp(self):
+        self.move_ordering = MoveOrdering()
+        self.user_options = ['switch xatu', 'thunderwave', 'bodyslam', 'thunderbolt']
+        self.opponent_options = ['dragondance', 'waterfall', 'earthquake']
+
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("raichu", 73).to_dict()),
+                {},
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("gyarados", 81).to_dict()),
+                {},
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            None,
+            None,
+            False,
+            6
+        )
+
+    def test_moves_that_do_the_most_damage_are_first(self):
+        user_options, opponent_options = self.move_ordering.order(self.state, self.user_options, self.opponent_options, 1)
+
+        self.assertEqual(['thunderbolt', 'bodyslam', 'switch xatu', 'thunderwave'], user_options)
+        self.assertEqual(['earthquake', 'waterfall', 'dragondance'], opponent_options)
+
+    def test_best_reply_is_first(self):
+        user_options, opponent_options = self.move_ordering.order(self.state, self.user_options, self.opponent_options, 1, ('thunderwave', 'dragondance'))
+
+        self.assertEqual('thunderwave', user_options[0])
+        self.assertEqual('dragondance', opponent_options[0])
+
+    def test_killer_move_is_before_other_moves(self):
+        self.move_ordering.record_opponent_cutoff('dragondance', 1)
+        user_options, opponent_options = self.move_ordering.order(self.state, self.user_options, self.opponent_options, 1)
+
+        self.assertEqual('dragondance', opponent_options[0])
+
+    def test_move_that_caused_cutoffs_at_another_depth_is_before_other_moves(self):
+        self.move_ordering.record_opponent_cutoff('dragondance', 2)
+        user_options, opponent_options = self.move_ordering.order(self.state, self.user_options, self.opponent_options, 1)
+
+        self.assertEqual('dragondance', opponent_options[0])
+
+    def test_killer_move_is_before_move_with_more_history(self):
+        self.move_ordering.record_opponent_cutoff('dragondance', 3)
+        self.move_ordering.record_opponent_cutoff('waterfall', 1)
+        user_options, opponent_options = self.move_ordering.order(self.state, self.user_options, self.opponent_options, 1)
+
+        self.assertEqual(['waterfall', 'dragondance', 'earthquake'], opponent_options)
+
+    def test_best_reply_is_before_killer_move(self):
+        self.move_ordering.record_user_cutoff('bodyslam', 1)
+        user_options, opponent_options = self.move_ordering.order(self.state, self.user_options, self.opponent_options, 1, ('thunderwave', None))
+
+        self.assertEqual(['thunderwave', 'bodyslam', 'thunderbolt', 'switch xatu'], user_options)
@@ -0,0 +1,127 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from showdown.battle_bots.safest.main import BattleBot
+from showdown.opening_book import add_team_order
+from showdown.opening_book import get_opening_book_key
+from showdown.opening_book import get_team_order
+from showdown.opening_book import load_opening_book
+from showdown.opening_book import save_opening_book
+from opening_book.builder import create_team_request
+from opening_book.previews import get_common_previews
+
+
+TEAM = """Clefable @ Life Orb
+Ability: Magic Guard
+EVs: 76 HP / 252 SpA / 180 Spe
+Modest Nature
+- Moonblast
+- Thunderbolt
+
+Corviknight @ Leftovers
+Ability: Pressure
+EVs: 252 HP / 4 Atk / 252 Spe
+Jolly Nature
+- Brave Bird
+- Roost
+
+Hippowdon @ Leftovers
+Ability: Sand Stream
+EVs: 252 HP / 252 Def / 4 SpD
+Impish Nature
+- Earthquake
+- Slack Off
+"""
+
+
+def create_battle(opponent_pokemon):
+    battle = BattleBot(None)
+    battle.initialize_team_preview(create_team_request(TEAM, max_chosen_team_size=3), opponent_pokemon, "gen8ou")
+    return battle
+
+
+class TestOpeningBook(unittest.TestCase):
+    def setUp(self):
+        self.battle = create_battle(["Garchomp", "Toxapex", "Heatran"])
+        self.opening_book = dict()
+
+    def test_team_order_is_none_for_a_preview_that_is_not_in_the_book(self):
+        self.assertIsNone(get_team_order(self.opening_book, "gen8ou", self.battle))
+
+    def test_team_order_that_was_added_is_returned(self):
+        add_team_order(self.opening_book, "gen8ou", self.battle, [3, 1, 2])
+        self.assertEqual([3, 1, 2], get_team_order(self.opening_book, "gen8ou", self.battle))
+
+    def test_order_of_opponent_preview_does_not_change_the_key(self):
+        other_battle = create_battle(["Heatran", "Garchomp", "Toxapex"])
+        self.assertEqual(get_opening_book_key("gen8ou", self.battle), get_opening_book_key("gen8ou", other_battle))
+
+    def test_different_opponent_preview_has_a_different_key(self):
+        other_battle = create_battle(["Garchomp", "Toxapex", "Ferrothorn"])
+        self.assertNotEqual(get_opening_book_key("gen8ou", self.battle), get_opening_book_key("gen8ou", other_battle))
+
+    def test_different_format_has_a_different_key(self):
+        self.assertNotEqual(get_opening_book_key("gen8ou", self.battle), get_opening_book_key("gen8uu", self.battle))
+
+    def test_invalid_team_order_is_ignored(self):
+        self.opening_book[get_opening_book_key("gen8ou", self.battle)] = "17"
+        self.assertIsNone(get_team_order(self.opening_book, "gen8ou", self.battle))
+
+    def test_saved_opening_book_can_be_loaded(self):
+        add_team_order(self.opening_book, "gen8ou", self.battle, [3, 1, 2])
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "opening_book.json")
+            save_opening_book(self.opening_book, path)
+            self.assertEqual([3, 1, 2], get_team_order(load_opening_book(path), "gen8ou", self.battle))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_missing_opening_book_is_empty(self):
+        self.assertEqual(dict(), load_opening_book(None))
+        self.assertEqual(dict(), load_opening_book("/not/a/real/opening_book.json"))
+
+
+class TestCreateTeamRequest(unittest.TestCase):
+    def test_request_creates_the_team_in_order(self):
+        battle = create_battle(["Garchomp"])
+
+        self.assertEqual(['clefable', 'corviknight', 'hippowdon'], [p.name for p in battle.user.reserve])
+        self.assertEqual(3, battle.max_chosen_team_size)
+
+    def test_request_contains_the_item_ability_and_moves(self):
+        clefable = create_battle(["Garchomp"]).user.reserve[0]
+
+        self.assertEqual('lifeorb', clefable.item)
+        self.assertEqual('magicguard', clefable.ability)
+        self.assertEqual(['moonblast', 'thunderbolt'], [m.name for m in clefable.moves])
+
+
+class TestGetCommonPreviews(unittest.TestCase):
+    def setUp(self):
+        names = ["a", "b", "c", "d", "e", "f", "g"]
+        usage_data = {
+            name: {
+                'usage': 1 - i / 10,
+                'Teammates': {other: (10 if other != "g" else -10) for other in names if other != name}
+            }
+            for i, name in enumerate(names)
+        }
+        self.requests_patch = mock.patch('opening_book.previews.requests')
+        requests_mock = self.requests_patch.start()
+        requests_mock.get.return_value.json.return_value = {'data': usage_data}
+
+    def tearDown(self):
+        self.requests_patch.stop()
+
+    def test_previews_start_with_the_most_used_pokemon_and_add_their_most_common_teammates(self):
+        previews = get_common_previews("gen8ou", 1)
+        self.assertEqual([["a", "b", "c", "d", "e", "f"]], previews)
+
+    def test_previews_that_are_the_same_team_are_only_returned_once(self):
+        previews = get_common_previews("gen8ou", 10)
+        self.assertEqual(2, len(previews))
+        self.assertEqual("g", previews[1][0])
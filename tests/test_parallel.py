@@ -0,0 +1,98 @@
+import unittest
+from collections import defaultdict
+from concurrent.futures import Future
+
+import constants
+from config import ShowdownConfig
+from showdown.battle import Pokemon as StatePokemon
+from showdown.engine.objects import State
+from showdown.engine.objects import Side
+from showdown.engine.objects import Pokemon
+from showdown.engine.objects import StateMutator
+from showdown.engine.select_best_move import get_payoff_matrix
+from showdown.engine.select_best_move import pick_safest
+from showdown.engine.parallel import get_process_pool
+from showdown.engine.parallel import get_search_settings
+from showdown.engine.parallel import get_payoff_matrices_in_parallel
+from showdown.engine.parallel import shutdown_process_pool
+from showdown.engine import parallel
+
+
+class TestGetPayoffMatricesInParallel(unittest.TestCase):
+    def setUp(self):
+        ShowdownConfig.damage_calc_type = "average"
+        ShowdownConfig.search_probability_floor = 0
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("raichu", 73).to_dict()),
+                {
+                    "xatu": Pokemon.from_state_pokemon_dict(StatePokemon("xatu", 81).to_dict()),
+                },
+                (0, 0),
+                defaultdict(int),
+                (0, 0)
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("aromatisse", 81).to_dict()),
+                {
+                    "yveltal": Pokemon.from_state_pokemon_dict(StatePokemon("yveltal", 73).to_dict()),
+                },
+                (0, 0),
+                defaultdict(int),
+                (0, 0)
+            ),
+            None,
+            None,
+            False,
+            6
+        )
+        self.state.user.active.moves = [
+            {constants.ID: 'thunderbolt', constants.DISABLED: False},
+            {constants.ID: 'voltswitch', constants.DISABLED: False},
+        ]
+        self.state.opponent.active.moves = [
+            {constants.ID: 'moonblast', constants.DISABLED: False},
+            {constants.ID: 'calmmind', constants.DISABLED: False},
+        ]
+        self.pool = get_process_pool(2, None)
+        self.search_settings = get_search_settings(1000)
+
+    def tearDown(self):
+        shutdown_process_pool()
+
+    def test_unpruned_parallel_search_gives_the_same_payoff_matrix(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected_scores = get_payoff_matrix(StateMutator(self.state), user_options, opponent_options, depth=2, prune=False)
+
+        scores = get_payoff_matrices_in_parallel(
+            self.pool,
+            self.search_settings,
+            [(self.state, user_options, opponent_options)],
+            depth=2,
+            prune=False
+        )[0]
+
+        self.assertEqual(expected_scores, scores)
+
+    def test_pruned_parallel_search_finds_the_same_safest_move(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected_safest = pick_safest(get_payoff_matrix(StateMutator(self.state), user_options, opponent_options, depth=2, prune=False))
+
+        scores = get_payoff_matrices_in_parallel(
+            self.pool,
+            self.search_settings,
+            [(self.state, user_options, opponent_options), (self.state, user_options, opponent_options)],
+            depth=2,
+            prune=True
+        )
+
+        self.assertEqual(2, len(scores))
+        for s in scores:
+            self.assertEqual(expected_safest, pick_safest(s))
+
+    def test_shutdown_cancels_the_tasks_that_have_not_started(self):
+        future = Future()
+        parallel._pending_futures.add(future)
+        shutdown_process_pool()
+
+        self.assertTrue(future.cancelled())
@@ -0,0 +1,173 @@
+import threading
+import time
+import unittest
+from collections import defaultdict
+from unittest import mock
+
+import constants
+from config import ShowdownConfig
+from showdown.battle import Pokemon as StatePokemon
+from showdown.battle_bots.pondering import Ponderer
+from showdown.battle_bots.pondering import get_decision_from_message
+from showdown.battle_bots.pondering import get_likely_outcomes
+from showdown.battle_bots.safest.main import BattleBot
+from showdown.engine.objects import State
+from showdown.engine.objects import Side
+from showdown.engine.objects import Pokemon
+from showdown.engine.objects import StateMutator
+from showdown.engine.select_best_move import SearchTimeout
+from showdown.engine.select_best_move import get_payoff_matrix
+from showdown.engine.transposition_table import TranspositionTable
+from showdown.run_battle import ponder_should_stop
+
+
+def create_state():
+    state = State(
+        Side(
+            Pokemon.from_state_pokemon_dict(StatePokemon("raichu", 73).to_dict()),
+            {
+                "xatu": Pokemon.from_state_pokemon_dict(StatePokemon("xatu", 81).to_dict()),
+            },
+            (0, 0),
+            defaultdict(lambda: 0),
+            (0, 0)
+        ),
+        Side(
+            Pokemon.from_state_pokemon_dict(StatePokemon("aromatisse", 81).to_dict()),
+            {
+                "yveltal": Pokemon.from_state_pokemon_dict(StatePokemon("yveltal", 73).to_dict()),
+            },
+            (0, 0),
+            defaultdict(lambda: 0),
+            (0, 0)
+        ),
+        None,
+        None,
+        False,
+        6
+    )
+    state.user.active.moves = [
+        {constants.ID: 'thunderbolt', constants.DISABLED: False, constants.CURRENT_PP: 16},
+        {constants.ID: 'focusblast', constants.DISABLED: False, constants.CURRENT_PP: 16},
+    ]
+    state.opponent.active.moves = [
+        {constants.ID: 'moonblast', constants.DISABLED: False, constants.CURRENT_PP: 16},
+        {constants.ID: 'calmmind', constants.DISABLED: False, constants.CURRENT_PP: 16},
+    ]
+    return state
+
+
+class TestGetDecisionFromMessage(unittest.TestCase):
+    def setUp(self):
+        self.battle = BattleBot(None)
+        self.battle.user.reserve = [StatePokemon('xatu', 100), StatePokemon('starmie', 100)]
+        self.battle.user.reserve[0].index = 2
+        self.battle.user.reserve[1].index = 3
+
+    def test_move_is_returned(self):
+        self.assertEqual('thunderbolt', get_decision_from_message(self.battle, '/choose move thunderbolt'))
+
+    def test_move_with_a_mega_evolution_is_returned(self):
+        self.assertEqual('thunderbolt', get_decision_from_message(self.battle, '/choose move thunderbolt mega'))
+
+    def test_switch_uses_the_name_of_the_pokemon_at_that_index(self):
+        self.assertEqual('switch starmie', get_decision_from_message(self.battle, '/switch 3'))
+
+    def test_switch_to_an_unknown_index_returns_none(self):
+        self.assertIsNone(get_decision_from_message(self.battle, '/switch 5'))
+
+
+class TestGetLikelyOutcomes(unittest.TestCase):
+    def setUp(self):
+        ShowdownConfig.damage_calc_type = "average"
+        self.mutator = StateMutator(create_state())
+
+    def test_outcomes_are_sorted_from_most_to_least_likely(self):
+        probabilities = [p for p, _, _ in get_likely_outcomes([self.mutator], 'focusblast')]
+        self.assertEqual(sorted(probabilities, reverse=True), probabilities)
+
+    def test_probabilities_add_up_to_one(self):
+        outcomes = get_likely_outcomes([self.mutator], 'focusblast', max_outcomes=100)
+        self.assertAlmostEqual(1, sum(p for p, _, _ in outcomes))
+
+    def test_only_max_outcomes_are_returned(self):
+        self.assertEqual(1, len(get_likely_outcomes([self.mutator], 'focusblast', max_outcomes=1)))
+
+
+class TestPonderer(unittest.TestCase):
+    def setUp(self):
+        ShowdownConfig.damage_calc_type = "average"
+        ShowdownConfig.search_probability_floor = 0
+        self.state = create_state()
+        self.battle = mock.Mock()
+        self.battle.prepare_battles.return_value = [mock.Mock(create_state=mock.Mock(return_value=self.state))]
+        self.transposition_table = TranspositionTable()
+
+    def test_pondering_fills_the_transposition_table_and_restores_the_state(self):
+        state_string = self.state.serialize()
+        ponderer = Ponderer(self.battle, 'thunderbolt', self.transposition_table)
+        ponderer.start()
+        time.sleep(0.5)
+        ponderer.stop()
+        ponderer.thread.join()
+
+        self.assertGreater(len(self.transposition_table), 0)
+        self.assertEqual(state_string, ponderer.mutators[0].state.serialize())
+
+    def test_stop_does_not_wait_for_the_search_to_end(self):
+        ponderer = Ponderer(self.battle, 'thunderbolt', self.transposition_table)
+        ponderer.thread = mock.Mock()
+        ponderer.stop()
+
+        self.assertTrue(ponderer.cancel.is_set())
+        ponderer.thread.join.assert_not_called()
+
+    def test_states_are_created_in_the_ponder_thread(self):
+        threads = []
+        self.battle.prepare_battles.side_effect = lambda **kwargs: threads.append(threading.current_thread()) or []
+        ponderer = Ponderer(self.battle, 'thunderbolt', self.transposition_table)
+        ponderer.start()
+        ponderer.thread.join()
+
+        self.assertEqual([ponderer.thread], threads)
+
+    def test_ponderer_stopped_while_creating_the_states_does_not_search(self):
+        ponderer = Ponderer(self.battle, 'thunderbolt', self.transposition_table)
+        self.battle.prepare_battles.side_effect = lambda **kwargs: ponderer.stop() or []
+        with mock.patch('showdown.battle_bots.pondering.get_likely_outcomes') as get_likely_outcomes_mock:
+            ponderer.start()
+            ponderer.thread.join()
+
+        get_likely_outcomes_mock.assert_not_called()
+
+    def test_state_after_an_outcome_is_in_the_transposition_table_after_it_is_searched(self):
+        ponderer = Ponderer(self.battle, 'thunderbolt', self.transposition_table)
+        ponderer.create_mutators()
+        _, mutator, instructions = get_likely_outcomes(ponderer.mutators, 'thunderbolt')[0]
+        ponderer.search(mutator, instructions, 2)
+
+        mutator.apply(instructions)
+        self.assertIsNotNone(self.transposition_table.get(mutator.hash, 2))
+
+    def test_set_cancel_event_stops_a_search(self):
+        cancel = threading.Event()
+        cancel.set()
+        mutator = StateMutator(self.state)
+        user_options, opponent_options = self.state.get_all_options()
+
+        with self.assertRaises(SearchTimeout):
+            get_payoff_matrix(mutator, user_options, opponent_options, depth=2, cancel=cancel)
+
+
+class TestPonderShouldStop(unittest.TestCase):
+    def test_stops_on_the_next_request(self):
+        self.assertTrue(ponder_should_stop('battle-gen8ou-1', '>battle-gen8ou-1\n|request|{"active": []}'))
+
+    def test_stops_on_the_next_turn(self):
+        self.assertTrue(ponder_should_stop('battle-gen8ou-1', '>battle-gen8ou-1\n|move|p2a: Clefable|Moonblast|\n|turn|5'))
+
+    def test_does_not_stop_on_chat(self):
+        self.assertFalse(ponder_should_stop('battle-gen8ou-1', '>battle-gen8ou-1\n|c|user|hello'))
+
+    def test_does_not_stop_on_another_battle(self):
+        self.assertFalse(ponder_should_stop('battle-gen8ou-1', '>battle-gen8ou-2\n|turn|5'))
@@ -0,0 +1,128 @@
+import os
+import shutil
+import tempfile
+import unittest
+from collections import defaultdict
+
+from config import ShowdownConfig
+from showdown.battle import Pokemon as StatePokemon
+from showdown.engine.objects import State
+from showdown.engine.objects import Side
+from showdown.engine.objects import Pokemon
+from showdown.engine.search_cache import SearchCache
+from showdown.engine.search_cache import get_search_cache_key
+
+
+class TestSearchCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "search_cache.db")
+        self.search_cache = SearchCache(self.path, max_size=2)
+        self.payoff_matrices = [{('tackle', 'tackle'): 10.5, ('tackle', 'splash'): float('nan')}]
+
+    def tearDown(self):
+        self.search_cache.close()
+        shutil.rmtree(self.directory)
+
+    def test_get_returns_none_for_unknown_key(self):
+        self.assertIsNone(self.search_cache.get(b'key'))
+
+    def test_get_returns_payoff_matrices_that_were_stored(self):
+        self.search_cache.store(b'key', self.payoff_matrices)
+        payoff_matrices = self.search_cache.get(b'key')
+
+        self.assertEqual(10.5, payoff_matrices[0][('tackle', 'tackle')])
+        self.assertNotEqual(payoff_matrices[0][('tackle', 'splash')], payoff_matrices[0][('tackle', 'splash')])
+
+    def test_stored_payoff_matrices_are_kept_after_the_cache_is_closed(self):
+        self.search_cache.store(b'key', self.payoff_matrices)
+        self.search_cache.close()
+
+        self.search_cache = SearchCache(self.path)
+        self.assertEqual(10.5, self.search_cache.get(b'key')[0][('tackle', 'tackle')])
+
+    def test_least_recently_used_entry_is_removed_when_full(self):
+        self.search_cache.store(b'first', self.payoff_matrices)
+        self.search_cache.store(b'second', self.payoff_matrices)
+        self.search_cache.get(b'first')
+        self.search_cache.store(b'third', self.payoff_matrices)
+
+        self.assertEqual(2, len(self.search_cache))
+        self.assertIsNotNone(self.search_cache.get(b'first'))
+        self.assertIsNone(self.search_cache.get(b'second'))
+
+    def test_cache_without_a_path_is_disabled(self):
+        search_cache = SearchCache()
+        search_cache.store(b'key', self.payoff_matrices)
+
+        self.assertIsNone(search_cache.get(b'key'))
+        self.assertEqual(0, len(search_cache))
+
+    def test_cache_with_a_max_size_of_zero_is_disabled(self):
+        self.search_cache.open(os.path.join(self.directory, "other.db"), max_size=0)
+        self.search_cache.store(b'key', self.payoff_matrices)
+
+        self.assertIsNone(self.search_cache.get(b'key'))
+
+
+class TestGetSearchCacheKey(unittest.TestCase):
+    def setUp(self):
+        ShowdownConfig.damage_calc_type = "average"
+        ShowdownConfig.search_probability_floor = 0
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("raichu", 73).to_dict()),
+                {
+                    "xatu": Pokemon.from_state_pokemon_dict(StatePokemon("xatu", 81).to_dict()),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("aromatisse", 81).to_dict()),
+                {
+                    "yveltal": Pokemon.from_state_pokemon_dict(StatePokemon("yveltal", 73).to_dict()),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            None,
+            None,
+            False,
+            6
+        )
+        self.user_options = ['thunderbolt', 'switch xatu']
+        self.opponent_options = ['moonblast', 'switch yveltal']
+
+    def get_key(self, depth=2):
+        return get_search_cache_key([(self.state, self.user_options, self.opponent_options)], depth, True, 'gen8')
+
+    def test_same_state_has_the_same_key(self):
+        key = self.get_key()
+        self.state = self.state.clone()
+
+        self.assertEqual(key, self.get_key())
+
+    def test_order_of_options_does_not_change_the_key(self):
+        key = self.get_key()
+        self.user_options.reverse()
+        self.opponent_options.reverse()
+
+        self.assertEqual(key, self.get_key())
+
+    def test_different_state_has_a_different_key(self):
+        key = self.get_key()
+        self.state.opponent.active.hp -= 1
+
+        self.assertNotEqual(key, self.get_key())
+
+    def test_different_depth_has_a_different_key(self):
+        self.assertNotEqual(self.get_key(depth=2), self.get_key(depth=3))
+
+    def test_different_damage_calc_type_has_a_different_key(self):
+        key = self.get_key()
+        ShowdownConfig.damage_calc_type = "max"
+
+        self.assertNotEqual(key, self.get_key())
@@ -1,10 +1,25 @@
+import math
+import time
 import unittest
+from unittest import mock
 from collections import defaultdict
+from copy import deepcopy
 
 import constants
+from config import ShowdownConfig
 from showdown.engine.objects import State
 from showdown.engine.objects import Side
 from showdown.engine.objects import Pokemon
+from showdown.engine.objects import StateMutator
+from showdown.engine.evaluate import evaluate
+from showdown.engine.evaluate import evaluation_bounds
+from showdown.engine.select_best_move import get_payoff_matrix
+from showdown.engine.select_best_move import get_joint_payoff_matrices
+from showdown.engine.select_best_move import get_move_pair_score
+from showdown.engine.select_best_move import pick_safest
+from showdown.engine.move_ordering import MoveOrdering
+from showdown.engine.transposition_table import TranspositionTable
+from showdown.engine.select_best_move import SearchTimeout
 from showdown.battle import Pokemon as StatePokemon
 
 
@@ -529,3 +544,202 @@ class TestGetAllOptions(unittest.TestCase):
         options = self.state.get_all_options()
 
         self.assertEqual(expected_options, options)
+
+
+class TestGetPayoffMatrix(unittest.TestCase):
+    def setUp(self):
+        ShowdownConfig.damage_calc_type = "average"
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("raichu", 73).to_dict()),
+                {
+                    "xatu": Pokemon.from_state_pokemon_dict(StatePokemon("xatu", 81).to_dict()),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("aromatisse", 81).to_dict()),
+                {
+                    "yveltal": Pokemon.from_state_pokemon_dict(StatePokemon("yveltal", 73).to_dict()),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            None,
+            None,
+            False,
+            6
+        )
+        self.state.user.active.moves = [
+            {constants.ID: 'thunderbolt', constants.DISABLED: False},
+            {constants.ID: 'voltswitch', constants.DISABLED: False},
+        ]
+        self.state.opponent.active.moves = [
+            {constants.ID: 'moonblast', constants.DISABLED: False},
+            {constants.ID: 'calmmind', constants.DISABLED: False},
+        ]
+        self.mutator = StateMutator(self.state)
+
+    def test_search_that_passes_the_deadline_raises_search_timeout(self):
+        user_options, opponent_options = self.state.get_all_options()
+        with self.assertRaises(SearchTimeout):
+            get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, deadline=time.time() - 1)
+
+    def test_state_is_restored_when_search_times_out_during_a_deeper_search(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected_state_hash = self.state.zobrist_hash()
+
+        # the deadline passes after the first few cells of the search have been searched
+        with mock.patch('showdown.engine.select_best_move.time') as time_mock:
+            time_mock.time.side_effect = [0] * 5 + [2] * 1000
+            with self.assertRaises(SearchTimeout):
+                get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, deadline=1)
+
+        self.assertEqual(expected_state_hash, self.state.zobrist_hash())
+
+    def test_deadline_that_is_not_reached_does_not_change_the_scores(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected_scores = get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, prune=False)
+        scores = get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, prune=False, deadline=time.time() + 1000)
+
+        self.assertEqual(expected_scores, scores)
+
+    def test_pruned_search_finds_the_same_safest_move_as_a_full_search(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected_safest = pick_safest(get_payoff_matrix(self.mutator, user_options, opponent_options, depth=3, prune=False))
+
+        safest = pick_safest(
+            get_payoff_matrix(
+                self.mutator,
+                user_options,
+                opponent_options,
+                depth=3,
+                prune=True,
+                transposition_table=TranspositionTable(),
+                move_ordering=MoveOrdering()
+            )
+        )
+
+        self.assertEqual(expected_safest[0][0], safest[0][0])
+        self.assertAlmostEqual(expected_safest[1], safest[1])
+
+    def test_search_that_cannot_reach_alpha_returns_a_score_at_or_below_alpha(self):
+        user_options, opponent_options = self.state.get_all_options()
+        safest_score = pick_safest(get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, prune=False))[1]
+
+        score = pick_safest(get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, alpha=safest_score + 10))[1]
+
+        self.assertLessEqual(score, safest_score + 10)
+        self.assertGreaterEqual(score, safest_score)
+
+    def test_search_that_reaches_beta_returns_a_score_at_or_above_beta(self):
+        user_options, opponent_options = self.state.get_all_options()
+        safest_score = pick_safest(get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, prune=False))[1]
+
+        score = pick_safest(get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, beta=safest_score - 10))[1]
+
+        self.assertGreaterEqual(score, safest_score - 10)
+        self.assertLessEqual(score, safest_score)
+
+    def test_burned_guts_pokemon_is_scored_within_the_evaluation_bounds(self):
+        # a burn raises the score of a pokemon with guts, so the best state the user can be in is burned
+        user = self.state.user
+        user.active.ability = 'guts'
+        user.active.status = constants.BURN
+        user.active.burn_multiplier = user.active.calculate_burn_multiplier()
+        for boost in ('attack_boost', 'defense_boost', 'special_attack_boost', 'special_defense_boost', 'speed_boost', 'accuracy_boost', 'evasion_boost'):
+            setattr(user.active, boost, 6)
+        user.active.volatile_status = {constants.SUBSTITUTE, constants.DYNAMAX, constants.TERASTALLIZE}
+        for condition in (constants.REFLECT, constants.LIGHT_SCREEN, constants.AURORA_VEIL, constants.SAFEGUARD, constants.TAILWIND, constants.WISH, constants.HEALING_WISH):
+            user.side_conditions[condition] = 1
+        opponent = self.state.opponent
+        for condition, count in ((constants.STICKY_WEB, 1), (constants.FUTURE_SIGHT, 1), (constants.STEALTH_ROCK, 1), (constants.SPIKES, 3), (constants.TOXIC_SPIKES, 2)):
+            opponent.side_conditions[condition] = count
+        for pkmn in [opponent.active] + list(opponent.reserve.values()):
+            pkmn.hp = 0
+
+        lowest, highest = evaluation_bounds(self.state, 0)
+
+        self.assertLessEqual(lowest, evaluate(self.state))
+        self.assertLessEqual(evaluate(self.state), highest)
+
+    def test_move_pair_outside_of_the_window_is_not_searched_past_the_first_turn(self):
+        # no state can score anywhere near this, so the score of the move-pair must be below alpha
+        with mock.patch('showdown.engine.select_best_move.get_safest_score') as get_safest_score_mock:
+            score = get_move_pair_score(self.mutator, 'thunderbolt', 'moonblast', 1, alpha=100000)
+
+        self.assertLessEqual(score, 100000)
+        get_safest_score_mock.assert_not_called()
+
+    def test_move_pair_score_bound_is_at_or_below_alpha_when_it_fails_low(self):
+        expected_score = get_move_pair_score(self.mutator, 'thunderbolt', 'moonblast', 1)
+
+        score = get_move_pair_score(self.mutator, 'thunderbolt', 'moonblast', 1, alpha=expected_score + 50)
+
+        self.assertLessEqual(score, expected_score + 50)
+        self.assertGreaterEqual(score, expected_score)
+
+    def test_probability_floor_below_every_outcome_does_not_change_the_scores(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected_scores = get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, prune=False)
+        scores = get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, prune=False, probability_floor=1e-9)
+
+        self.assertEqual(expected_scores.keys(), scores.keys())
+        for move_pair, score in expected_scores.items():
+            self.assertAlmostEqual(score, scores[move_pair])
+
+    def test_probability_floor_searches_fewer_outcomes(self):
+        user_options, opponent_options = self.state.get_all_options()
+
+        with mock.patch.object(StateMutator, 'evaluate', autospec=True, side_effect=StateMutator.evaluate) as evaluate_mock:
+            get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, prune=False)
+            expected_calls = evaluate_mock.call_count
+
+            evaluate_mock.reset_mock()
+            get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, prune=False, probability_floor=0.2)
+
+        self.assertLess(evaluate_mock.call_count, expected_calls)
+
+    def test_joint_search_of_several_states_finds_the_same_safest_move_as_searching_each_state(self):
+        other_state = deepcopy(self.state)
+        other_state.opponent.active.moves = [
+            {constants.ID: 'psychic', constants.DISABLED: False},
+            {constants.ID: 'moonblast', constants.DISABLED: False},
+        ]
+        states = [self.state, other_state]
+
+        all_scores = dict()
+        for i, state in enumerate(states):
+            user_options, opponent_options = state.get_all_options()
+            scores = get_payoff_matrix(StateMutator(state), user_options, opponent_options, depth=2, prune=False)
+            all_scores.update({(k[0], (k[1], i)): v for k, v in scores.items()})
+        expected_safest = pick_safest(all_scores)
+
+        payoff_matrices = get_joint_payoff_matrices(
+            [StateMutator(state) for state in states],
+            self.state.get_all_options()[0],
+            [state.get_all_options()[1] for state in states],
+            depth=2
+        )
+        all_scores = dict()
+        for i, scores in enumerate(payoff_matrices):
+            all_scores.update({(k[0], (k[1], i)): v for k, v in scores.items()})
+
+        self.assertEqual(expected_safest, pick_safest(all_scores))
+
+    def test_joint_search_prunes_an_option_in_every_state(self):
+        other_state = deepcopy(self.state)
+        states = [self.state, other_state]
+
+        payoff_matrices = get_joint_payoff_matrices(
+            [StateMutator(state) for state in states],
+            self.state.get_all_options()[0],
+            [state.get_all_options()[1] for state in states],
+            depth=2
+        )
+
+        # each option is either searched in the first state or pruned before the second state is searched
+        self.assertTrue(any(math.isnan(score) for score in payoff_matrices[1].values()))
@@ -1,7 +1,10 @@
 import unittest
+from collections import defaultdict
 
 import constants
 from showdown.engine.objects import State
+from showdown.engine.objects import Side
+from showdown.engine.objects import StateMutator
 from showdown.battle import Pokemon as StatePokemon
 from showdown.engine.objects import Pokemon
 
@@ -68,3 +71,176 @@ class TestPokemon(unittest.TestCase):
     def test_item_can_be_removed_returns_false_if_target_is_kyogreprimal(self):
         self.pokemon.id = 'kyogreprimal'
         self.assertFalse(self.pokemon.item_can_be_removed())
+
+    def test_get_boosted_stat_is_the_same_as_calculate_boosted_stats(self):
+        self.pokemon.attack_boost = 2
+        self.pokemon.special_defense_boost = -1
+        self.pokemon.speed_boost = 6
+        boosted_stats = self.pokemon.calculate_boosted_stats()
+        for stat, boosted_stat in boosted_stats.items():
+            self.assertEqual(boosted_stat, self.pokemon.get_boosted_stat(stat))
+
+    def test_get_boost_from_boost_string_returns_the_boost(self):
+        self.pokemon.evasion_boost = -3
+        self.assertEqual(-3, self.pokemon.get_boost_from_boost_string(constants.EVASION))
+
+    def test_get_boost_from_boost_string_raises_valueerror_for_an_invalid_boost(self):
+        with self.assertRaises(ValueError):
+            self.pokemon.get_boost_from_boost_string('notaboost')
+
+    def test_get_move_returns_the_move_with_that_name(self):
+        self.pokemon.moves = [{constants.ID: 'thunderbolt', constants.DISABLED: False}, {constants.ID: 'voltswitch', constants.DISABLED: False}]
+        self.assertIs(self.pokemon.moves[1], self.pokemon.get_move('voltswitch'))
+
+    def test_get_move_returns_none_when_the_pokemon_does_not_have_the_move(self):
+        self.assertIsNone(self.pokemon.get_move('voltswitch'))
+
+
+class TestStateSerialization(unittest.TestCase):
+    def setUp(self):
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("raichu", 73).to_dict()),
+                {
+                    "xatu": Pokemon.from_state_pokemon_dict(StatePokemon("xatu", 81).to_dict()),
+                    "starmie": Pokemon.from_state_pokemon_dict(StatePokemon("starmie", 81).to_dict()),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("aromatisse", 81).to_dict()),
+                {
+                    "yveltal": Pokemon.from_state_pokemon_dict(StatePokemon("yveltal", 73).to_dict()),
+                    "toxapex": Pokemon.from_state_pokemon_dict(StatePokemon("toxapex", 73).to_dict()),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            None,
+            None,
+            False,
+            6
+        )
+
+    def test_deserialized_state_is_the_same_as_the_serialized_state(self):
+        self.state.weather = constants.RAIN
+        self.state.user.active.hp = 100.5
+        self.state.user.active.speed_boost = -2
+        self.state.user.active.volatile_status = {constants.SUBSTITUTE, constants.LEECH_SEED}
+        self.state.user.active.moves = [
+            {constants.ID: 'thunderbolt', constants.DISABLED: True, constants.CURRENT_PP: 24},
+            {constants.ID: 'voltswitch', constants.DISABLED: False}
+        ]
+        self.state.user.wish = (2, 100)
+        self.state.user.side_conditions[constants.REFLECT] = 3
+        self.state.opponent.future_sight = (1, 'xatu')
+        self.state.opponent.active.item = None
+        self.state.opponent.active.status = constants.BURN
+
+        new_state = State.deserialize(self.state.serialize())
+
+        self.assertEqual(self.state.serialize(), new_state.serialize())
+        self.assertEqual(constants.RAIN, new_state.weather)
+        self.assertEqual(100.5, new_state.user.active.hp)
+        self.assertEqual(-2, new_state.user.active.speed_boost)
+        self.assertEqual({constants.SUBSTITUTE, constants.LEECH_SEED}, new_state.user.active.volatile_status)
+        self.assertEqual(self.state.user.active.moves, new_state.user.active.moves)
+        self.assertEqual((2, 100), new_state.user.wish)
+        self.assertEqual(3, new_state.user.side_conditions[constants.REFLECT])
+        self.assertEqual((1, 'xatu'), new_state.opponent.future_sight)
+        self.assertIsNone(new_state.opponent.active.item)
+        self.assertEqual(constants.BURN, new_state.opponent.active.status)
+        self.assertEqual({'xatu', 'starmie'}, set(new_state.user.reserve))
+
+    def test_deserialized_pokemon_has_the_same_burn_multiplier(self):
+        new_state = State.deserialize(self.state.serialize())
+        self.assertEqual(self.state.user.active.burn_multiplier, new_state.user.active.burn_multiplier)
+
+    def test_order_of_the_reserve_does_not_change_the_serialization(self):
+        serialization = self.state.serialize()
+        self.state.user.reserve = dict(reversed(list(self.state.user.reserve.items())))
+        self.assertEqual(serialization, self.state.serialize())
+
+    def test_side_condition_with_a_count_of_zero_does_not_change_the_serialization(self):
+        serialization = self.state.serialize()
+        self.state.user.side_conditions[constants.STEALTH_ROCK] = 0
+        self.assertEqual(serialization, self.state.serialize())
+
+    def test_whole_number_float_has_the_same_serialization_as_an_int(self):
+        serialization = self.state.serialize()
+        self.state.user.active.hp = float(self.state.user.active.hp)
+        self.assertEqual(serialization, self.state.serialize())
+
+    def test_changing_the_state_changes_the_fingerprint(self):
+        fingerprint = self.state.fingerprint()
+        self.state.opponent.active.hp -= 1
+        self.assertNotEqual(fingerprint, self.state.fingerprint())
+
+    def test_fingerprint_is_64_bits(self):
+        self.assertTrue(0 <= self.state.fingerprint() < 2 ** 64)
+
+    def test_deserializing_a_different_version_raises_valueerror(self):
+        serialization = bytearray(self.state.serialize())
+        serialization[0] += 1
+        with self.assertRaises(ValueError):
+            State.deserialize(bytes(serialization))
+
+
+class TestStateClone(unittest.TestCase):
+    def setUp(self):
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("raichu", 73).to_dict()),
+                {
+                    "xatu": Pokemon.from_state_pokemon_dict(StatePokemon("xatu", 81).to_dict()),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("aromatisse", 81).to_dict()),
+                {
+                    "yveltal": Pokemon.from_state_pokemon_dict(StatePokemon("yveltal", 73).to_dict()),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            None,
+            None,
+            False,
+            6
+        )
+
+        self.state.user.active.moves = [{constants.ID: 'thunderbolt', constants.DISABLED: False, constants.CURRENT_PP: 24}]
+
+    def test_clone_is_the_same_as_the_state(self):
+        self.assertEqual(str(self.state), str(self.state.clone()))
+
+    def test_changing_the_clone_does_not_change_the_state(self):
+        original = str(self.state)
+
+        clone = self.state.clone()
+        clone.user.active.hp = 1
+        clone.user.active.volatile_status.add(constants.SUBSTITUTE)
+        clone.user.active.moves[0][constants.DISABLED] = True
+        clone.user.side_conditions[constants.STEALTH_ROCK] = 1
+        clone.opponent.reserve["yveltal"].hp = 1
+
+        self.assertEqual(original, str(self.state))
+
+    def test_applying_instructions_to_the_clone_does_not_change_the_state(self):
+        original = str(self.state)
+
+        mutator = StateMutator(self.state.clone())
+        mutator.apply([
+            (constants.MUTATOR_SWITCH, constants.USER, "raichu", "xatu"),
+            (constants.MUTATOR_BOOST, constants.USER, constants.ATTACK, 2),
+            (constants.MUTATOR_SIDE_START, constants.OPPONENT, constants.SPIKES, 1),
+        ])
+
+        self.assertEqual(original, str(self.state))
@@ -1,13 +1,19 @@
 import unittest
 
 from collections import defaultdict
+from copy import copy
 import constants
 
+from config import ShowdownConfig
 from showdown.battle import Pokemon as StatePokemon
 from showdown.engine.objects import State
 from showdown.engine.objects import Side
 from showdown.engine.objects import Pokemon
 from showdown.engine.objects import StateMutator
+from showdown.engine.objects import TransposeInstruction
+from showdown.engine.objects import compile_instructions
+from showdown.engine.evaluate import evaluate
+from showdown.engine.find_state_instructions import get_all_state_instructions
 
 
 class TestStatemutator(unittest.TestCase):
@@ -862,3 +868,161 @@ class TestStatemutator(unittest.TestCase):
         self.assertEqual(3, self.state.user.active.special_attack)
         self.assertEqual(4, self.state.user.active.special_defense)
         self.assertEqual(5, self.state.user.active.speed)
+
+
+class TestStateMutatorEvaluate(unittest.TestCase):
+    def setUp(self):
+        ShowdownConfig.damage_calc_type = "average"
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("raichu", 73).to_dict()),
+                {
+                    "xatu": Pokemon.from_state_pokemon_dict(StatePokemon("xatu", 81).to_dict()),
+                    "starmie": Pokemon.from_state_pokemon_dict(StatePokemon("starmie", 81).to_dict()),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("aromatisse", 81).to_dict()),
+                {
+                    "yveltal": Pokemon.from_state_pokemon_dict(StatePokemon("yveltal", 73).to_dict()),
+                    "toxapex": Pokemon.from_state_pokemon_dict(StatePokemon("toxapex", 73).to_dict()),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            None,
+            None,
+            False,
+            6
+        )
+        self.state.user.active.moves = [
+            {constants.ID: 'thunderbolt', constants.DISABLED: False},
+            {constants.ID: 'nastyplot', constants.DISABLED: False},
+        ]
+        self.state.opponent.active.moves = [
+            {constants.ID: 'moonblast', constants.DISABLED: False},
+            {constants.ID: 'toxic', constants.DISABLED: False},
+        ]
+        self.mutator = StateMutator(self.state)
+
+    def test_evaluation_is_kept_up_to_date_when_applying_and_reversing_instructions(self):
+        xatu = self.state.user.reserve['xatu']
+        xatu_stats = (xatu.maxhp, xatu.attack, xatu.defense, xatu.special_attack, xatu.special_defense, xatu.speed)
+        instructions = [
+            (constants.MUTATOR_SIDE_START, constants.USER, constants.STEALTH_ROCK, 1),
+            (constants.MUTATOR_SIDE_START, constants.OPPONENT, constants.SPIKES, 2),
+            (constants.MUTATOR_APPLY_STATUS, constants.USER, constants.TOXIC),
+            (constants.MUTATOR_SIDE_START, constants.USER, constants.TOXIC_COUNT, 3),
+            (constants.MUTATOR_BOOST, constants.OPPONENT, constants.SPECIAL_ATTACK, 2),
+            (constants.MUTATOR_APPLY_VOLATILE_STATUS, constants.OPPONENT, constants.SUBSTITUTE),
+            (constants.MUTATOR_SWITCH, constants.USER, 'raichu', 'xatu'),
+            (constants.MUTATOR_SIDE_START, constants.USER, constants.TOXIC_COUNT, 1),
+            (constants.MUTATOR_DAMAGE, constants.OPPONENT, self.state.opponent.active.hp),
+            (constants.MUTATOR_SWITCH, constants.OPPONENT, 'aromatisse', 'toxapex'),
+            (constants.MUTATOR_CHANGE_STATS, constants.USER, (500, 100, 100, 100, 100, 100), xatu_stats),
+        ]
+        original_score = self.mutator.evaluate()
+
+        for instruction in instructions:
+            self.mutator.apply_one(instruction)
+            self.assertEqual(evaluate(self.state), self.mutator.evaluate())
+
+        self.mutator.reverse(instructions)
+        self.assertEqual(original_score, self.mutator.evaluate())
+
+    def test_evaluation_matches_the_state_after_generated_instructions(self):
+        self.mutator.evaluate()
+        user_options, opponent_options = self.state.get_all_options()
+        for user_move in user_options:
+            for opponent_move in opponent_options:
+                for instructions in get_all_state_instructions(self.mutator, user_move, opponent_move):
+                    self.mutator.apply(instructions.instructions)
+                    self.assertEqual(evaluate(self.state), self.mutator.evaluate())
+                    self.mutator.reverse(instructions.instructions)
+
+
+class TestCompiledInstructions(unittest.TestCase):
+    def setUp(self):
+        ShowdownConfig.damage_calc_type = "average"
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("raichu", 73).to_dict()),
+                {
+                    "xatu": Pokemon.from_state_pokemon_dict(StatePokemon("xatu", 81).to_dict()),
+                    "starmie": Pokemon.from_state_pokemon_dict(StatePokemon("starmie", 81).to_dict()),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("aromatisse", 81).to_dict()),
+                {
+                    "yveltal": Pokemon.from_state_pokemon_dict(StatePokemon("yveltal", 73).to_dict()),
+                    "toxapex": Pokemon.from_state_pokemon_dict(StatePokemon("toxapex", 73).to_dict()),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            None,
+            None,
+            False,
+            6
+        )
+        self.state.user.active.moves = [
+            {constants.ID: 'thunderbolt', constants.DISABLED: False},
+            {constants.ID: 'nastyplot', constants.DISABLED: False},
+        ]
+        self.state.opponent.active.moves = [
+            {constants.ID: 'moonblast', constants.DISABLED: False},
+            {constants.ID: 'toxic', constants.DISABLED: False},
+        ]
+        self.mutator = StateMutator(self.state)
+
+    def get_generated_instructions(self):
+        instructions = []
+        user_options, opponent_options = self.state.get_all_options()
+        for user_move in user_options:
+            for opponent_move in opponent_options:
+                instructions += get_all_state_instructions(self.mutator, user_move, opponent_move)
+        return instructions
+
+    def test_compiled_instructions_change_the_state_the_same_way_as_instructions(self):
+        for transpose_instruction in self.get_generated_instructions():
+            self.mutator.apply(transpose_instruction.instructions)
+            expected_state = str(self.state)
+            expected_hash = self.mutator.hash
+            expected_score = self.mutator.evaluate()
+            self.mutator.reverse(transpose_instruction.instructions)
+
+            original_state = str(self.state)
+            compiled_instructions = compile_instructions(transpose_instruction.instructions)
+            self.mutator.apply_compiled(compiled_instructions)
+            self.assertEqual(expected_state, str(self.state))
+            self.assertEqual(expected_hash, self.mutator.hash)
+            self.assertEqual(expected_score, self.mutator.evaluate())
+
+            self.mutator.reverse_compiled(compiled_instructions)
+            self.assertEqual(original_state, str(self.state))
+
+    def test_compiled_instructions_keep_up_with_added_instructions(self):
+        transpose_instruction = TransposeInstruction(1, [(constants.MUTATOR_DAMAGE, constants.USER, 10)])
+        self.assertEqual(compile_instructions(transpose_instruction.instructions), transpose_instruction.compiled())
+
+        transpose_instruction.add_instruction((constants.MUTATOR_BOOST, constants.OPPONENT, constants.SPEED, 1))
+        self.assertEqual(compile_instructions(transpose_instruction.instructions), transpose_instruction.compiled())
+
+    def test_copied_instruction_is_compiled_separately(self):
+        transpose_instruction = TransposeInstruction(1, [(constants.MUTATOR_DAMAGE, constants.USER, 10)])
+        transpose_instruction.compiled()
+
+        copied_instruction = copy(transpose_instruction)
+        copied_instruction.add_instruction((constants.MUTATOR_HEAL, constants.USER, 5))
+
+        self.assertEqual(1, len(transpose_instruction.compiled()))
+        self.assertEqual(compile_instructions(copied_instruction.instructions), copied_instruction.compiled())
@@ -0,0 +1,168 @@
+import unittest
+from collections import defaultdict
+
+import constants
+from config import ShowdownConfig
+from showdown.battle import Pokemon as StatePokemon
+from showdown.engine.objects import State
+from showdown.engine.objects import Side
+from showdown.engine.objects import Pokemon
+from showdown.engine.objects import StateMutator
+from showdown.engine.find_state_instructions import get_all_state_instructions
+from showdown.engine.select_best_move import get_payoff_matrix
+from showdown.engine.transposition_table import TranspositionTable
+from showdown.engine.transposition_table import EXACT
+from showdown.engine.transposition_table import LOWER_BOUND
+from showdown.engine.transposition_table import UPPER_BOUND
+
+
+class TestTranspositionTable(unittest.TestCase):
+    def setUp(self):
+        self.transposition_table = TranspositionTable(max_size=2)
+
+    def test_get_returns_none_for_unknown_state(self):
+        self.assertIsNone(self.transposition_table.get(123, 1))
+
+    def test_get_returns_entry_that_was_stored(self):
+        self.transposition_table.store(123, 2, 50, ('tackle', 'tackle'))
+        entry = self.transposition_table.get(123, 2)
+
+        self.assertEqual(50, entry.score)
+        self.assertEqual(('tackle', 'tackle'), entry.best_reply)
+
+    def test_entry_from_a_deeper_search_can_be_used_for_a_shallower_search(self):
+        self.transposition_table.store(123, 3, 50, ('tackle', 'tackle'))
+        self.assertEqual(50, self.transposition_table.get(123, 1).score)
+
+    def test_entry_from_a_shallower_search_is_not_used_for_a_deeper_search(self):
+        self.transposition_table.store(123, 1, 50, ('tackle', 'tackle'))
+        self.assertIsNone(self.transposition_table.get(123, 2))
+
+    def test_shallower_search_does_not_replace_deeper_entry(self):
+        self.transposition_table.store(123, 3, 50, ('tackle', 'tackle'))
+        self.transposition_table.store(123, 1, 10, ('growl', 'growl'))
+        self.assertEqual(50, self.transposition_table.get(123, 1).score)
+
+    def test_lower_bound_is_used_when_it_is_above_beta(self):
+        self.transposition_table.store(123, 1, 50, None, LOWER_BOUND)
+        self.assertEqual(50, self.transposition_table.get(123, 1, 0, 40).score)
+
+    def test_lower_bound_is_not_used_when_it_is_below_beta(self):
+        self.transposition_table.store(123, 1, 50, None, LOWER_BOUND)
+        self.assertIsNone(self.transposition_table.get(123, 1, 0, 60))
+
+    def test_upper_bound_is_used_when_it_is_below_alpha(self):
+        self.transposition_table.store(123, 1, 50, None, UPPER_BOUND)
+        self.assertEqual(50, self.transposition_table.get(123, 1, 60, 100).score)
+
+    def test_upper_bound_is_not_used_when_it_is_above_alpha(self):
+        self.transposition_table.store(123, 1, 50, None, UPPER_BOUND)
+        self.assertIsNone(self.transposition_table.get(123, 1, 40, 100))
+
+    def test_bound_does_not_replace_exact_score_from_a_search_of_the_same_depth(self):
+        self.transposition_table.store(123, 1, 50, None, EXACT)
+        self.transposition_table.store(123, 1, 10, None, UPPER_BOUND)
+        self.assertEqual(50, self.transposition_table.get(123, 1).score)
+
+    def test_best_reply_is_available_from_a_shallower_search(self):
+        self.transposition_table.store(123, 1, 50, ('tackle', 'growl'))
+        self.assertEqual(('tackle', 'growl'), self.transposition_table.get_best_reply(123))
+
+    def test_oldest_entry_is_removed_when_table_is_full(self):
+        self.transposition_table.store(1, 1, 10, None)
+        self.transposition_table.store(2, 1, 20, None)
+        self.transposition_table.store(3, 1, 30, None)
+
+        self.assertIsNone(self.transposition_table.get(1, 1))
+        self.assertEqual(20, self.transposition_table.get(2, 1).score)
+        self.assertEqual(30, self.transposition_table.get(3, 1).score)
+
+    def test_table_with_size_0_stores_nothing(self):
+        self.transposition_table.max_size = 0
+        self.transposition_table.store(1, 1, 10, None)
+        self.assertEqual(0, len(self.transposition_table))
+
+
+class TestStateMutatorHash(unittest.TestCase):
+    def setUp(self):
+        ShowdownConfig.damage_calc_type = "average"
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("raichu", 73).to_dict()),
+                {
+                    "xatu": Pokemon.from_state_pokemon_dict(StatePokemon("xatu", 81).to_dict()),
+                    "starmie": Pokemon.from_state_pokemon_dict(StatePokemon("starmie", 81).to_dict()),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("aromatisse", 81).to_dict()),
+                {
+                    "yveltal": Pokemon.from_state_pokemon_dict(StatePokemon("yveltal", 73).to_dict()),
+                    "toxapex": Pokemon.from_state_pokemon_dict(StatePokemon("toxapex", 73).to_dict()),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0)
+            ),
+            None,
+            None,
+            False,
+            6
+        )
+        self.state.user.active.moves = [
+            {constants.ID: 'thunderbolt', constants.DISABLED: False},
+            {constants.ID: 'nastyplot', constants.DISABLED: False},
+        ]
+        self.state.opponent.active.moves = [
+            {constants.ID: 'moonblast', constants.DISABLED: False},
+            {constants.ID: 'toxic', constants.DISABLED: False},
+        ]
+        self.mutator = StateMutator(self.state)
+
+    def test_hash_is_kept_up_to_date_when_applying_and_reversing_instructions(self):
+        instructions = [
+            (constants.MUTATOR_DAMAGE, constants.USER, 10),
+            (constants.MUTATOR_BOOST, constants.OPPONENT, constants.SPEED, 2),
+            (constants.MUTATOR_APPLY_VOLATILE_STATUS, constants.USER, constants.CONFUSION),
+            (constants.MUTATOR_APPLY_STATUS, constants.OPPONENT, constants.BURN),
+            (constants.MUTATOR_SIDE_START, constants.USER, constants.STEALTH_ROCK, 1),
+            (constants.MUTATOR_WEATHER_START, constants.RAIN, None),
+            (constants.MUTATOR_TOGGLE_TRICKROOM,),
+            (constants.MUTATOR_DISABLE_MOVE, constants.USER, 'thunderbolt'),
+            (constants.MUTATOR_SWITCH, constants.OPPONENT, 'aromatisse', 'toxapex'),
+        ]
+        original_hash = self.mutator.hash
+
+        self.mutator.apply(instructions)
+        self.assertEqual(self.state.zobrist_hash(), self.mutator.hash)
+        self.assertNotEqual(original_hash, self.mutator.hash)
+
+        self.mutator.reverse(instructions)
+        self.assertEqual(original_hash, self.mutator.hash)
+
+    def test_different_paths_to_the_same_state_give_the_same_hash(self):
+        self.mutator.apply([(constants.MUTATOR_DAMAGE, constants.USER, 10), (constants.MUTATOR_DAMAGE, constants.USER, 5)])
+        first_hash = self.mutator.hash
+        self.mutator.reverse([(constants.MUTATOR_DAMAGE, constants.USER, 10), (constants.MUTATOR_DAMAGE, constants.USER, 5)])
+
+        self.mutator.apply([(constants.MUTATOR_DAMAGE, constants.USER, 15)])
+        self.assertEqual(first_hash, self.mutator.hash)
+
+    def test_hash_matches_the_state_after_generated_instructions(self):
+        for instructions in get_all_state_instructions(self.mutator, 'thunderbolt', 'toxic'):
+            self.mutator.apply(instructions.instructions)
+            self.assertEqual(self.state.zobrist_hash(), self.mutator.hash)
+            self.mutator.reverse(instructions.instructions)
+
+    def test_payoff_matrix_is_the_same_with_a_transposition_table(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected_scores = get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, prune=False)
+
+        transposition_table = TranspositionTable()
+        scores = get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, prune=False, transposition_table=transposition_table)
+
+        self.assertEqual(expected_scores, scores)
+        self.assertTrue(len(transposition_table) > 0)